@@ -0,0 +1,122 @@
+"""Árbol Gerencia/Unidad de los proyectos con conteos por nodo.
+
+La columna gerencia trae la ruta completa ("Gerencia B > Unidad 2 > Sub").
+Se separa una sola vez en niveles y las filas se ordenan por la ruta, con lo
+que cada nodo del árbol (cada prefijo de la ruta) ocupa un rango contiguo
+[inicio, fin) de ese orden. Los conteos de cada nodo (proyectos,
+implementados y proyectos por estado) salen de sumas acumuladas sobre el
+orden, así que abrir un nodo o listar sus hijos es una búsqueda y no vuelve
+a recorrer los datos.
+"""
+import numpy as np
+import pandas as pd
+
+from procesamiento import ESTADOS_IMPLEMENTADOS, ordenar_estados
+
+SEPARADOR = " > "
+SIN_DATO = "(Sin dato)"
+
+# Nombres aceptados para la columna (sin espacios y en minúsculas): la
+# exportación trae 'Gerencia/Unidad', que procesar_proyectos renombra a 'gerencia'
+NOMBRES_COLUMNA = ["gerencia/unidad", "gerenciaunidad", "gerencia"]
+
+
+def columna_gerencia(df):
+    """Nombre real de la columna Gerencia/Unidad (None si no está)."""
+    for col in df.columns:
+        if str(col).replace(' ', '').lower() in NOMBRES_COLUMNA:
+            return col
+    return None
+
+def niveles_gerencia(serie):
+    """DataFrame con un nivel de la ruta por columna (nivel_1, nivel_2...); '' donde la ruta es más corta."""
+    texto = serie.astype("string").str.strip().fillna("")
+    texto = texto.where(texto != "", SIN_DATO)
+    niveles = texto.str.split(">", expand=True).fillna("")
+    niveles = niveles.apply(lambda nivel: nivel.str.strip())
+    niveles.columns = [f"nivel_{i + 1}" for i in range(niveles.shape[1])]
+    return niveles
+
+
+class ArbolGerencias:
+    """Índice jerárquico Gerencia > Unidad > ... de un DataFrame de proyectos.
+
+    `nodos` tiene una fila por nodo (índice: la ruta) con nombre, nivel,
+    padre, el rango [inicio, fin) en `orden` y los conteos del nodo, que
+    incluyen a todos sus descendientes.
+    """
+
+    def __init__(self, df, columna="gerencia", estados="estado_actual"):
+        self.df = df
+        niveles = niveles_gerencia(df[columna]) if len(df) else pd.DataFrame({"nivel_1": pd.Series(dtype=str)})
+        codigos = np.column_stack([pd.factorize(niveles[c], sort=True)[0] for c in niveles.columns])
+        # Orden estable por ruta: el '' de las rutas cortas queda antes que sus hijos
+        self.orden = np.lexsort(codigos[:, ::-1].T) if len(df) else np.array([], dtype=np.intp)
+        self.profundidad = niveles.shape[1]
+        niveles_ordenados = niveles.to_numpy()[self.orden]
+        codigos = codigos[self.orden]
+
+        # Sumas acumuladas en el orden del árbol: conteo de un rango = acumulado[fin] - acumulado[inicio]
+        estado = df[estados].fillna("(vacío)").astype(str).to_numpy()[self.orden]
+        self.estados = ordenar_estados(np.unique(estado))
+        una_caliente = estado[:, None] == np.array(self.estados, dtype=object)[None, :]
+        acumulado = np.vstack([np.zeros((1, len(self.estados)), dtype=np.int64), np.cumsum(una_caliente, axis=0)])
+        implementado = np.concatenate([[0], np.cumsum(np.isin(estado, ESTADOS_IMPLEMENTADOS))])
+
+        partes = []
+        for nivel in range(self.profundidad):
+            # Un nodo empieza donde cambia algún nivel hasta éste
+            cambia = np.ones(len(codigos), dtype=bool)
+            if len(codigos):
+                cambia[1:] = (codigos[1:, :nivel + 1] != codigos[:-1, :nivel + 1]).any(axis=1)
+            inicio = np.flatnonzero(cambia)
+            fin = np.append(inicio[1:], len(codigos))
+            con_nivel = niveles_ordenados[inicio, nivel] != ""
+            inicio, fin = inicio[con_nivel], fin[con_nivel]
+            rutas = [SEPARADOR.join(niveles_ordenados[i, :nivel + 1]) for i in inicio]
+            parte = pd.DataFrame({
+                "nombre": niveles_ordenados[inicio, nivel],
+                "nivel": nivel + 1,
+                "padre": [r.rsplit(SEPARADOR, 1)[0] if nivel else "" for r in rutas],
+                "inicio": inicio,
+                "fin": fin,
+                "Proyectos": fin - inicio,
+                "Implementados": implementado[fin] - implementado[inicio],
+            }, index=pd.Index(rutas, name="ruta"))
+            conteos = pd.DataFrame(acumulado[fin] - acumulado[inicio], columns=self.estados, index=parte.index)
+            partes.append(pd.concat([parte, conteos], axis=1))
+        # Orden de recorrido en profundidad: cada nodo seguido de sus descendientes
+        self.nodos = pd.concat(partes).sort_values(["inicio", "nivel"], kind="stable")
+        if not self.nodos.empty:
+            self.nodos.insert(self.nodos.columns.get_loc("Implementados") + 1, "No implementados",
+                              self.nodos["Proyectos"] - self.nodos["Implementados"])
+            self.nodos.insert(self.nodos.columns.get_loc("No implementados") + 1, "% implementado",
+                              (self.nodos["Implementados"] / self.nodos["Proyectos"] * 100).round(1))
+        self._hijos = self.nodos.groupby("padre", sort=False).groups if not self.nodos.empty else {}
+        # Primer nivel de cada fila, alineado al índice del DataFrame (reemplaza a extraer_gerencia)
+        self.principal = pd.Series(niveles["nivel_1"].to_numpy(), index=df.index, name="Gerencia_Principal")
+
+    def raices(self):
+        """Nodos de primer nivel (Gerencias principales)."""
+        return self.hijos("")
+
+    def hijos(self, ruta):
+        """Conteos de los hijos directos de un nodo ('' para el primer nivel)."""
+        rutas = self._hijos.get(ruta)
+        if rutas is None:
+            return self.nodos.iloc[0:0]
+        return self.nodos.loc[rutas]
+
+    def posiciones(self, ruta):
+        """Posiciones (iloc) de las filas del nodo y sus descendientes, en el orden original."""
+        nodo = self.nodos.loc[ruta]
+        return np.sort(self.orden[nodo["inicio"]:nodo["fin"]])
+
+    def filas(self, ruta):
+        """Filas del DataFrame que pertenecen al nodo (incluye descendientes)."""
+        return self.df.iloc[self.posiciones(ruta)]
+
+    def tabla(self, nodos=None):
+        """Conteos para mostrar: sin las columnas internas del índice."""
+        nodos = self.nodos if nodos is None else nodos
+        return nodos.drop(columns=["padre", "inicio", "fin"]).reset_index()
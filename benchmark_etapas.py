@@ -0,0 +1,143 @@
+"""Benchmark por etapas del procesamiento de la exportación de proyectos.
+
+Genera exportaciones sintéticas (ver generador_sintetico.py) de distintos
+tamaños y mide por separado cada etapa del dashboard: lectura del Excel,
+parseo de nombres, parseo de fechas, indicadores, pestañas agrupadas, estilos
+de tabla y construcción de figuras.
+
+Ejemplos:
+    python benchmark_etapas.py
+    python benchmark_etapas.py --filas 1000 10000 100000 --repeticiones 5 --salida bench.csv
+    python benchmark_etapas.py --filas 1000000 --etapas nombres fechas indicadores
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import generador_sintetico
+import graficos
+import procesamiento
+from estilos import con_estilo, css_filas
+
+ETAPAS = ["lectura", "nombres", "fechas", "indicadores", "pestanas", "estilos", "figuras"]
+
+# Columnas ocultas en las vistas agrupadas del dashboard Agosto/25
+COLUMNAS_OCULTAS = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion', 'grupo jefatura']
+
+
+def medir(funcion, repeticiones):
+    """Ejecuta funcion() repeticiones veces y devuelve los tiempos en segundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+def vistas_agrupadas(df):
+    """Subconjuntos que arman las pestañas agrupadas (estado, gerencia y asignatario)."""
+    df_core = procesamiento.filtrar_core(df).copy()
+    df_core['Gerencia_Principal'] = procesamiento.aplicar_por_valor(df_core['gerencia'], procesamiento.extraer_gerencia)
+    df_core['Asignatario'] = procesamiento.aplicar_por_valor(df_core['asignatario'], procesamiento.extraer_asignatario)
+    vistas = {}
+    for columna in ['estado_actual', 'Gerencia_Principal', 'Asignatario']:
+        for valor in sorted(df_core[columna].dropna().unique()):
+            vistas[(columna, valor)] = df_core[df_core[columna] == valor]
+    return vistas
+
+def estilar(df):
+    """Calcula el CSS de las filas (css_filas) y arma el Styler con con_estilo, como las páginas."""
+    columnas = [col for col in df.columns if col.lower() not in COLUMNAS_OCULTAS]
+    styler = con_estilo(df[columnas], css_filas(df))
+    # Mismos pasos que ejecuta Streamlit al serializar un Styler
+    styler._compute()
+    styler._translate(False, False)
+
+def preparar_graficos(df):
+    df_graf = procesamiento.filtrar_core(df).copy()
+    df_graf['Tipo_Etiqueta'] = procesamiento.aplicar_por_valor(df_graf['etiquetas'], procesamiento.etiqueta_tipo)
+    df_graf['implementado'] = procesamiento.aplicar_por_valor(df_graf['estado_actual'], procesamiento.estado_implementado)
+    df_graf['Gerencia_Principal'] = procesamiento.aplicar_por_valor(df_graf['gerencia'], procesamiento.extraer_gerencia)
+    return df_graf
+
+def construir_figuras(df_graf):
+    return [
+        graficos.figura_estados(df_graf),
+        graficos.figura_etiquetas(df_graf),
+        graficos.figura_etiqueta_implementado(df_graf),
+        graficos.figura_implementados(df_graf),
+        graficos.figura_gerencia(df_graf),
+    ]
+
+def medir_tamano(filas, etapas, repeticiones, directorio, max_filas_excel):
+    """Mide las etapas pedidas para una exportación de filas proyectos."""
+    crudo = generador_sintetico.generar_proyectos(filas)
+    resultados = {}
+
+    if "lectura" in etapas and filas <= max_filas_excel:
+        ruta = os.path.join(directorio, f"proyectos_{filas}.xlsx")
+        generador_sintetico.escribir_proyectos(crudo, ruta)
+        resultados["lectura"] = medir(lambda: pd.read_excel(ruta, header=3), repeticiones)
+
+    if "nombres" in etapas:
+        resultados["nombres"] = medir(lambda: procesamiento.procesar_nombres(crudo.copy()), repeticiones)
+    renombrado = procesamiento.procesar_nombres(crudo.copy()).rename(columns=procesamiento.COLUMNAS_PROYECTOS)
+    if "fechas" in etapas:
+        resultados["fechas"] = medir(lambda: procesamiento.procesar_fechas(renombrado.copy()), repeticiones)
+    df = procesamiento.procesar_fechas(renombrado.copy())
+
+    if "indicadores" in etapas:
+        df_filtrado = df[df['jefatura'].isin(procesamiento.jefaturas_por_defecto(df))]
+        resultados["indicadores"] = medir(lambda: procesamiento.calcular_indicadores(df_filtrado), repeticiones)
+    if "pestanas" in etapas:
+        resultados["pestanas"] = medir(lambda: vistas_agrupadas(df), repeticiones)
+    if "estilos" in etapas:
+        limite = pd.get_option("styler.render.max_elements")
+        pd.set_option("styler.render.max_elements", max(limite, df.size))
+        resultados["estilos"] = medir(lambda: estilar(procesamiento.filtrar_core(df)), repeticiones)
+    if "figuras" in etapas:
+        df_graf = preparar_graficos(df)
+        construir_figuras(df_graf)  # la primera llamada incluye importar plotly
+        resultados["figuras"] = medir(lambda: construir_figuras(df_graf), repeticiones)
+
+    return [
+        {
+            "filas": filas,
+            "etapa": etapa,
+            "mediana_ms": round(statistics.median(tiempos) * 1000, 2),
+            "min_ms": round(min(tiempos) * 1000, 2),
+            "filas_por_s": round(filas / statistics.median(tiempos)) if statistics.median(tiempos) else None,
+        }
+        for etapa, tiempos in resultados.items()
+    ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide cada etapa del procesamiento con exportaciones sintéticas.")
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, default=ETAPAS)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--max-filas-excel", type=int, default=100000,
+                        help="Tamaño máximo para el que se escribe y se mide la lectura del .xlsx")
+    parser.add_argument("--salida", help="Guardar los resultados en CSV")
+    args = parser.parse_args(argv)
+
+    filas_resultado = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for filas in args.filas:
+            filas_resultado.extend(medir_tamano(filas, args.etapas, args.repeticiones, directorio, args.max_filas_excel))
+            print(f"{filas} filas medidas", file=sys.stderr)
+
+    resultados = pd.DataFrame(filas_resultado)
+    print(resultados.to_string(index=False))
+    if args.salida:
+        resultados.to_csv(args.salida, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Búsqueda de texto por subcadena sobre las columnas de la exportación de proyectos.
+
+El índice se arma una vez por exportación. Los valores distintos de las
+columnas buscables forman un vocabulario; cada valor se normaliza (minúsculas
+y sin tildes) y se parte en trigramas, que se codifican como enteros de 64
+bits (tres puntos de código). El índice invertido son dos arreglos ordenados
+por trigrama: claves y valores que lo contienen. Una consulta de tres o más
+caracteres intersecta las listas de sus trigramas y verifica la subcadena
+solo en esos candidatos; una de uno o dos caracteres es un rango contiguo de
+claves (los trigramas que empiezan con ella). Los valores encontrados vuelven
+a filas con los códigos de cada columna.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNAS_BUSQUEDA = ["nombre", "etiquetas", "asignatario", "gestor", "gerencia"]
+
+# Separador entre valores del vocabulario (no puede aparecer en una consulta)
+_SEPARADOR = "\x00"
+# Base para codificar tres puntos de código Unicode en un entero de 64 bits
+_BASE = 0x110000
+
+
+def normalizar_texto(serie):
+    """Minúsculas y sin tildes ni diéresis, para que 'migracion' encuentre 'Migración'."""
+    return (
+        serie.astype("string")
+        .str.normalize("NFKD")
+        .str.replace(r"[\u0300-\u036f]", "", regex=True)
+        .str.lower()
+        .str.replace(_SEPARADOR, " ", regex=False)
+    )
+
+def _puntos_de_codigo(texto):
+    return np.frombuffer(texto.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+def _trigramas(puntos):
+    """Clave entera de cada trigrama (una por posición inicial)."""
+    return (puntos[:-2] * _BASE + puntos[1:-1]) * _BASE + puntos[2:]
+
+
+class IndiceTexto:
+    """Índice invertido de trigramas sobre las columnas de búsqueda de un DataFrame."""
+
+    def __init__(self, df, columnas=COLUMNAS_BUSQUEDA):
+        self.filas = len(df)
+        self.columnas = [c for c in columnas if c in df.columns]
+        valores = pd.concat([df[c].astype("string") for c in self.columnas], ignore_index=True) if self.columnas else pd.Series([], dtype="string")
+        # Vocabulario: valores distintos de todas las columnas; por columna, el código de cada fila
+        codigos, vocabulario = pd.factorize(valores)
+        self._codigos = codigos.reshape(len(self.columnas), self.filas) if self.columnas else np.empty((0, self.filas), dtype=np.intp)
+        self.vocabulario = normalizar_texto(pd.Series(vocabulario, dtype="string")).fillna("").to_numpy(dtype=object)
+
+        # Cada valor termina con dos separadores para que sus últimos caracteres también inicien un trigrama
+        largos = np.fromiter((len(v) + 2 for v in self.vocabulario), dtype=np.int64, count=len(self.vocabulario))
+        puntos = _puntos_de_codigo("".join(v + _SEPARADOR * 2 for v in self.vocabulario))
+        if len(puntos) < 3:
+            self._claves = np.empty(0, dtype=np.int64)
+            self._valores = np.empty(0, dtype=np.int64)
+            return
+        valor = np.repeat(np.arange(len(self.vocabulario)), largos)[:-2]
+        claves = _trigramas(puntos)
+        validas = puntos[:-2] != ord(_SEPARADOR)
+        claves, valor = claves[validas], valor[validas]
+        # Orden estable por clave: dentro de cada clave los valores quedan ascendentes
+        orden = np.argsort(claves, kind="stable")
+        claves, valor = claves[orden], valor[orden]
+        distinto = np.ones(len(claves), dtype=bool)
+        distinto[1:] = (claves[1:] != claves[:-1]) | (valor[1:] != valor[:-1])
+        self._claves = claves[distinto]
+        self._valores = valor[distinto]
+
+    def _rango(self, desde, hasta):
+        inicio, fin = np.searchsorted(self._claves, [desde, hasta], side="left")
+        return self._valores[inicio:fin]
+
+    def valores(self, termino):
+        """Posiciones del vocabulario que contienen el término (ya normalizado)."""
+        puntos = _puntos_de_codigo(termino)
+        if len(puntos) == 1:
+            base = puntos[0] * _BASE * _BASE
+            return np.unique(self._rango(base, base + _BASE * _BASE))
+        if len(puntos) == 2:
+            base = (puntos[0] * _BASE + puntos[1]) * _BASE
+            return np.unique(self._rango(base, base + _BASE))
+        listas = sorted((self._rango(clave, clave + 1) for clave in np.unique(_trigramas(puntos))), key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            if not len(candidatos):
+                break
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+        if len(puntos) == 3:
+            return candidatos
+        # Tener todos los trigramas no garantiza la subcadena: se verifica en los candidatos
+        return np.array([v for v in candidatos if termino in self.vocabulario[v]], dtype=np.int64)
+
+    def mascara(self, consulta):
+        """Máscara de las filas que contienen todas las palabras de la consulta en alguna columna."""
+        mascara = np.ones(self.filas, dtype=bool)
+        terminos = normalizar_texto(pd.Series([consulta or ""])).iloc[0].split()
+        for termino in terminos:
+            encontrados = self.valores(termino)
+            en_alguna = np.zeros(self.filas, dtype=bool)
+            for codigos in self._codigos:
+                en_alguna |= np.isin(codigos, encontrados)
+            mascara &= en_alguna
+        return mascara
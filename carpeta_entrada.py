@@ -0,0 +1,275 @@
+"""Carpeta de entrada vigilada: recarga en segundo plano de las exportaciones.
+
+El servidor vigila una carpeta (variable de entorno DASHBOARD_CARPETA_ENTRADA)
+con watchdog. Cuando aparece o se reemplaza una exportación de proyectos o un
+listado de objetos a migrar, un hilo de fondo la lee, arma sus índices y
+artefactos derivados (precalculo.py) y recién entonces reemplaza la versión publicada de ese tipo con una sola
+asignación bajo lock. Las sesiones toman la versión publicada al comenzar
+cada rerun, así que nadie espera la lectura y nadie ve una versión a medias.
+
+Con varios procesos del servidor en el mismo equipo, el DataFrame leído se
+comparte entre ellos en memoria compartida (ver memoria_compartida.py): un
+solo proceso lee cada versión y todos la usan sin copiarla.
+
+Para probarlo sin Streamlit:
+    python carpeta_entrada.py carpeta
+"""
+import os
+import queue
+import threading
+import time
+
+import dependencias
+import memoria_compartida
+import precalculo
+from historico import PATRON_LISTADO, hash_archivo
+from procesamiento import leer_proyectos, leer_migracion
+
+VARIABLE_CARPETA = "DASHBOARD_CARPETA_ENTRADA"
+TIPOS = ["proyectos", "migracion"]
+
+# Segundos sin cambios de tamaño para dar por terminada la copia de un archivo
+ESPERA_ESTABLE = 1.0
+# Reintentos de un archivo que no se pudo leer (sin que cambie): espera inicial, se duplica hasta el máximo
+REINTENTO_ESPERA = 5.0
+REINTENTO_ESPERA_MAXIMA = 300.0
+REINTENTOS = 6
+
+
+def carpeta_configurada():
+    """Carpeta de entrada configurada (None si no hay o no existe)."""
+    carpeta = os.environ.get(VARIABLE_CARPETA)
+    return carpeta if carpeta and os.path.isdir(carpeta) else None
+
+def tipo_archivo(ruta):
+    """'migracion' para los listados de objetos a migrar, 'proyectos' para el resto (None si no es un .xlsx)."""
+    nombre = os.path.basename(ruta)
+    if not nombre.lower().endswith(".xlsx") or nombre.startswith("~$"):
+        return None
+    return "migracion" if PATRON_LISTADO.search(nombre) else "proyectos"
+
+def derivados_proyectos(df, hash_contenido):
+    """Todos los artefactos derivados de la exportación de proyectos, ya calculados.
+
+    El grafo queda guardado con el hash del archivo como clave: la primera
+    vista de cada dashboard lo encuentra en caché.
+    """
+    return precalculo.precalcular_proyectos(df, hash_contenido).valores()
+
+# Por tipo: lectura del archivo (se comparte entre procesos) y artefactos derivados (por proceso)
+LECTORES = {"proyectos": (leer_proyectos, derivados_proyectos), "migracion": (leer_migracion, None)}
+
+# Un vigilante por carpeta y por proceso, compartido por todas las sesiones
+_VIGILANTES = {}
+_LOCK_VIGILANTES = threading.Lock()
+
+
+class DatosPublicados:
+    """Una versión leída de un archivo de la carpeta. No se modifica después de publicarse."""
+
+    def __init__(self, tipo, ruta, hash_contenido, version, df, indices, modificado):
+        self.tipo = tipo
+        self.ruta = ruta
+        self.archivo = os.path.basename(ruta)
+        self.hash = hash_contenido
+        self.version = version
+        self.df = df
+        self.indices = indices
+        self.modificado = modificado
+        self.publicado = time.time()
+
+
+class VigilanteCarpeta:
+    """Vigila la carpeta y publica la última versión leída de cada tipo de archivo."""
+
+    def __init__(self, carpeta, lectores=LECTORES, espera=ESPERA_ESTABLE):
+        self.carpeta = carpeta
+        self.lectores = lectores
+        self.espera = espera
+        self.errores = {}
+        self._publicados = {}
+        self._lock = threading.Lock()
+        self._cola = queue.Queue()
+        self._versiones = 0
+        # (ruta, fecha de modificación) -> intentos fallidos; si el archivo cambia se empieza de nuevo
+        self._intentos = {}
+        self._observador = None
+        self._hilo = None
+
+    def iniciar(self):
+        """Arranca watchdog, encola los archivos que ya están en la carpeta y arranca el hilo lector.
+
+        watchdog arranca antes de listar la carpeta para no perder un archivo
+        que llegue en el medio; si queda encolado dos veces, _ultimos_por_tipo
+        y el hash lo leen una sola vez.
+        """
+        observers = dependencias.importar("watchdog.observers")
+        events = dependencias.importar("watchdog.events")
+        cola = self._cola
+
+        class Manejador(events.FileSystemEventHandler):
+            def on_created(self, evento):
+                if not evento.is_directory:
+                    cola.put(evento.src_path)
+
+            def on_modified(self, evento):
+                if not evento.is_directory:
+                    cola.put(evento.src_path)
+
+            def on_moved(self, evento):
+                if not evento.is_directory:
+                    cola.put(evento.dest_path)
+
+        self._observador = observers.Observer()
+        self._observador.schedule(Manejador(), self.carpeta, recursive=False)
+        self._observador.daemon = True
+        self._observador.start()
+        for nombre in os.listdir(self.carpeta):
+            self._cola.put(os.path.join(self.carpeta, nombre))
+        self._hilo = threading.Thread(target=self._procesar_cola, name="carpeta_entrada", daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        if self._observador is not None:
+            self._observador.stop()
+        self._cola.put(None)
+
+    def actual(self, tipo):
+        """Última versión publicada del tipo (None si todavía no hay ninguna)."""
+        return self._publicados.get(tipo)
+
+    def pendientes(self):
+        """Archivos esperando a ser leídos."""
+        return self._cola.qsize()
+
+    def _esperar_estable(self, ruta):
+        """Espera a que el archivo deje de crecer (copia en curso); False si desapareció."""
+        try:
+            tamanio = os.path.getsize(ruta)
+            while True:
+                time.sleep(self.espera)
+                nuevo = os.path.getsize(ruta)
+                if nuevo == tamanio:
+                    return True
+                tamanio = nuevo
+        except OSError:
+            return False
+
+    def _ultimos_por_tipo(self, primera):
+        """Junta los eventos encolados y se queda con el archivo más reciente de cada tipo."""
+        rutas = [primera]
+        while True:
+            try:
+                rutas.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+        ultimos = {}
+        for ruta in rutas:
+            if ruta is None:
+                return None
+            tipo = tipo_archivo(ruta)
+            if tipo is None or not os.path.isfile(ruta):
+                continue
+            modificado = os.path.getmtime(ruta)
+            if tipo not in ultimos or modificado >= ultimos[tipo][1]:
+                ultimos[tipo] = (ruta, modificado)
+        return ultimos
+
+    def _procesar_cola(self):
+        while True:
+            ultimos = self._ultimos_por_tipo(self._cola.get())
+            if ultimos is None:
+                return
+            for tipo, (ruta, _) in ultimos.items():
+                if self._esperar_estable(ruta):
+                    self._cargar(tipo, ruta)
+
+    def _reintentar(self, ruta, modificado):
+        """Vuelve a encolar un archivo que falló, con espera creciente (hasta REINTENTOS veces por versión)."""
+        clave = (ruta, modificado)
+        intentos = self._intentos.get(clave, 0) + 1
+        self._intentos[clave] = intentos
+        if intentos > REINTENTOS:
+            return
+        espera = min(REINTENTO_ESPERA * 2 ** (intentos - 1), REINTENTO_ESPERA_MAXIMA)
+        temporizador = threading.Timer(espera, self._cola.put, args=(ruta,))
+        temporizador.daemon = True
+        temporizador.start()
+
+    def _cargar(self, tipo, ruta):
+        nombre = os.path.basename(ruta)
+        modificado = None
+        try:
+            modificado = os.path.getmtime(ruta)
+            publicado = self._publicados.get(tipo)
+            # Un archivo más viejo que el publicado no lo reemplaza
+            if publicado is not None and modificado < publicado.modificado:
+                return
+            hash_contenido = hash_archivo(ruta)
+            if publicado is not None and hash_contenido == publicado.hash:
+                return
+            leer, derivar = self.lectores[tipo]
+            df, sello = memoria_compartida.cargar(tipo, ruta, hash_contenido, leer)
+            indices = derivar(df, hash_contenido) if derivar is not None else {}
+        except Exception as e:
+            self.errores[nombre] = str(e)
+            if modificado is not None:
+                self._reintentar(ruta, modificado)
+            return
+        self.errores.pop(nombre, None)
+        self._intentos = {clave: intentos for clave, intentos in self._intentos.items() if clave[0] != ruta}
+        with self._lock:
+            self._versiones += 1
+            # Compartida entre procesos, el número de versión es el del sello (el mismo en todas las réplicas)
+            version = sello["version"] if sello is not None else self._versiones
+            # Publicación atómica: las sesiones ven la versión anterior o la nueva completa
+            self._publicados[tipo] = DatosPublicados(tipo, ruta, hash_contenido, version, df, indices, modificado)
+
+
+def vigilante(carpeta):
+    """Vigilante de la carpeta para este proceso (lo arranca la primera sesión que lo pide)."""
+    carpeta = os.path.abspath(carpeta)
+    with _LOCK_VIGILANTES:
+        if carpeta not in _VIGILANTES:
+            _VIGILANTES[carpeta] = VigilanteCarpeta(carpeta).iniciar()
+        return _VIGILANTES[carpeta]
+
+def datos_publicados(tipo):
+    """Versión publicada del tipo en la carpeta configurada (None si no hay carpeta o todavía no se leyó nada)."""
+    carpeta = carpeta_configurada()
+    if carpeta is None:
+        return None
+    return vigilante(carpeta).actual(tipo)
+
+def mostrar_origen(datos):
+    """Informa en la barra lateral el archivo publicado y avisa cuando cambió desde el rerun anterior."""
+    import streamlit as st
+    st.sidebar.info(f"📂 {datos.archivo} (versión {datos.version}, {time.strftime('%d/%m %H:%M', time.localtime(datos.publicado))})")
+    clave = f"version_carpeta_{datos.tipo}"
+    if st.session_state.get(clave) not in (None, datos.version):
+        st.toast(f"Se cargó una nueva versión: {datos.archivo}", icon="🔄")
+    st.session_state[clave] = datos.version
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vigila una carpeta e informa cada versión publicada.")
+    parser.add_argument("carpeta")
+    args = parser.parse_args()
+    observador = VigilanteCarpeta(args.carpeta).iniciar()
+    vistos = {}
+    try:
+        while True:
+            for tipo in TIPOS:
+                datos = observador.actual(tipo)
+                if datos is not None and vistos.get(tipo) != datos.version:
+                    vistos[tipo] = datos.version
+                    print(f"{tipo}: versión {datos.version} desde {datos.archivo} ({len(datos.df)} filas)")
+            for nombre, error in list(observador.errores.items()):
+                print(f"No se pudo leer {nombre}: {error}")
+                observador.errores.pop(nombre, None)
+            time.sleep(1)
+    except KeyboardInterrupt:
+        observador.detener()
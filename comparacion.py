@@ -0,0 +1,132 @@
+"""Comparación semana contra semana de dos exportaciones de proyectos.
+
+Las dos exportaciones (ya procesadas con procesar_proyectos) se cruzan por una
+clave de proyecto con un hash join (tabla hash del índice de pandas, sin
+ordenar). Los cambios se calculan columna por columna sobre los arreglos
+completos, sin recorrer filas, y la matriz de transiciones de estado se arma
+con un crosstab.
+"""
+import pandas as pd
+
+from procesamiento import ordenar_estados
+
+# Columnas cuyos cambios se reportan
+COLUMNAS_COMPARADAS = ["estado_actual", "asignatario", "fecha_fin", "fecha_pasaje_prod"]
+
+# Columnas que se muestran junto a los proyectos nuevos/eliminados
+COLUMNAS_IDENTIFICACION = ["clave", "nombre", "estado_actual", "jefatura", "asignatario"]
+
+
+def _codigo(df):
+    """codigo_proyecto con el código de estabilización adelante si lo tiene (NA si no hay código)."""
+    codigo = df["codigo_proyecto"].astype("string")
+    estabilizacion = df["codigo_estabilizacion"].astype("string")
+    return codigo.where(estabilizacion.isna(), estabilizacion + "-" + codigo)
+
+def codigos_repetidos(*dfs):
+    """Códigos que se repiten dentro de alguna de las exportaciones."""
+    repetidos = set()
+    for df in dfs:
+        codigo = _codigo(df).dropna()
+        repetidos.update(codigo[codigo.duplicated()].unique())
+    return repetidos
+
+def clave_proyecto(df, repetidos=()):
+    """Clave de cruce: el código del proyecto o, si no tiene, el nombre.
+
+    A los códigos de `repetidos` (ver codigos_repetidos, calculado sobre ambas
+    exportaciones para que la clave sea la misma en las dos) se les agrega el
+    nombre; si aun así la clave se repite se numera la repetición (#2, #3...)
+    para no perder filas en el cruce.
+    """
+    nombre = df["nombre"].astype("string").str.strip()
+    clave = _codigo(df)
+    if repetidos:
+        clave = clave.where(~clave.isin(list(repetidos)), clave + "|" + nombre)
+    clave = clave.fillna(nombre).fillna("")
+    repeticion = clave.groupby(clave, sort=False).cumcount()
+    return clave.where(repeticion == 0, clave + "#" + (repeticion + 1).astype("string"))
+
+def _preparar(df, repetidos):
+    columnas = [c for c in dict.fromkeys(COLUMNAS_IDENTIFICACION[1:] + COLUMNAS_COMPARADAS) if c in df.columns]
+    preparado = df[columnas].copy()
+    preparado.insert(0, "clave", clave_proyecto(df, repetidos).to_numpy())
+    return preparado
+
+def _distintos(anterior, actual):
+    """Máscara de valores distintos; dos vacíos (NaN/NaT/None) se consideran iguales."""
+    vacio_anterior = anterior.isna()
+    vacio_actual = actual.isna()
+    return (vacio_anterior != vacio_actual) | (~vacio_anterior & ~vacio_actual & (anterior != actual))
+
+def comparar_exportaciones(df_anterior, df_actual):
+    """Cruza dos exportaciones procesadas y devuelve los cambios.
+
+    Devuelve un dict con:
+      - 'nuevos': proyectos que aparecen solo en la exportación actual
+      - 'eliminados': proyectos que aparecen solo en la anterior
+      - 'cambios': un registro por proyecto con al menos un cambio, con las
+        columnas <col>_anterior / <col>_actual y una columna booleana
+        'cambio_<col>' por cada columna comparada
+      - 'resumen': cantidad de proyectos con cambio por columna
+      - 'transiciones': matriz estado anterior (filas) -> estado actual (columnas)
+    """
+    repetidos = codigos_repetidos(df_anterior, df_actual)
+    anterior = _preparar(df_anterior, repetidos)
+    actual = _preparar(df_actual, repetidos)
+    # Hash join: las claves son únicas en cada exportación, así que basta con
+    # buscar la posición de cada clave en la tabla hash del índice de la otra
+    posicion_actual = pd.Index(actual["clave"]).get_indexer(anterior["clave"])
+    posicion_anterior = pd.Index(anterior["clave"]).get_indexer(actual["clave"])
+
+    identificacion = [c for c in COLUMNAS_IDENTIFICACION if c in actual.columns]
+    nuevos = actual.loc[posicion_anterior == -1, identificacion]
+    identificacion = [c for c in COLUMNAS_IDENTIFICACION if c in anterior.columns]
+    eliminados = anterior.loc[posicion_actual == -1, identificacion]
+
+    en_ambas = posicion_actual != -1
+    izquierda = anterior[en_ambas].reset_index(drop=True)
+    derecha = actual.iloc[posicion_actual[en_ambas]].reset_index(drop=True)
+    comunes = pd.concat(
+        [izquierda[["clave"]],
+         izquierda.drop(columns="clave").add_suffix("_anterior"),
+         derecha.drop(columns="clave").add_suffix("_actual")],
+        axis=1,
+    )
+    columnas = [c for c in COLUMNAS_COMPARADAS if f"{c}_anterior" in comunes.columns and f"{c}_actual" in comunes.columns]
+    for columna in columnas:
+        comunes[f"cambio_{columna}"] = _distintos(comunes[f"{columna}_anterior"], comunes[f"{columna}_actual"])
+    marcas = [f"cambio_{c}" for c in columnas]
+    con_cambio = comunes[marcas].any(axis=1) if marcas else pd.Series(False, index=comunes.index)
+    cambios = comunes[con_cambio].reset_index(drop=True)
+
+    resumen = pd.DataFrame({
+        "Columna": columnas,
+        "Proyectos con cambio": [int(comunes[m].sum()) for m in marcas],
+    })
+    return {
+        "nuevos": nuevos.reset_index(drop=True),
+        "eliminados": eliminados.reset_index(drop=True),
+        "cambios": cambios,
+        "resumen": resumen,
+        "transiciones": matriz_transiciones(comunes),
+    }
+
+def matriz_transiciones(comunes, incluir_sin_cambio=True):
+    """Crosstab estado anterior -> estado actual de los proyectos presentes en ambas exportaciones."""
+    desde = comunes["estado_actual_anterior"].fillna("(vacío)").astype(str)
+    hacia = comunes["estado_actual_actual"].fillna("(vacío)").astype(str)
+    if not incluir_sin_cambio:
+        distinto = desde != hacia
+        desde, hacia = desde[distinto], hacia[distinto]
+    matriz = pd.crosstab(desde.rename("Estado anterior"), hacia.rename("Estado actual"))
+    return matriz.reindex(
+        index=ordenar_estados(matriz.index), columns=ordenar_estados(matriz.columns), fill_value=0
+    )
+
+def detalle_cambios(cambios, columna):
+    """Proyectos que cambiaron una columna: clave, nombre y valor anterior/actual."""
+    filtro = cambios[cambios[f"cambio_{columna}"]]
+    return filtro[["clave", "nombre_actual", f"{columna}_anterior", f"{columna}_actual"]].rename(
+        columns={"nombre_actual": "nombre"}
+    ).reset_index(drop=True)
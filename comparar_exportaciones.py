@@ -0,0 +1,120 @@
+import time
+_inicio_importaciones = time.perf_counter()
+import streamlit as st
+from io import BytesIO
+import dependencias
+import exportacion
+import instrumentacion
+from procesamiento import leer_proyectos
+from comparacion import comparar_exportaciones, detalle_cambios, matriz_transiciones, COLUMNAS_COMPARADAS
+dependencias.registrar_imports_script("comparar_exportaciones", _inicio_importaciones)
+
+# Plotly se importa recién al construir el primer gráfico
+px = dependencias.ModuloPerezoso("plotly.express")
+
+st.set_page_config(page_title="Comparación de Exportaciones", page_icon="🔀", layout="wide")
+# Tiempos por etapa de este rerun
+traza = instrumentacion.Traza("comparar_exportaciones")
+st.title("🔀 Comparación semanal de exportaciones de proyectos")
+
+# Verificar dependencias sin instalar nada en tiempo de ejecución
+try:
+    dependencias.verificar("openpyxl", "plotly")
+except dependencias.DependenciaFaltante as e:
+    st.error(str(e))
+    st.stop()
+
+
+@st.cache_data(show_spinner="Leyendo exportación...", max_entries=4)
+def leer_exportacion(contenido):
+    """Lee y procesa una exportación; se cachea por contenido del archivo."""
+    dependencias.importar("openpyxl")
+    return leer_proyectos(BytesIO(contenido))
+
+
+col_anterior, col_actual = st.columns(2)
+archivo_anterior = col_anterior.file_uploader("Exportación anterior", type=["xlsx"], key="exportacion_anterior")
+archivo_actual = col_actual.file_uploader("Exportación actual", type=["xlsx"], key="exportacion_actual")
+
+if archivo_anterior is not None and archivo_actual is not None:
+    try:
+        with traza.etapa("lectura") as registro:
+            df_anterior = leer_exportacion(archivo_anterior.getvalue())
+            df_actual = leer_exportacion(archivo_actual.getvalue())
+            registro["filas"] = len(df_anterior) + len(df_actual)
+
+        with traza.etapa("comparación", filas=len(df_anterior) + len(df_actual)):
+            resultado = comparar_exportaciones(df_anterior, df_actual)
+        cambios = resultado["cambios"]
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Proyectos anteriores", len(df_anterior))
+        col2.metric("Proyectos actuales", len(df_actual), len(df_actual) - len(df_anterior))
+        col3.metric("Nuevos", len(resultado["nuevos"]))
+        col4.metric("Eliminados", len(resultado["eliminados"]))
+
+        st.subheader("Proyectos con cambios por columna")
+        st.dataframe(resultado["resumen"], use_container_width=True, hide_index=True)
+
+        tab_transiciones, tab_cambios, tab_nuevos, tab_eliminados = st.tabs(
+            ["Transiciones de estado", "Cambios", "Nuevos", "Eliminados"]
+        )
+
+        with tab_transiciones, traza.etapa("pestaña:Transiciones de estado", filas=len(cambios)):
+            solo_cambios = st.checkbox("Ocultar proyectos que no cambiaron de estado", key="solo_transiciones")
+            if solo_cambios:
+                # La matriz sin la diagonal sale de los proyectos con cambio de estado
+                matriz = matriz_transiciones(cambios, incluir_sin_cambio=False)
+            else:
+                matriz = resultado["transiciones"]
+            if matriz.empty:
+                st.info("No hay transiciones de estado entre ambas exportaciones.")
+            else:
+                with traza.etapa("gráfico:transiciones"):
+                    fig = px.imshow(
+                        matriz,
+                        text_auto=True,
+                        aspect="auto",
+                        color_continuous_scale=px.colors.sequential.Viridis,
+                        labels={"x": "Estado actual", "y": "Estado anterior", "color": "Proyectos"},
+                        title="Transiciones de estado (anterior → actual)",
+                    )
+                    st.plotly_chart(fig, use_container_width=True, key="transiciones")
+                st.dataframe(matriz, use_container_width=True)
+                exportacion.boton_descarga(matriz.reset_index(), "transiciones_estado", key="descarga_transiciones")
+
+        with tab_cambios, traza.etapa("pestaña:Cambios", filas=len(cambios)):
+            columna = st.selectbox("Columna", COLUMNAS_COMPARADAS, key="columna_cambios")
+            if f"cambio_{columna}" not in cambios.columns:
+                st.info(f"La columna '{columna}' no está en ambas exportaciones.")
+            else:
+                detalle = detalle_cambios(cambios, columna)
+                st.write(f"{len(detalle)} proyectos cambiaron '{columna}'.")
+                st.dataframe(detalle, use_container_width=True, hide_index=True)
+                exportacion.boton_descarga(detalle, f"cambios_{columna}", key="descarga_cambios")
+
+        with tab_nuevos, traza.etapa("pestaña:Nuevos", filas=len(resultado["nuevos"])):
+            st.dataframe(resultado["nuevos"], use_container_width=True, hide_index=True)
+            exportacion.boton_descarga(resultado["nuevos"], "proyectos_nuevos", key="descarga_nuevos")
+
+        with tab_eliminados, traza.etapa("pestaña:Eliminados", filas=len(resultado["eliminados"])):
+            st.dataframe(resultado["eliminados"], use_container_width=True, hide_index=True)
+            exportacion.boton_descarga(resultado["eliminados"], "proyectos_eliminados", key="descarga_eliminados")
+
+    except Exception as e:
+        st.error(f"Ocurrió un error al comparar las exportaciones: {e}")
+        error = traza.error()
+        with st.expander("Detalle técnico del error"):
+            if error:
+                st.write(f"Etapa: {error['etapa']}")
+            st.exception(e)
+else:
+    st.info("Sube la exportación anterior y la actual para compararlas.")
+
+# --- Costos de importación (arranque en frío) ---
+with st.sidebar.expander("⏱️ Tiempos de importación"):
+    st.dataframe(dependencias.resumen_tiempos(), use_container_width=True, hide_index=True)
+
+# --- Tiempos por etapa del rerun ---
+instrumentacion.mostrar_panel(traza)
+traza.guardar()
@@ -0,0 +1,241 @@
+"""Consultas sobre un dataset con motores intercambiables: pandas o DuckDB.
+
+Las vistas piden filtrar, contar, agrupar, cruzar y top-N con condiciones
+declarativas (columna, operador, valor) combinadas con AND. Cada motor las
+traduce a su manera: ConsultaPandas a máscaras booleanas sobre el DataFrame y
+ConsultaDuckDB a SQL con parámetros sobre la tabla Arrow (sin copiarla) o un
+Parquet, con las agregaciones en varios hilos. Los dos devuelven los mismos
+resultados; paridad_consultas.py lo verifica.
+
+Ejemplo:
+    consulta = crear_consulta(df, "duckdb")
+    consulta.contar([("estado_actual", "en", ESTADOS_IMPLEMENTADOS)])
+    consulta.agrupar(["Gerencia_Principal", "implementado"], [("Gerencia_Principal", "no_vacio")])
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import dependencias
+from vistas_arrow import a_arrow
+
+SIN_DATO = "(Sin dato)"
+COLUMNA_CANTIDAD = "Cantidad"
+
+# Operadores de las condiciones (columna, operador[, valor])
+OPERADORES = [
+    "==", "!=", "<", "<=", ">", ">=",   # valor escalar; los nulos no cumplen
+    "en", "no_en",                      # valor: lista; los nulos no cumplen ninguna
+    "nulo", "no_nulo",                  # sin valor
+    "vacio", "no_vacio",                # nulo o texto en blanco
+    "contiene",                         # subcadena sin distinguir mayúsculas
+]
+
+
+def _condicion(condicion):
+    columna, operador, *valor = condicion
+    if operador not in OPERADORES:
+        raise ValueError(f"Operador desconocido: {operador}")
+    return columna, operador, valor[0] if valor else None
+
+
+class Consulta:
+    """Operaciones comunes a los motores; cada motor implementa filtrar, contar, agrupar y top."""
+
+    def cruzar(self, filas, columnas, condiciones=()):
+        """Tabla filas x columnas con la cantidad de cada combinación (0 si no hay)."""
+        grupos = self.agrupar([filas, columnas], condiciones)
+        tabla = grupos.pivot(index=filas, columns=columnas, values=COLUMNA_CANTIDAD)
+        return tabla.fillna(0).astype(np.int64)
+
+
+# --- Motor pandas ---
+def _es_texto(serie):
+    """Texto o categoría: en los grupos sus nulos se muestran como SIN_DATO."""
+    return (pd.api.types.is_string_dtype(serie.dtype) or serie.dtype == object
+            or isinstance(serie.dtype, pd.CategoricalDtype))
+
+def _mascara_pandas(serie, operador, valor):
+    if operador == "nulo":
+        return serie.isna()
+    if operador == "no_nulo":
+        return serie.notna()
+    if operador in ("vacio", "no_vacio"):
+        vacio = serie.isna() | serie.astype("string").str.strip().eq("").fillna(False)
+        return vacio if operador == "vacio" else ~vacio
+    if operador == "contiene":
+        return serie.astype("string").str.lower().str.contains(str(valor).lower(), regex=False)
+    if operador == "en":
+        return serie.isin(valor)
+    if operador == "no_en":
+        return serie.notna() & ~serie.isin(valor)
+    comparaciones = {
+        "==": serie.__eq__, "!=": serie.__ne__, "<": serie.__lt__,
+        "<=": serie.__le__, ">": serie.__gt__, ">=": serie.__ge__,
+    }
+    return serie.notna() & comparaciones[operador](valor)
+
+
+class ConsultaPandas(Consulta):
+    """Motor pandas: máscaras booleanas y groupby sobre el DataFrame."""
+
+    motor = "pandas"
+
+    def __init__(self, df):
+        self.df = df
+
+    def mascara(self, condiciones=()):
+        mascara = np.ones(len(self.df), dtype=bool)
+        for condicion in condiciones:
+            columna, operador, valor = _condicion(condicion)
+            resultado = _mascara_pandas(self.df[columna], operador, valor)
+            mascara &= pd.Series(resultado, index=self.df.index).fillna(False).to_numpy(dtype=bool)
+        return mascara
+
+    def filtrar(self, condiciones=(), columnas=None):
+        """Filas que cumplen las condiciones, en su orden original."""
+        filas = self.df[self.mascara(condiciones)]
+        return filas if columnas is None else filas[columnas]
+
+    def contar(self, condiciones=()):
+        return int(self.mascara(condiciones).sum())
+
+    def agrupar(self, columnas, condiciones=()):
+        """Cantidad de filas por combinación de valores (nulos de texto como SIN_DATO), ordenado por las columnas."""
+        filas = self.df.loc[self.mascara(condiciones), columnas]
+        claves = {
+            columna: filas[columna].astype("string").fillna(SIN_DATO).astype(object) if _es_texto(filas[columna]) else filas[columna]
+            for columna in columnas
+        }
+        grupos = pd.DataFrame(claves).groupby(columnas, dropna=False, sort=False).size()
+        grupos = grupos.rename(COLUMNA_CANTIDAD).reset_index()
+        grupos[COLUMNA_CANTIDAD] = grupos[COLUMNA_CANTIDAD].astype(np.int64)
+        return grupos.sort_values(columnas, kind="stable", na_position="last").reset_index(drop=True)
+
+    def top(self, columna, n=10, condiciones=()):
+        """Los n valores más frecuentes (empates por valor ascendente)."""
+        grupos = self.agrupar([columna], condiciones)
+        grupos = grupos.sort_values([COLUMNA_CANTIDAD, columna], ascending=[False, True], kind="stable")
+        return grupos.head(n).reset_index(drop=True)
+
+
+# --- Motor DuckDB ---
+def _identificador(columna):
+    return '"' + str(columna).replace('"', '""') + '"'
+
+def _sql_condicion(columna, operador, valor, parametros):
+    """Fragmento SQL de una condición; agrega los valores a parametros."""
+    c = _identificador(columna)
+    if operador == "nulo":
+        return f"{c} IS NULL"
+    if operador == "no_nulo":
+        return f"{c} IS NOT NULL"
+    if operador in ("vacio", "no_vacio"):
+        vacio = f"({c} IS NULL OR trim(CAST({c} AS VARCHAR)) = '')"
+        return vacio if operador == "vacio" else f"NOT {vacio}"
+    if operador == "contiene":
+        parametros.append(str(valor).lower())
+        return f"coalesce(contains(lower(CAST({c} AS VARCHAR)), ?), false)"
+    if operador in ("en", "no_en"):
+        valores = list(valor)
+        if not valores:
+            return "false" if operador == "en" else f"{c} IS NOT NULL"
+        parametros.extend(valores)
+        lista = ", ".join("?" * len(valores))
+        return f"{c} IN ({lista})" if operador == "en" else f"({c} IS NOT NULL AND {c} NOT IN ({lista}))"
+    parametros.append(valor)
+    return f"{c} {'=' if operador == '==' else operador} ?"
+
+
+class ConsultaDuckDB(Consulta):
+    """Motor DuckDB: SQL sobre la tabla Arrow registrada (o un Parquet), en varios hilos.
+
+    fuente puede ser un DataFrame (se pasa a Arrow sin copiar el texto Arrow),
+    una pa.Table o la ruta de un Parquet. La conexión no admite consultas
+    simultáneas: las sesiones se turnan con un lock y cada consulta usa todos
+    los hilos configurados. La tabla lleva la posición de cada fila (columna
+    _COLUMNA_FILA) para que filtrar devuelva las filas en su orden original:
+    DuckDB no garantiza el orden de un SELECT sin ORDER BY.
+    """
+
+    motor = "duckdb"
+    _COLUMNA_FILA = "__fila"
+
+    def __init__(self, fuente, hilos=None):
+        duckdb = dependencias.importar("duckdb")
+        self._con = duckdb.connect(config={"threads": hilos} if hilos else {})
+        self._lock = threading.Lock()
+        if isinstance(fuente, str):
+            ruta = fuente.replace("'", "''")
+            self._con.execute(f"CREATE VIEW datos AS SELECT * EXCLUDE (file_row_number), file_row_number AS {self._COLUMNA_FILA}"
+                              f" FROM read_parquet('{ruta}', file_row_number = true)")
+        else:
+            if isinstance(fuente, pd.DataFrame):
+                fuente = a_arrow(fuente)
+            # append_column no copia las demás columnas
+            fuente = fuente.append_column(self._COLUMNA_FILA, pa.array(np.arange(fuente.num_rows, dtype=np.int64)))
+            self._tabla = fuente
+            self._con.register("datos", fuente)
+        tipos = self._con.execute("SELECT column_name, column_type FROM (DESCRIBE datos)").fetchall()
+        # Texto y categorías (ENUM): en los grupos sus nulos se muestran como SIN_DATO
+        self._texto = {columna for columna, tipo in tipos if tipo == "VARCHAR" or tipo.startswith("ENUM")}
+
+    def _consultar(self, sql, parametros):
+        with self._lock:
+            return self._con.execute(sql, parametros).df()
+
+    def _where(self, condiciones, parametros):
+        partes = [_sql_condicion(*_condicion(condicion), parametros) for condicion in condiciones]
+        return f" WHERE {' AND '.join(partes)}" if partes else ""
+
+    def filtrar(self, condiciones=(), columnas=None):
+        """Filas que cumplen las condiciones, en su orden original."""
+        parametros = []
+        seleccion = ", ".join(_identificador(c) for c in columnas) if columnas else f"* EXCLUDE ({self._COLUMNA_FILA})"
+        return self._consultar(f"SELECT {seleccion} FROM datos{self._where(condiciones, parametros)}"
+                               f" ORDER BY {self._COLUMNA_FILA}", parametros)
+
+    def contar(self, condiciones=()):
+        parametros = []
+        return int(self._consultar(f"SELECT count(*) AS n FROM datos{self._where(condiciones, parametros)}", parametros)["n"].iloc[0])
+
+    def _clave(self, columna):
+        c = _identificador(columna)
+        return f"coalesce(CAST({c} AS VARCHAR), '{SIN_DATO}') AS {c}" if columna in self._texto else c
+
+    def agrupar(self, columnas, condiciones=()):
+        """Cantidad de filas por combinación de valores (nulos de texto como SIN_DATO), ordenado por las columnas."""
+        parametros = []
+        claves = ", ".join(self._clave(c) for c in columnas)
+        orden = ", ".join(f"{i + 1} NULLS LAST" for i in range(len(columnas)))
+        sql = (f"SELECT {claves}, count(*) AS {COLUMNA_CANTIDAD} FROM datos{self._where(condiciones, parametros)}"
+               f" GROUP BY ALL ORDER BY {orden}")
+        grupos = self._consultar(sql, parametros)
+        grupos[COLUMNA_CANTIDAD] = grupos[COLUMNA_CANTIDAD].astype(np.int64)
+        return grupos
+
+    def top(self, columna, n=10, condiciones=()):
+        """Los n valores más frecuentes (empates por valor ascendente)."""
+        parametros = []
+        sql = (f"SELECT {self._clave(columna)}, count(*) AS {COLUMNA_CANTIDAD} FROM datos{self._where(condiciones, parametros)}"
+               f" GROUP BY ALL ORDER BY {COLUMNA_CANTIDAD} DESC, 1 ASC NULLS LAST LIMIT {int(n)}")
+        grupos = self._consultar(sql, parametros)
+        grupos[COLUMNA_CANTIDAD] = grupos[COLUMNA_CANTIDAD].astype(np.int64)
+        return grupos
+
+
+MOTORES = {"pandas": ConsultaPandas, "duckdb": ConsultaDuckDB}
+
+def motores_disponibles():
+    """Motores que se pueden usar en este entorno (DuckDB es opcional)."""
+    return [motor for motor in MOTORES if motor == "pandas" or not dependencias.faltantes(motor)]
+
+def crear_consulta(fuente, motor="pandas"):
+    """Consulta sobre fuente con el motor pedido (DuckDB también acepta la ruta de un Parquet)."""
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de consultas desconocido: {motor}")
+    if motor == "pandas" and isinstance(fuente, str):
+        fuente = pd.read_parquet(fuente)
+    return MOTORES[motor](fuente)
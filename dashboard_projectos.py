@@ -1,109 +1,78 @@
+import time
+_inicio_importaciones = time.perf_counter()
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import re
 from io import BytesIO
-import subprocess
-import sys
-
-# Función para instalar dependencias faltantes
-def install(package):
-    subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-
-try:
-    import openpyxl
-except ImportError:
-    st.warning("openpyxl no está instalado. Instalando...")
-    install("openpyxl")
-    import openpyxl
-    st.success("openpyxl instalado correctamente!")
+import pandas as pd
+import dependencias
+import exportacion
+import instrumentacion
+import precalculo
+import pronostico
+import reglas_calidad
+import vistas_arrow
+from busqueda import COLUMNAS_BUSQUEDA
+from indice_bitmap import COLUMNAS_FILTRO, COLUMNAS_MULTIVALOR
+from secciones import Secciones, fragmento
+from carpeta_entrada import carpeta_configurada, datos_publicados, mostrar_origen
+from procesamiento import (
+    leer_proyectos, jefaturas_por_defecto, REGLAS_PROYECTOS
+)
+dependencias.registrar_imports_script("dashboard_projectos", _inicio_importaciones)
+
+# Plotly se importa recién al construir el primer gráfico
+px = dependencias.ModuloPerezoso("plotly.express")
 
 # Configurar la página
 st.set_page_config(page_title="Dashboard Proyectos", page_icon="📊", layout="wide")
+# Tiempos por etapa de este rerun
+traza = instrumentacion.Traza("dashboard_projectos")
 st.title("📊 Dashboard de Proyectos - Core Bancario")
 
-# Funciones de procesamiento de datos
-def limpiar_espacios_guion(nombre):
-    """Elimina los espacios alrededor del guion en una cadena."""
-    if isinstance(nombre, str):
-        return re.sub(r"\s*-\s*", "-", nombre.lstrip())
-    return nombre
-
-def extraer_codigos(nombre):
-    """Extrae Codigo_Proyecto y Codigo_Estabilizacion del nombre."""
-    codigo_proyecto = None
-    codigo_estabilizacion = None
-    if isinstance(nombre, str):
-        nombre_sin_espacios_iniciales = nombre.lstrip()
-        match_estabilizacion = re.search(r"^(E\d+)", nombre_sin_espacios_iniciales)
-        if match_estabilizacion:
-            codigo_estabilizacion = match_estabilizacion.group(1)
-            nombre_restante = nombre_sin_espacios_iniciales[len(match_estabilizacion.group(1)):].lstrip("- ").lstrip()
-        else:
-            nombre_restante = nombre_sin_espacios_iniciales
-
-        match_proyecto = re.search(r"([PMANAI]\d+/\d+)", nombre_restante)
-        if match_proyecto:
-            codigo_proyecto = match_proyecto.group(1)
-
-    return pd.Series([codigo_proyecto, codigo_estabilizacion])
-
-def clasificar(nombre):
-    if isinstance(nombre, str):
-        nombre_sin_espacios = nombre.lstrip()
-        if nombre_sin_espacios.startswith("E"):
-            return "Estabilización"
-        elif nombre_sin_espacios.startswith("I"):
-            return "Incidente"
-        elif nombre_sin_espacios.startswith("P"):
-            return "Proyecto"
-        elif nombre_sin_espacios.startswith("M"):
-            return "Mantenimiento"
-        elif nombre_sin_espacios.startswith("A"):
-            return "Auditoria"
-        elif nombre_sin_espacios.startswith("N"):
-            return "Normativo"
-        else:
-            return "Otro"
-    return "Otro"
+# Verificar dependencias sin instalar nada en tiempo de ejecución
+try:
+    dependencias.verificar("openpyxl", "plotly")
+except dependencias.DependenciaFaltante as e:
+    st.error(str(e))
+    st.stop()
+
+
+@st.cache_resource(show_spinner="Leyendo el archivo de proyectos...", max_entries=4)
+def leer_exportacion(contenido):
+    """Lee y procesa la exportación una sola vez por contenido del archivo; no se modifica, se comparte entre reruns."""
+    dependencias.importar("openpyxl")
+    return leer_proyectos(BytesIO(contenido))
+
 
 # Carga de datos
 uploaded_file = st.file_uploader("Sube el archivo Excel de proyectos", type=["xlsx"])
 
-if uploaded_file is not None:
+# Sin archivo subido se usa la última exportación publicada en la carpeta de entrada
+datos_carpeta = None
+if uploaded_file is None:
     try:
-        # Leer el archivo Excel
-        df = pd.read_excel(uploaded_file, header=3)
-        
-        # Procesamiento de datos
-        df["Nombre"] = df["Nombre"].apply(limpiar_espacios_guion)
-        df[['codigo_proyecto', 'codigo_estabilizacion']] = df['Nombre'].apply(extraer_codigos)
-        df["tipo"] = df["Nombre"].apply(clasificar)
-        
-        # Renombrar columnas para consistencia
-        df = df.rename(columns={
-            "Nombre": "nombre",
-            "Estado Actual": "estado_actual",
-            "Jefatura": "jefatura",
-            "Asignatario predeterminado": "asignatario",
-            "Fecha de inicio": "fecha_inicio",
-            "Fecha de fin": "fecha_fin",
-            "Actualizado por última vez": "actualizado",
-            "Etiquetas": "etiquetas",
-            "Gestor del proyecto": "gestor",
-            "Propietario del proyecto": "propietario",
-            "Gerencia/Unidad": "gerencia",
-            "Fecha Pasaje a Producción": "fecha_pasaje_prod",
-            "Estabilización": "estabilizacion",
-            "Autor": "autor"
-        })
-        
-        # Formatear fechas
-        df['fecha_inicio'] = pd.to_datetime(df['fecha_inicio'], errors='coerce').dt.strftime('%Y-%m-%d')
-        df['fecha_fin'] = pd.to_datetime(df['fecha_fin'], errors='coerce').dt.strftime('%Y-%m-%d')
-        df['actualizado'] = pd.to_datetime(df['actualizado'], errors='coerce')
-        df['fecha_pasaje_prod'] = pd.to_datetime(df['fecha_pasaje_prod'], errors='coerce')
-        
+        datos_carpeta = datos_publicados("proyectos")
+    except dependencias.DependenciaFaltante as e:
+        st.sidebar.warning(str(e))
+
+if uploaded_file is not None or datos_carpeta is not None:
+    try:
+        if datos_carpeta is None:
+            # Leer y procesar el archivo Excel (limpieza, códigos, tipo, renombrado y fechas);
+            # los reruns siguientes con el mismo archivo lo toman de la caché
+            with traza.etapa("lectura") as registro:
+                df = leer_exportacion(uploaded_file.getvalue())
+                registro["filas"] = len(df)
+        else:
+            # Ya leída y precalculada en segundo plano; no se modifica, se comparte entre sesiones
+            df = datos_carpeta.df
+            mostrar_origen(datos_carpeta)
+        # Identifica los datos para reutilizar las tablas Arrow de las vistas y los artefactos precalculados
+        origen = uploaded_file.file_id if datos_carpeta is None else datos_carpeta.hash
+
+        # Índices, máscaras de indicadores y reglas de calidad en paralelo (ver precalculo.py);
+        # cada uno se espera recién donde se usa
+        precalculado = precalculo.precalcular_proyectos(df, origen, precalculo.NODOS_DASHBOARD)
+
         # Mostrar estadísticas básicas
         st.success(f"Datos cargados correctamente. Total de registros: {len(df)}")
         
@@ -117,225 +86,285 @@ if uploaded_file is not None:
             # Filtro por jefatura
             st.subheader("Jefatura")
             jefaturas_unicas = sorted(df['jefatura'].dropna().unique().tolist())
-            default_jefaturas = [j for j in jefaturas_unicas if "Core Bancario" in j]
+            default_jefaturas = jefaturas_por_defecto(df)
             selected_jefaturas = st.multiselect("Selecciona jefaturas:", options=jefaturas_unicas, default=default_jefaturas)
 
+            # Búsqueda por subcadena (índice de trigramas armado al cargar el archivo)
+            st.subheader("Búsqueda")
+            with traza.etapa("índice de búsqueda", filas=len(df)):
+                indice_texto = precalculado["texto"]
+            consulta = st.text_input(
+                "Buscar proyectos",
+                placeholder="Nombre, etiqueta, asignatario, gestor o gerencia",
+                key="busqueda_proyectos",
+            ).strip()
+
+            # Filtros combinados: OR dentro de cada columna, AND u OR entre columnas (bitmaps por valor)
+            st.subheader("Filtros combinados")
+            with traza.etapa("índice de filtros", filas=len(df)):
+                indice_bitmap = precalculado["filtros"]
+            modo_filtros = st.radio("Combinar los filtros con", ["AND", "OR"], horizontal=True,
+                                    format_func={"AND": "Todos (Y)", "OR": "Alguno (O)"}.get, key="modo_filtros")
+            # Los conteos de cada valor son sobre las jefaturas elegidas (popcount del AND de bitmaps).
+            # Van debajo de cada filtro y no en las opciones: Streamlit arma el ID del widget con las
+            # etiquetas, y si cambiaran con las jefaturas se perdería la selección
+            bits_jefaturas = indice_bitmap.desde_mascara(df['jefatura'].isin(selected_jefaturas).to_numpy())
+            selecciones = {}
+            for columna in indice_bitmap.columnas():
+                conteos = indice_bitmap.conteos(columna, bits_jefaturas)
+                selecciones[columna] = st.multiselect(
+                    COLUMNAS_FILTRO[columna],
+                    options=indice_bitmap.valores(columna),
+                    key=f"filtro_{columna}",
+                )
+                if selecciones[columna]:
+                    st.caption(" · ".join(f"{valor}: {conteos[valor]}" for valor in selecciones[columna]))
+                with st.expander(f"Proyectos por {COLUMNAS_FILTRO[columna].lower()}"):
+                    tabla_conteos = pd.DataFrame({COLUMNAS_FILTRO[columna]: list(conteos), "Proyectos": list(conteos.values())})
+                    st.dataframe(tabla_conteos.sort_values("Proyectos", ascending=False, kind="stable"),
+                                 use_container_width=True, hide_index=True)
+            todas_etiquetas = st.checkbox("Exigir todas las etiquetas elegidas", key="filtro_etiquetas_todas")
+
+            # Filtros por rango de fechas (índice ordenado por columna, búsqueda binaria)
+            st.subheader("Fechas")
+            with traza.etapa("índice de fechas", filas=len(df)):
+                indice_fechas = precalculado["fechas"]
+            rangos_fechas = {}
+            for columna, etiqueta in [("fecha_inicio", "Fecha de inicio"), ("fecha_fin", "Fecha de fin"),
+                                      ("fecha_pasaje_prod", "Fecha de pasaje a producción")]:
+                limites = indice_fechas.limites(columna)
+                if limites is None:
+                    continue
+                rango = st.date_input(etiqueta, value=(), min_value=limites[0].date(), max_value=limites[1].date(),
+                                      key=f"rango_{columna}", format="DD/MM/YYYY")
+                # Solo se filtra cuando el rango está completo (desde y hasta)
+                if len(rango) == 2:
+                    rangos_fechas[columna] = rango
+
         # Aplicar los filtros
-        df_filtrado = df[df['jefatura'].isin(selected_jefaturas)]
+        with traza.etapa("filtros") as registro:
+            mascara = df['jefatura'].isin(selected_jefaturas).to_numpy()
+            if rangos_fechas:
+                mascara &= indice_fechas.mascara(rangos_fechas)
+            if consulta:
+                mascara &= indice_texto.mascara(consulta)
+            if any(selecciones.values()):
+                bits = indice_bitmap.combinar(selecciones, modo_filtros, COLUMNAS_MULTIVALOR if todas_etiquetas else ())
+                mascara &= indice_bitmap.mascara(bits)
+            df_filtrado = df[mascara]
+            registro["filas"] = len(df_filtrado)
+
+        # Dibujo progresivo: los indicadores primero; tablas y gráficos en lugares reservados (ver secciones.py)
+        secciones = Secciones(traza)
+
+        # Resultados de la búsqueda (ya combinados con jefatura y fechas)
+        def resultados_busqueda():
+            st.subheader(f"🔎 Resultados para \"{consulta}\" ({len(df_filtrado)})")
+            columnas_busqueda = [c for c in ["nombre", "estado_actual", "jefatura"] + COLUMNAS_BUSQUEDA[1:] if c in df_filtrado.columns]
+            vistas_arrow.mostrar_tabla(df_filtrado[columnas_busqueda], origen, use_container_width=True, hide_index=True)
+            exportacion.boton_descarga(df_filtrado[columnas_busqueda], "busqueda_proyectos", key="descarga_busqueda")
+
+        if consulta:
+            secciones.reservar("resultados de la búsqueda", resultados_busqueda, prioridad=2)
 
         ############# Indicadores Clave en el Contenido Principal ############# 
         selected_indicator = st.session_state.get("selected_indicator", None)
 
-        def display_key_indicator(label, value, key):
-            button_label = f"**{label}**\n({value})"
+        # Los conteos salen de las máscaras precalculadas (suma en las filas filtradas), una vez por rerun completo;
+        # el clic en un indicador solo redibuja la región
+        conteos_indicadores = {}
+
+        def display_key_indicator(label, key):
+            if label not in conteos_indicadores:
+                with traza.etapa(f"indicador:{label}", filas=len(df_filtrado)):
+                    conteos_indicadores[label] = int(precalculado["indicadores"][label].to_numpy()[mascara].sum())
+            button_label = f"**{label}**\n({conteos_indicadores[label]})"
             if st.button(button_label, key=key, use_container_width=True):
                 st.session_state["selected_indicator"] = label
 
-        col_indicador1_1, col_indicador1_2, col_indicador1_3, col_indicador1_4 = st.columns(4) 
-        with col_indicador1_1:
-            display_key_indicator("Total Proyectos", len(df_filtrado) if not df_filtrado.empty else 0, "total_proyectos_button")
-        with col_indicador1_2:
-            display_key_indicator("Finalizados", df_filtrado[df_filtrado['estado_actual'] == 'Finalizado'].shape[0] if not df_filtrado.empty else 0, "finalizado_button")
-        with col_indicador1_3:
-            display_key_indicator("En Estabilización", df_filtrado[df_filtrado['estado_actual'] == 'Estabilización'].shape[0] if not df_filtrado.empty else 0, "estabilizacion_button")
-        with col_indicador1_4:
-            display_key_indicator("Para Comité", df_filtrado[df_filtrado['estado_actual'].str.contains('PROD-Para Comité de Pasajes', na=False)].shape[0] if not df_filtrado.empty else 0, "comite_button")
-
-        col_indicador2_1, col_indicador2_2 = st.columns(2)
-        with col_indicador2_1:
-            display_key_indicator("Análisis Tec (DESA)", df_filtrado[df_filtrado['estado_actual'].str.contains('DESA-Análisis Técnico', na=False)].shape[0] if not df_filtrado.empty else 0, "analisis_button")
-        with col_indicador2_2:
-            display_key_indicator("En Curso (DESA)", df_filtrado[df_filtrado['estado_actual'].str.contains('DESA-En Curso', na=False)].shape[0] if not df_filtrado.empty else 0, "en_curso_button")
-
-        col_indicador3_1, col_indicador3_2 = st.columns(2)
-        with col_indicador3_1:
-            display_key_indicator("En QA", df_filtrado[df_filtrado['estado_actual'].str.contains('QA-En Pruebas QA', na=False)].shape[0] if not df_filtrado.empty else 0, "qa_button")
-        with col_indicador3_2:
-            display_key_indicator("En UAT", df_filtrado[df_filtrado['estado_actual'].str.contains('QA-En Pruebas UAT', na=False)].shape[0] if not df_filtrado.empty else 0, "uat_button")
-
-        col_indicador4_1, col_indicador4_2, col_indicador4_3, col_indicador4_4 = st.columns(4)
-        with col_indicador4_1:
-            display_key_indicator("PMO-Detenido", df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-Detenido', na=False)].shape[0] if not df_filtrado.empty else 0, "pmo_button")
-        with col_indicador4_2:
-            display_key_indicator("PMO-No iniciado", df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-No iniciado', na=False)].shape[0] if not df_filtrado.empty else 0, "pmo_no_iniciado_button")
-        with col_indicador4_3:
-            display_key_indicator("PMO-Relevamiento PMO", df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-Relevamiento PMO', na=False)].shape[0] if not df_filtrado.empty else 0, "pmo_relevamiento_button")
-        with col_indicador4_4:
-            display_key_indicator("PMO-Pend. Validación técnica", df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-Pend. Validación técnica', na=False)].shape[0] if not df_filtrado.empty else 0, "pmo_pend_validacion_button")
-
-        st.markdown("---")
-
-        col_info1, col_info2, col_info3, col_info4, col_info5 = st.columns(5)
-        with col_info1:
-            display_key_indicator("Sin Gestor", df_filtrado[df_filtrado['gestor'].isna()].shape[0] if not df_filtrado.empty else 0, "sin_gestor_button")
-        with col_info2:
-            display_key_indicator("Sin Fecha Inicio", df_filtrado[(df_filtrado['fecha_inicio'].isna()) & (~df_filtrado['estado_actual'].isin(['Estabilización', 'Finalizado', 'PMO-Detenido', 'PMO-No iniciado']))].shape[0] if not df_filtrado.empty else 0, "sin_fecha_inicio_button")
-        with col_info3:
-            display_key_indicator("En Prod y Sin Fecha Pasaje", df_filtrado[(df_filtrado['fecha_pasaje_prod'].isna()) & (df_filtrado['estado_actual'].isin(['Finalizado', 'Estabilización']))].shape[0] if not df_filtrado.empty else 0, "sin_fecha_pasaje_prod_button")      
-        with col_info4:
-            display_key_indicator("Sin Fecha Fin", df_filtrado[(df_filtrado['fecha_fin'].isna()) & (~df_filtrado['estado_actual'].isin(['Estabilización', 'Finalizado', 'PMO-Detenido', 'PMO-No iniciado']))].shape[0] if not df_filtrado.empty else 0, "sin_fecha_fin_estado_button")
-        with col_info5:
-            display_key_indicator("Sin Asignatario", df_filtrado[df_filtrado['asignatario'].isna()].shape[0] if not df_filtrado.empty else 0, "sin_asignatario_button")
-
         ############## Contenedor Principal para Detalles #############
-        st.subheader("Detalles de Indicadores Clave")
-        if st.session_state.get("selected_indicator") == "Total Proyectos":
-            st.subheader("Detalles de Total Proyectos")
-            st.dataframe(df_filtrado, use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "En Estabilización":
-            st.subheader("Detalles de En Estabilización")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'] == 'Estabilización'] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "Análisis Tec (DESA)":
-            st.subheader("Detalles de Análisis Tec (DESA)")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('DESA-Análisis Técnico', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "En Curso (DESA)":
-            st.subheader("Detalles de En Curso (DESA)")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('DESA-En Curso', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "En QA":
-            st.subheader("Detalles de En QA")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('QA-En Pruebas QA', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "En UAT":
-            st.subheader("Detalles de En UAT")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('QA-En Pruebas UAT', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "Para Comité":
-            st.subheader("Detalles de Para Comité")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('PROD-Para Comité de Pasajes', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "Finalizados":
-            st.subheader("Detalles de Finalizados")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'] == 'Finalizado'] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)  
-        elif st.session_state.get("selected_indicator") == "PMO-Detenido":
-            st.subheader("Detalles de PMO-Detenido")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-Detenido', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "PMO-No iniciado":   
-            st.subheader("Detalles de PMO-No iniciado")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-No iniciado', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "PMO-Relevamiento PMO":
-            st.subheader("Detalles de PMO-Relevamiento PMO")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-Relevamiento PMO', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "PMO-Pend. Validación técnica":
-            st.subheader("Detalles de PMO-Pend. Validación técnica")
-            st.dataframe(df_filtrado[df_filtrado['estado_actual'].str.contains('PMO-Pend. Validación técnica', na=False)] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator") == "Sin Gestor":
-            st.subheader("Detalles de Proyectos Sin Gestor")
-            st.dataframe(df_filtrado[df_filtrado['gestor'].isna()] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)  
-        elif st.session_state.get("selected_indicator") == "Sin Fecha Inicio":
-            st.subheader("Detalles de Proyectos Sin Fecha Inicio")
-            st.dataframe(df_filtrado[(df_filtrado['fecha_inicio'].isna()) & (~df_filtrado['estado_actual'].isin(['Estabilización', 'Finalizado', 'PMO-Detenido', 'PMO-No iniciado']))] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)      
-        elif st.session_state.get("selected_indicator") == "En Prod y Sin Fecha Pasaje":    
-            st.subheader("Detalles de Proyectos en Prod y Sin Fecha Pasaje")
-            st.dataframe(df_filtrado[(df_filtrado['fecha_pasaje_prod'].isna()) & (df_filtrado['estado_actual'].isin(['Finalizado', 'Estabilización']))] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True) 
-        elif st.session_state.get("selected_indicator") == "Sin Fecha Fin":
-            st.subheader("Detalles de Proyectos Sin Fecha Fin")
-            st.dataframe(df_filtrado[(df_filtrado['fecha_fin'].isna()) & (~df_filtrado['estado_actual'].isin(['Estabilización', 'Finalizado', 'PMO-Detenido', 'PMO-No iniciado']))] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True) 
-        elif st.session_state.get("selected_indicator") == "Sin Asignatario":
-            st.subheader("Detalles de Proyectos Sin Asignatario")
-            st.dataframe(df_filtrado[df_filtrado['asignatario'].isna()] if not df_filtrado.empty else pd.DataFrame(), use_container_width=True)
-        elif st.session_state.get("selected_indicator"):
-            st.info(f"Selecciona un indicador para ver sus detalles.")
-        else:
-            st.info("Selecciona un indicador para ver sus detalles.")
+        # Títulos de detalle que no siguen el formato "Detalles de <indicador>"
+        titulos_detalle = {
+            "Sin Gestor": "Detalles de Proyectos Sin Gestor",
+            "Sin Fecha Inicio": "Detalles de Proyectos Sin Fecha Inicio",
+            "En Prod y Sin Fecha Pasaje": "Detalles de Proyectos en Prod y Sin Fecha Pasaje",
+            "Sin Fecha Fin": "Detalles de Proyectos Sin Fecha Fin",
+            "Sin Asignatario": "Detalles de Proyectos Sin Asignatario",
+        }
+
+        def detalle_indicador(traza):
+            indicador = st.session_state.get("selected_indicator")
+            if indicador:
+                with traza.etapa(f"detalle:{indicador}") as registro:
+                    detalle = df_filtrado[precalculado["indicadores"][indicador].to_numpy()[mascara]]
+                    registro["filas"] = len(detalle)
+                    st.subheader(titulos_detalle.get(indicador, f"Detalles de {indicador}"))
+                    vistas_arrow.mostrar_tabla(detalle, origen, use_container_width=True)
+                    exportacion.boton_descarga(detalle, f"detalle_{indicador}", key="descarga_indicador")
+            else:
+                st.info("Selecciona un indicador para ver sus detalles.")
+
+        # Indicadores y detalle en un fragmento: el clic en un botón vuelve a ejecutar solo esta región
+        @fragmento(traza, "indicadores")
+        def indicadores_y_detalle(traza):
+            col_indicador1_1, col_indicador1_2, col_indicador1_3, col_indicador1_4 = st.columns(4) 
+            with col_indicador1_1:
+                display_key_indicator("Total Proyectos", "total_proyectos_button")
+            with col_indicador1_2:
+                display_key_indicator("Finalizados", "finalizado_button")
+            with col_indicador1_3:
+                display_key_indicator("En Estabilización", "estabilizacion_button")
+            with col_indicador1_4:
+                display_key_indicator("Para Comité", "comite_button")
+
+            col_indicador2_1, col_indicador2_2 = st.columns(2)
+            with col_indicador2_1:
+                display_key_indicator("Análisis Tec (DESA)", "analisis_button")
+            with col_indicador2_2:
+                display_key_indicator("En Curso (DESA)", "en_curso_button")
+
+            col_indicador3_1, col_indicador3_2 = st.columns(2)
+            with col_indicador3_1:
+                display_key_indicator("En QA", "qa_button")
+            with col_indicador3_2:
+                display_key_indicator("En UAT", "uat_button")
+
+            col_indicador4_1, col_indicador4_2, col_indicador4_3, col_indicador4_4 = st.columns(4)
+            with col_indicador4_1:
+                display_key_indicator("PMO-Detenido", "pmo_button")
+            with col_indicador4_2:
+                display_key_indicator("PMO-No iniciado", "pmo_no_iniciado_button")
+            with col_indicador4_3:
+                display_key_indicator("PMO-Relevamiento PMO", "pmo_relevamiento_button")
+            with col_indicador4_4:
+                display_key_indicator("PMO-Pend. Validación técnica", "pmo_pend_validacion_button")
+
+            st.markdown("---")
+
+            col_info1, col_info2, col_info3, col_info4, col_info5 = st.columns(5)
+            with col_info1:
+                display_key_indicator("Sin Gestor", "sin_gestor_button")
+            with col_info2:
+                display_key_indicator("Sin Fecha Inicio", "sin_fecha_inicio_button")
+            with col_info3:
+                display_key_indicator("En Prod y Sin Fecha Pasaje", "sin_fecha_pasaje_prod_button")      
+            with col_info4:
+                display_key_indicator("Sin Fecha Fin", "sin_fecha_fin_estado_button")
+            with col_info5:
+                display_key_indicator("Sin Asignatario", "sin_asignatario_button")
+            traza.marca("primer contenido útil")
+
+            st.subheader("Detalles de Indicadores Clave")
+            detalle_indicador(traza)
+
+        indicadores_y_detalle()
 
         ############# Gráficos de Distribución #############
         st.markdown("### 📊 Distribuciones")
-        if not df_filtrado.empty:
-            st.markdown("#### 📌 Proyectos por Tipo")
-            tipos = df_filtrado['tipo'].value_counts().reset_index()
-            tipos.columns = ['Tipo', 'Cantidad']
-            total_proyectos = tipos['Cantidad'].sum()
-            tipos['Porcentaje'] = (tipos['Cantidad'] / total_proyectos) * 100
-
-            fig_tipos = px.bar(tipos, y='Tipo', x='Porcentaje',
-                                labels={'Porcentaje': '% del Total', 'Tipo': 'Tipo de Proyecto'},
-                                color='Cantidad',
-                                color_continuous_scale=px.colors.sequential.Viridis,
-                                orientation='h',
-                                text=tipos['Cantidad'])
-
-            fig_tipos.update_traces(textposition='outside')
-            fig_tipos.update_layout(xaxis_ticksuffix='%')
-            st.plotly_chart(fig_tipos, use_container_width=True, key="proyectos_por_tipo")
-        else:
-            st.info("No hay datos disponibles para mostrar los gráficos de distribución.")
 
-        # Tabs
-        tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
-            "Por Estado", "Por Asignatario", "Por Jefatura", "Por Etiquetas",
-            "Por Gestor", "Proyectos con Estabilizaciones", "Proyectos Pre-Migración-NBT", "Implementados"
-        ])
+        def grafico_por_tipo():
+            if not df_filtrado.empty:
+                st.markdown("#### 📌 Proyectos por Tipo")
+                tipos = df_filtrado['tipo'].value_counts().reset_index()
+                tipos.columns = ['Tipo', 'Cantidad']
+                total_proyectos = tipos['Cantidad'].sum()
+                tipos['Porcentaje'] = (tipos['Cantidad'] / total_proyectos) * 100
+
+                with traza.etapa("gráfico:proyectos_por_tipo"):
+                    fig_tipos = px.bar(tipos, y='Tipo', x='Porcentaje',
+                                        labels={'Porcentaje': '% del Total', 'Tipo': 'Tipo de Proyecto'},
+                                        color='Cantidad',
+                                        color_continuous_scale=px.colors.sequential.Viridis,
+                                        orientation='h',
+                                        text=tipos['Cantidad'])
+
+                    fig_tipos.update_traces(textposition='outside')
+                    fig_tipos.update_layout(xaxis_ticksuffix='%')
+                    st.plotly_chart(fig_tipos, use_container_width=True, key="proyectos_por_tipo")
+            else:
+                st.info("No hay datos disponibles para mostrar los gráficos de distribución.")
+
+        secciones.reservar("gráfico por tipo", grafico_por_tipo, prioridad=3)
 
-        with tab1:
+        # Tabs (se crean y reservan al final, con todas sus funciones definidas)
+        def pestana_por_estado():
             if not df_filtrado.empty:
                 estado_count = df_filtrado['estado_actual'].value_counts().reset_index()
                 estado_count.columns = ['Estado', 'Cantidad']
-                fig_estado = px.bar(estado_count, x='Estado', y='Cantidad',
-                                             title="Proyectos por Estado",
-                                             labels={'Cantidad': 'Número de Proyectos', 'Estado': 'Estado Actual'},
-                                             color='Cantidad',
-                                             color_continuous_scale=px.colors.sequential.Plasma)
-                st.plotly_chart(fig_estado, use_container_width=True, key="proyectos_por_estado_tab")
+                with traza.etapa("gráfico:proyectos_por_estado_tab"):
+                    fig_estado = px.bar(estado_count, x='Estado', y='Cantidad',
+                                                 title="Proyectos por Estado",
+                                                 labels={'Cantidad': 'Número de Proyectos', 'Estado': 'Estado Actual'},
+                                                 color='Cantidad',
+                                                 color_continuous_scale=px.colors.sequential.Plasma)
+                    st.plotly_chart(fig_estado, use_container_width=True, key="proyectos_por_estado_tab")
             else:
                 st.info("No hay datos disponibles para mostrar proyectos por estado.")
 
-        with tab2:
+        def pestana_por_asignatario():
             st.markdown("#### 👤 Distribución por Asignatario")
             if not df_filtrado.empty:
                 asignatarios = df_filtrado['asignatario'].value_counts(dropna=False).reset_index()
                 asignatarios.columns = ['Asignatario', 'Cantidad']
                 asignatarios['Asignatario'] = asignatarios['Asignatario'].fillna('Sin Asignar')
 
-                fig_asignatario_tab = px.bar(asignatarios, y='Asignatario', x='Cantidad',
-                                                    labels={'Cantidad': 'Número de Proyectos', 'Asignatario': 'Asignatario'},
-                                                    color='Cantidad',
-                                                    color_continuous_scale=px.colors.sequential.Viridis,
-                                                    orientation='h')
-                st.plotly_chart(fig_asignatario_tab, use_container_width=True, key="distribucion_asignatario_tab")
+                with traza.etapa("gráfico:distribucion_asignatario_tab"):
+                    fig_asignatario_tab = px.bar(asignatarios, y='Asignatario', x='Cantidad',
+                                                        labels={'Cantidad': 'Número de Proyectos', 'Asignatario': 'Asignatario'},
+                                                        color='Cantidad',
+                                                        color_continuous_scale=px.colors.sequential.Viridis,
+                                                        orientation='h')
+                    st.plotly_chart(fig_asignatario_tab, use_container_width=True, key="distribucion_asignatario_tab")
             else:
                 st.info("No hay datos disponibles para mostrar la distribución por asignatario.")
 
-        with tab3:
+        def pestana_por_jefatura():
             if not df_filtrado.empty:
                 jefaturas = df_filtrado['jefatura'].value_counts().reset_index()
                 jefaturas.columns = ['Jefatura', 'Cantidad']
-                fig_jefatura = px.bar(jefaturas, x='Jefatura', y='Cantidad',
-                                             title="Proyectos por Jefatura",
-                                             labels={'Cantidad': 'Número de Proyectos', 'Jefatura': 'Jefatura'},
-                                             color='Cantidad',
-                                             color_continuous_scale=px.colors.sequential.Viridis)
-                st.plotly_chart(fig_jefatura, use_container_width=True, key="proyectos_por_jefatura_tab")
+                with traza.etapa("gráfico:proyectos_por_jefatura_tab"):
+                    fig_jefatura = px.bar(jefaturas, x='Jefatura', y='Cantidad',
+                                                 title="Proyectos por Jefatura",
+                                                 labels={'Cantidad': 'Número de Proyectos', 'Jefatura': 'Jefatura'},
+                                                 color='Cantidad',
+                                                 color_continuous_scale=px.colors.sequential.Viridis)
+                    st.plotly_chart(fig_jefatura, use_container_width=True, key="proyectos_por_jefatura_tab")
             else:
                 st.info("No hay datos disponibles para mostrar proyectos por jefatura.")
 
-        with tab4:
+        def pestana_por_etiquetas():
             if not df_filtrado.empty:
                 etiquetas = df_filtrado['etiquetas'].dropna().str.split(", ").explode().value_counts().reset_index()
                 etiquetas.columns = ['Etiqueta', 'Cantidad']
-                fig_etiquetas = px.bar(etiquetas, x='Etiqueta', y='Cantidad',
-                                              title="Proyectos por Etiqueta",
-                                              labels={'Cantidad': 'Número de Proyectos', 'Etiqueta': 'Etiqueta'},
-                                              color='Cantidad',
-                                              color_continuous_scale=px.colors.sequential.Viridis)
-                st.plotly_chart(fig_etiquetas, use_container_width=True, key="proyectos_por_etiqueta_tab")
+                with traza.etapa("gráfico:proyectos_por_etiqueta_tab"):
+                    fig_etiquetas = px.bar(etiquetas, x='Etiqueta', y='Cantidad',
+                                                  title="Proyectos por Etiqueta",
+                                                  labels={'Cantidad': 'Número de Proyectos', 'Etiqueta': 'Etiqueta'},
+                                                  color='Cantidad',
+                                                  color_continuous_scale=px.colors.sequential.Viridis)
+                    st.plotly_chart(fig_etiquetas, use_container_width=True, key="proyectos_por_etiqueta_tab")
             else:
                 st.info("No hay datos disponibles para mostrar proyectos por etiqueta.")
 
-        with tab5:
+        def pestana_por_gestor():
             st.markdown("#### 👤 Distribución por Gestor")
             if not df_filtrado.empty:
                 gestores = df_filtrado['gestor'].value_counts(dropna=False).reset_index()
                 gestores.columns = ['Gestor', 'Cantidad']
                 gestores['Gestor'] = gestores['Gestor'].fillna('Sin asignar')
 
-                fig_gestores = px.bar(gestores, y='Gestor', x='Cantidad',
-                                             title="Distribución por Gestor",
-                                             labels={'Cantidad': 'Número de Proyectos', 'Gestor': 'Gestor'},
-                                             color='Cantidad',
-                                             color_continuous_scale=px.colors.sequential.Viridis,
-                                             orientation='h')
-                st.plotly_chart(fig_gestores, use_container_width=True, key="distribucion_gestor_tab")
+                with traza.etapa("gráfico:distribucion_gestor_tab"):
+                    fig_gestores = px.bar(gestores, y='Gestor', x='Cantidad',
+                                                 title="Distribución por Gestor",
+                                                 labels={'Cantidad': 'Número de Proyectos', 'Gestor': 'Gestor'},
+                                                 color='Cantidad',
+                                                 color_continuous_scale=px.colors.sequential.Viridis,
+                                                 orientation='h')
+                    st.plotly_chart(fig_gestores, use_container_width=True, key="distribucion_gestor_tab")
             else:
                 st.info("No hay datos disponibles para mostrar la distribución por gestor.")
                 
-        with tab6:
+        def pestana_estabilizaciones():
             if not df_filtrado.empty:
                 df_estabilizaciones = df_filtrado[df_filtrado['codigo_estabilizacion'].astype(str).str.startswith('E', na=False)].copy()
                 df_estabilizaciones['asignatario'] = df_estabilizaciones['asignatario'].fillna('Sin Asignar')
@@ -344,12 +373,13 @@ if uploaded_file is not None:
                     asignatarios_conteo.columns = ['Asignatario', 'Cantidad de Estabilizaciones']
                     asignatarios_conteo = asignatarios_conteo.sort_values(by='Cantidad de Estabilizaciones', ascending=False).head(10)
                     st.subheader("Top 10 Asignatarios con Mayor Cantidad de Estabilizaciones Asignadas")
-                    fig_asignatarios = px.bar(asignatarios_conteo, x='Asignatario', y='Cantidad de Estabilizaciones',
-                                              title="Top 10 Asignatarios por Cantidad de Estabilizaciones",
-                                              labels={'Cantidad de Estabilizaciones': 'Número de Estabilizaciones', 'Asignatario': 'Asignatario'},
-                                              color='Cantidad de Estabilizaciones',
-                                              color_continuous_scale=px.colors.sequential.Plasma)
-                    st.plotly_chart(fig_asignatarios, use_container_width=True, key="top_10_asignatarios_estabs")
+                    with traza.etapa("gráfico:top_10_asignatarios_estabs"):
+                        fig_asignatarios = px.bar(asignatarios_conteo, x='Asignatario', y='Cantidad de Estabilizaciones',
+                                                  title="Top 10 Asignatarios por Cantidad de Estabilizaciones",
+                                                  labels={'Cantidad de Estabilizaciones': 'Número de Estabilizaciones', 'Asignatario': 'Asignatario'},
+                                                  color='Cantidad de Estabilizaciones',
+                                                  color_continuous_scale=px.colors.sequential.Plasma)
+                        st.plotly_chart(fig_asignatarios, use_container_width=True, key="top_10_asignatarios_estabs")
                 else:
                     st.info("No se encontraron registros de estabilizaciones con asignatario.")
 
@@ -375,6 +405,7 @@ if uploaded_file is not None:
 
                     st.subheader("Detalle de Estabilizaciones por Proyecto Base")
                     st.dataframe(resumen_estabilizaciones_con_estabs[['nombre', 'cantidad_estabilizaciones']], use_container_width=True)
+                    exportacion.boton_descarga(resumen_estabilizaciones_con_estabs[['nombre', 'cantidad_estabilizaciones']], "estabilizaciones_por_proyecto", key="descarga_estabilizaciones")
 
                 else:
                     st.info("No se encontraron códigos de proyecto para el detalle.")
@@ -382,7 +413,9 @@ if uploaded_file is not None:
             else:
                 st.info("No hay datos disponibles para mostrar proyectos con estabilizaciones.")
                 
-        with tab7:        
+        # Pestañas con selectores propios: cada una es un fragmento, sus widgets no vuelven a ejecutar la página
+        @fragmento(traza, "pre-migración")
+        def pestana_pre_migracion(traza):
             if not df_filtrado.empty:
                 proyectos_pre_migracion = df_filtrado[df_filtrado['etiquetas'].str.contains('Pre-Migración-NBT', na=False, regex=False)].copy()
                 if not proyectos_pre_migracion.empty:
@@ -393,25 +426,43 @@ if uploaded_file is not None:
                     estado_seleccionado = st.selectbox("Selecciona un Estado", ["Todos"] + list(estados_unicos_pre_migracion), key="selector_estado_pre_migracion")
 
                     if estado_seleccionado == "Todos":
-                        st.dataframe(proyectos_pre_migracion, use_container_width=True)
+                        proyectos_filtrados_estado = proyectos_pre_migracion
                     else:
                         proyectos_filtrados_estado = proyectos_pre_migracion[proyectos_pre_migracion['estado_actual'] == estado_seleccionado]
-                        st.dataframe(proyectos_filtrados_estado, use_container_width=True)
+                    st.dataframe(proyectos_filtrados_estado, use_container_width=True)
+                    exportacion.boton_descarga(proyectos_filtrados_estado, f"pre_migracion_nbt_{estado_seleccionado}", key="descarga_pre_migracion")
 
                     estado_actual_counts = proyectos_pre_migracion['estado_actual'].value_counts().reset_index()
                     estado_actual_counts.columns = ['Estado Actual', 'Cantidad']
-                    fig_pre_migracion_estados = px.bar(estado_actual_counts, x='Estado Actual', y='Cantidad',
-                                                                     title="Total por Estado Actual (Proyectos Pre-Migración-NBT)",
-                                                                     labels={'Cantidad': 'Número de Proyectos', 'Estado Actual': 'Estado'},
-                                                                     color='Cantidad',
-                                                                     color_continuous_scale=px.colors.sequential.Viridis)
-                    st.plotly_chart(fig_pre_migracion_estados, use_container_width=True, key="estados_pre_migracion_tab")
+                    with traza.etapa("gráfico:estados_pre_migracion_tab"):
+                        fig_pre_migracion_estados = px.bar(estado_actual_counts, x='Estado Actual', y='Cantidad',
+                                                                         title="Total por Estado Actual (Proyectos Pre-Migración-NBT)",
+                                                                         labels={'Cantidad': 'Número de Proyectos', 'Estado Actual': 'Estado'},
+                                                                         color='Cantidad',
+                                                                         color_continuous_scale=px.colors.sequential.Viridis)
+                        st.plotly_chart(fig_pre_migracion_estados, use_container_width=True, key="estados_pre_migracion_tab")
                 else:
                     st.info("No se encontraron proyectos con la etiqueta 'Pre-Migración-NBT'.")
             else:
                 st.info("No hay datos disponibles para mostrar proyectos de pre-migración NBT.")
 
-        with tab8:        
+        # El selector de año vuelve a ejecutar solo el gráfico mensual
+        @fragmento(traza, "implementados por mes")
+        def grafico_implementados_por_mes(traza, implementados_por_mes):
+            anos_unicos = sorted(implementados_por_mes['Año'].unique(), reverse=True)
+            ano_seleccionado = st.selectbox("Selecciona el año:", anos_unicos, key="filtro_ano_implementado")
+
+            implementados_filtrado_ano = implementados_por_mes[implementados_por_mes['Año'] == ano_seleccionado]
+
+            with traza.etapa("gráfico:implementados_por_mes"):
+                fig_implementados_mes = px.bar(implementados_filtrado_ano, x='Mes', y='Cantidad',
+                                                title=f'Proyectos Implementados por Mes ({ano_seleccionado})',
+                                                labels={'Cantidad': 'Número de Proyectos', 'Mes': 'Mes'},
+                                                color='Cantidad',
+                                                color_continuous_scale=px.colors.sequential.Viridis)
+                st.plotly_chart(fig_implementados_mes, use_container_width=True, key="implementados_por_mes")
+
+        def pestana_implementados():
             if not df_filtrado.empty:  
                 st.markdown("#### 📅 Total Implementado por Mes")
                 df_implementado = df_filtrado[df_filtrado['estado_actual'].isin(['Estabilización', 'Finalizado'])].copy()
@@ -421,18 +472,7 @@ if uploaded_file is not None:
                     implementados_por_mes.columns = ['mes_period', 'Cantidad']
                     implementados_por_mes['Mes'] = implementados_por_mes['mes_period'].astype(str)
                     implementados_por_mes['Año'] = implementados_por_mes['mes_period'].dt.year.astype(str)
-
-                    anos_unicos = sorted(implementados_por_mes['Año'].unique(), reverse=True)
-                    ano_seleccionado = st.selectbox("Selecciona el año:", anos_unicos, key="filtro_ano_implementado")
-
-                    implementados_filtrado_ano = implementados_por_mes[implementados_por_mes['Año'] == ano_seleccionado]
-
-                    fig_implementados_mes = px.bar(implementados_filtrado_ano, x='Mes', y='Cantidad',
-                                                    title=f'Proyectos Implementados por Mes ({ano_seleccionado})',
-                                                    labels={'Cantidad': 'Número de Proyectos', 'Mes': 'Mes'},
-                                                    color='Cantidad',
-                                                    color_continuous_scale=px.colors.sequential.Viridis)
-                    st.plotly_chart(fig_implementados_mes, use_container_width=True, key="implementados_por_mes")
+                    grafico_implementados_por_mes(implementados_por_mes)
                 else:
                     st.info("No hay proyectos finalizados o en estabilización para mostrar el gráfico por mes.")  
 
@@ -449,14 +489,124 @@ if uploaded_file is not None:
 
                 df_plot = merged_df.melt(id_vars=['Tipo'], value_vars=['Implementados', 'Pendientes'], var_name='Estado', value_name='Cantidad')
 
-                fig_implementado_tipo = px.bar(df_plot, x='Tipo', y='Cantidad', color='Estado',
-                                             labels={'Cantidad': 'Número de Proyectos', 'Tipo': 'Tipo de Proyecto', 'Estado': 'Estado'},
-                                             color_discrete_sequence=px.colors.qualitative.Vivid)
-                st.plotly_chart(fig_implementado_tipo, use_container_width=True, key="implementado_por_tipo")
+                with traza.etapa("gráfico:implementado_por_tipo"):
+                    fig_implementado_tipo = px.bar(df_plot, x='Tipo', y='Cantidad', color='Estado',
+                                                 labels={'Cantidad': 'Número de Proyectos', 'Tipo': 'Tipo de Proyecto', 'Estado': 'Estado'},
+                                                 color_discrete_sequence=px.colors.qualitative.Vivid)
+                    st.plotly_chart(fig_implementado_tipo, use_container_width=True, key="implementado_por_tipo")
             else:
                 st.info("No hay datos disponibles para mostrar proyectos Implementados.")
 
+        @fragmento(traza, "pronóstico")
+        def pestana_pronostico(traza):
+            if not df_filtrado.empty:
+                st.markdown("#### 🎲 ¿Cuándo se implementan los proyectos pendientes?")
+                st.caption("Simulación Monte Carlo sobre el throughput mensual histórico (implementados por mes según Fecha Pasaje a Producción).")
+                col_agrupacion, col_historia, col_simulaciones = st.columns(3)
+                agrupacion = col_agrupacion.selectbox("Agrupar por", list(pronostico.AGRUPACIONES), key="pronostico_agrupacion")
+                meses_historia = col_historia.slider("Meses de historia", 3, 36, 12, key="pronostico_historia")
+                simulaciones = col_simulaciones.select_slider("Simulaciones", [5000, 10000, 20000, 50000], value=20000, key="pronostico_simulaciones")
+
+                with traza.etapa("pronóstico", filas=len(df_filtrado)):
+                    tabla_pronostico, meses_simulados, mes_corte = pronostico.pronosticar(
+                        df_filtrado, pronostico.AGRUPACIONES[agrupacion], meses_historia, simulaciones, semilla=0
+                    )
+                st.write(f"Historia: {meses_historia} meses anteriores a {mes_corte}. Las fechas indican el fin del mes en que se completan todos los pendientes del grupo con esa probabilidad.")
+                st.dataframe(tabla_pronostico, use_container_width=True, hide_index=True)
+                exportacion.boton_descarga(tabla_pronostico, "pronostico_entregas", key="descarga_pronostico")
+
+                grupo = st.selectbox("Distribución del grupo", list(meses_simulados), index=len(meses_simulados) - 1, key="pronostico_grupo")
+                meses_grupo = pd.Series(meses_simulados[grupo]).dropna()
+                if meses_grupo.empty:
+                    st.info("Con el throughput histórico de este grupo no se completan los pendientes dentro del horizonte simulado.")
+                else:
+                    distribucion = meses_grupo.astype(int).value_counts().sort_index()
+                    distribucion = pd.DataFrame({
+                        "Mes": [str(mes_corte + int(m) - 1) for m in distribucion.index],
+                        "Probabilidad acumulada (%)": (distribucion.cumsum() / len(meses_simulados[grupo]) * 100).round(1).to_numpy(),
+                    })
+                    with traza.etapa("gráfico:pronostico_distribucion"):
+                        fig_pronostico = px.line(distribucion, x="Mes", y="Probabilidad acumulada (%)", markers=True,
+                                                 title=f"Probabilidad de completar los pendientes de {grupo}")
+                        st.plotly_chart(fig_pronostico, use_container_width=True, key="pronostico_distribucion")
+            else:
+                st.info("No hay datos disponibles para el pronóstico de entregas.")
+
+        @fragmento(traza, "calidad")
+        def pestana_calidad(traza):
+            if not df_filtrado.empty:
+                st.markdown("#### 🧪 Reglas de calidad de datos")
+                # Todas las reglas en una pasada: el resto de la pestaña agrega sobre la matriz filas x reglas
+                with traza.etapa("reglas de calidad", filas=len(df_filtrado)):
+                    matriz_reglas = precalculado["calidad"][mascara]
+                st.dataframe(reglas_calidad.resumen_reglas(matriz_reglas, REGLAS_PROYECTOS), use_container_width=True, hide_index=True)
+
+                agrupar_calidad = st.radio("Agrupar por", ["Jefatura", "Gestor"], horizontal=True, key="calidad_agrupacion")
+                columna_calidad = 'jefatura' if agrupar_calidad == "Jefatura" else 'gestor'
+                resumen_calidad = reglas_calidad.resumen_por(df_filtrado, matriz_reglas, columna_calidad)
+                with traza.etapa("gráfico:calidad_por_grupo"):
+                    fig_calidad = px.bar(resumen_calidad.head(20), x=columna_calidad, y=list(matriz_reglas.columns),
+                                         title=f"Violaciones por {agrupar_calidad}",
+                                         labels={columna_calidad: agrupar_calidad, 'value': 'Filas', 'variable': 'Regla'})
+                    st.plotly_chart(fig_calidad, use_container_width=True, key="calidad_por_grupo")
+                st.dataframe(resumen_calidad, use_container_width=True, hide_index=True)
+                exportacion.boton_descarga(resumen_calidad, f"calidad_por_{columna_calidad}", key="descarga_calidad_resumen")
+
+                reglas_elegidas = st.multiselect("Reglas del listado", list(matriz_reglas.columns), default=list(matriz_reglas.columns), key="calidad_reglas")
+                violaciones = reglas_calidad.listado_violaciones(
+                    df_filtrado, matriz_reglas,
+                    ['nombre', 'estado_actual', 'jefatura', 'gestor', 'asignatario', 'fecha_inicio', 'fecha_fin', 'fecha_pasaje_prod'],
+                    reglas_elegidas,
+                )
+                st.write(f"{len(violaciones)} violaciones")
+                st.dataframe(violaciones, use_container_width=True, hide_index=True)
+                exportacion.boton_descarga(violaciones, "violaciones_calidad", key="descarga_violaciones")
+            else:
+                st.info("No hay datos disponibles para evaluar la calidad de datos.")
+
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs([
+            "Por Estado", "Por Asignatario", "Por Jefatura", "Por Etiquetas",
+            "Por Gestor", "Proyectos con Estabilizaciones", "Proyectos Pre-Migración-NBT", "Implementados",
+            "Pronóstico de Entregas", "Calidad de Datos"
+        ])
+        # Las pestañas se llenan al final, en orden; las más caras (el detalle por proyecto base de
+        # estabilizaciones y el Monte Carlo del pronóstico) van últimas
+        pestanas = [
+            (tab1, "Por Estado", pestana_por_estado),
+            (tab2, "Por Asignatario", pestana_por_asignatario),
+            (tab3, "Por Jefatura", pestana_por_jefatura),
+            (tab4, "Por Etiquetas", pestana_por_etiquetas),
+            (tab5, "Por Gestor", pestana_por_gestor),
+            (tab6, "Proyectos con Estabilizaciones", pestana_estabilizaciones),
+            (tab7, "Proyectos Pre-Migración-NBT", pestana_pre_migracion),
+            (tab8, "Implementados", pestana_implementados),
+            (tab9, "Pronóstico de Entregas", pestana_pronostico),
+            (tab10, "Calidad de Datos", pestana_calidad),
+        ]
+        for pestana, nombre, dibujar in pestanas:
+            prioridad = 5 if dibujar in (pestana_estabilizaciones, pestana_pronostico) else 4
+            secciones.reservar(nombre, dibujar, prioridad, pestana, etapa=f"pestaña:{nombre}", filas=len(df_filtrado))
+
+        # Indicadores ya dibujados; el resto de la página se llena por prioridad
+        secciones.dibujar()
+        precalculo.mostrar_informe(precalculado)
+
     except Exception as e:
         st.error(f"Error al procesar el archivo: {str(e)}")
+        error = traza.error()
+        with st.expander("Detalle técnico del error"):
+            if error:
+                st.write(f"Etapa: {error['etapa']}")
+            st.exception(e)
+elif carpeta_configurada() is not None:
+    st.info("Leyendo la exportación de la carpeta de entrada; aparecerá en el próximo rerun. También puedes subir un archivo.")
 else:
-    st.info("Por favor, sube un archivo Excel para comenzar.")
\ No newline at end of file
+    st.info("Por favor, sube un archivo Excel para comenzar.")
+
+# --- Costos de importación (arranque en frío) ---
+with st.sidebar.expander("⏱️ Tiempos de importación"):
+    st.dataframe(dependencias.resumen_tiempos(), use_container_width=True, hide_index=True)
+
+# --- Tiempos por etapa del rerun ---
+instrumentacion.mostrar_panel(traza)
+traza.guardar()
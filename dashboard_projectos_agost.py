@@ -1,28 +1,56 @@
+import time
+_inicio_importaciones = time.perf_counter()
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import re
 from io import BytesIO
-import subprocess
-import sys
+import pandas as pd
+import dependencias
+import exportacion
+import instrumentacion
+import consultas
+import precalculo
+from carpeta_entrada import carpeta_configurada, datos_publicados, mostrar_origen
+from procesamiento import (
+    leer_proyectos, resumen_agosto, filtrar_core, aplicar_por_valor, extraer_asignatario,
+    agrupar_jefatura, ORDEN_ESTADOS
+)
+from estilos import con_estilo, obtener_color_estado, CODIGOS_AZULES
+import graficos
+dependencias.registrar_imports_script("dashboard_projectos_agost", _inicio_importaciones)
 #FD
-# Función para instalar dependencias faltantes
-def install(package):
-    subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-
-try:
-    import openpyxl
-except ImportError:
-    st.warning("openpyxl no está instalado. Instalando...")
-    install("openpyxl")
-    import openpyxl
-    st.success("openpyxl instalado correctamente!")
 
 # Configurar la página
 st.set_page_config(page_title="Dashboard Proyectos Agosto 2025", page_icon="📊", layout="wide")
+# Tiempos por etapa de este rerun
+traza = instrumentacion.Traza("dashboard_projectos_agost")
 
 st.title("📊 Dashboard de Proyectos (agosto 25) - Core Bancario")
 
+# Verificar dependencias sin instalar nada en tiempo de ejecución
+try:
+    dependencias.verificar("openpyxl", "plotly")
+except dependencias.DependenciaFaltante as e:
+    st.error(str(e))
+    st.stop()
+
+
+@st.cache_resource(show_spinner="Leyendo el archivo de proyectos...", max_entries=4)
+def leer_exportacion(contenido):
+    """Lee y procesa la exportación una sola vez por contenido del archivo; no se modifica, se comparte entre reruns."""
+    dependencias.importar("openpyxl")
+    return leer_proyectos(BytesIO(contenido))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def consulta_graficos(origen, motor, _columnas):
+    """Una consulta por dataset y motor para los cruces de la pestaña Gráficos (se comparte entre reruns y sesiones).
+
+    Se registra el core con Gerencia_Principal solo en las filas del corte por
+    gerencia: el gráfico 5 descarta las vacías y así los dos cruces usan la misma tabla.
+    """
+    graf, gerencia = _columnas["graf"], _columnas["gerencia"]
+    if gerencia is not None:
+        graf = graf.assign(Gerencia_Principal=gerencia["Gerencia_Principal"].reindex(graf.index))
+    return consultas.crear_consulta(graf, motor)
+
 # Texto explicativo sobre los colores (compatibles con modo oscuro)
 st.markdown(
     """
@@ -41,508 +69,295 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Funciones de procesamiento de datos
-def limpiar_espacios_guion(nombre):
-    """Elimina los espacios alrededor del guion en una cadena."""
-    if isinstance(nombre, str):
-        return re.sub(r"\s*-\s*", "-", nombre.lstrip())
-    return nombre
-
-def extraer_codigos(nombre):
-    """Extrae Codigo_Proyecto y Codigo_Estabilizacion del nombre."""
-    codigo_proyecto = None
-    codigo_estabilizacion = None
-    if isinstance(nombre, str):
-        nombre_sin_espacios_iniciales = nombre.lstrip()
-        match_estabilizacion = re.search(r"^(E\d+)", nombre_sin_espacios_iniciales)
-        if match_estabilizacion:
-            codigo_estabilizacion = match_estabilizacion.group(1)
-            nombre_restante = nombre_sin_espacios_iniciales[len(match_estabilizacion.group(1)):].lstrip("- ").lstrip()
-        else:
-            nombre_restante = nombre_sin_espacios_iniciales
-
-        match_proyecto = re.search(r"([PMANAI]\d+/\d+)", nombre_restante)
-        if match_proyecto:
-            codigo_proyecto = match_proyecto.group(1)
-
-    return pd.Series([codigo_proyecto, codigo_estabilizacion])
-
-def clasificar(nombre):
-    if isinstance(nombre, str):
-        nombre_sin_espacios = nombre.lstrip()
-        if nombre_sin_espacios.startswith("E"):
-            return "Estabilización"
-        elif nombre_sin_espacios.startswith("I"):
-            return "Incidente"
-        elif nombre_sin_espacios.startswith("P"):
-            return "Proyecto"
-        elif nombre_sin_espacios.startswith("M"):
-            return "Mantenimiento"
-        elif nombre_sin_espacios.startswith("A"):
-            return "Auditoria"
-        elif nombre_sin_espacios.startswith("N"):
-            return "Normativo"
-        else:
-            return "Otro"
-    return "Otro"
-
 # Carga de datos
 uploaded_file = st.sidebar.file_uploader("Sube el archivo Excel de proyectos", type=["xlsx"])
-
-if uploaded_file is not None:
-    # Función para mostrar barra de progreso en % Realizado
-    def barra_porcentaje(val):
-        try:
-            pct = float(val)
-        except:
-            return val
-        pct = max(0, min(100, pct))
-        color = '#2c7873' if pct == 100 else '#2980b9'
-        return f'<div style="background:#e0e0e0;border-radius:4px;position:relative;height:22px;width:100%;"><div style="background:{color};width:{pct}%;height:100%;border-radius:4px;"></div><span style="position:absolute;left:50%;top:0;transform:translateX(-50%);color:#222;font-weight:bold;">{pct:.0f}%</span></div>'
-    # Función para resaltar filas:
-    # - Verde suave de fondo si estado_actual es 'Estabilización' o 'Finalizado'
-    # - Texto dorado si etiquetas contiene 'Post/Agos/25' (aunque el fondo sea verde)
-    def highlight_filas(row):
-        estado = str(row.get("estado_actual", "")).strip().lower()
-        tiene_post_agos = "post/agos/25" in str(row.get("etiquetas", "")).lower()
-        nombre = str(row.get("nombre", ""))
-        codigos_azules = [
-            "M022/24", "M030/25", "M018/25", "M048/25", "M034/25",
-            "M041/25", "M136/24", "M043/25", "M034/24"
-        ]
-        color = ""
-        # Fondo verde si corresponde
-        if estado in ["finalizado", "estabilización"]:
-            color = "background-color: #2c7873; color: #fff;"
-        # Si tiene Post/Agos/25, forzar color de texto dorado
-        if tiene_post_agos:
-            color = color.replace('color: #fff;', 'color: #ffd700;') if 'color: #fff;' in color else color + ' color: #ffd700;'
-        # Si el nombre contiene alguno de los códigos, forzar color azul
-        if any(codigo in nombre for codigo in codigos_azules):
-            # Si ya hay color de fondo, solo cambia el color de letra
-            if 'color:' in color:
-                color = re.sub(r'color: #[0-9a-fA-F]{3,6};?', 'color: #2980b9;', color)
-            else:
-                color += ' color: #2980b9;'
-        return [color] * len(row)
-
-    # Leer el archivo Excel
-    df = pd.read_excel(uploaded_file, header=3)
-    # Procesamiento de datos
-    df["Nombre"] = df["Nombre"].apply(limpiar_espacios_guion)
-    df[['codigo_proyecto', 'codigo_estabilizacion']] = df['Nombre'].apply(extraer_codigos)
-    df["tipo"] = df["Nombre"].apply(clasificar)
-    # Renombrar columnas para consistencia
-    df = df.rename(columns={
-        "Nombre": "nombre",
-        "Estado Actual": "estado_actual",
-        "Jefatura": "jefatura",
-        "Asignatario predeterminado": "asignatario",
-        "Fecha de inicio": "fecha_inicio",
-        "Fecha de fin": "fecha_fin",
-        "Actualizado por última vez": "actualizado",
-        "Etiquetas": "etiquetas",
-        "Gestor del proyecto": "gestor",
-        "Propietario del proyecto": "propietario",
-        "Gerencia/Unidad": "gerencia",
-        "Fecha Pasaje a Producción": "fecha_pasaje_prod",
-        "Estabilización": "estabilizacion",
-        "Autor": "autor"
-    })
-    # Formatear fechas
-    df['fecha_inicio'] = pd.to_datetime(df['fecha_inicio'], errors='coerce').dt.strftime('%Y-%m-%d')
-    df['fecha_fin'] = pd.to_datetime(df['fecha_fin'], errors='coerce').dt.strftime('%Y-%m-%d')
-    df['actualizado'] = pd.to_datetime(df['actualizado'], errors='coerce')
-    df['fecha_pasaje_prod'] = pd.to_datetime(df['fecha_pasaje_prod'], errors='coerce')
-    # Filtrar solo proyectos cuyas etiquetas contengan '/Agos/25'
-    df = df[df['etiquetas'].str.contains('/Agos/25', na=False, regex=False)]
-
-    # Tabs principales: Datos Completos, Datos Agrupados y Agrupados por Estados
-    main_tab1, main_tab2, main_tab3, tab_gerencia, tab_asignatario = st.tabs(["Datos Completos", "Gráficos", "Agrupados por Estados", "Agrupados por Gerencia/Unidad", "Por Asignatarios"])
-    # Nuevo tab: Agrupados por Asignatario
-    with tab_asignatario:
-        st.write("Proyectos agrupados por Asignatario:")
-
-        def extraer_asignatario(valor):
-            if pd.isna(valor) or str(valor).strip() == '':
-                return "(Sin asignatario)"
-            return str(valor).strip()
-
-        # Buscar el nombre real de la columna 'asignatario' ignorando mayúsculas, minúsculas y espacios
-        col_asignatario = None
-        for col in df.columns:
-            if col.replace(' ', '').lower() in ["asignatariopredeterminado", "asignatario"]:
-                col_asignatario = col
-                break
-        if col_asignatario is None:
-            st.error("No se encontró la columna 'Asignatario' en los datos.")
+# Motor de los cruces pesados de la pestaña Gráficos (DuckDB solo si está instalado)
+motor_consultas = st.sidebar.selectbox("Motor de consultas", consultas.motores_disponibles(), key="motor_consultas")
+
+# Sin archivo subido se usa la última exportación publicada en la carpeta de entrada
+datos_carpeta = None
+if uploaded_file is None:
+    try:
+        datos_carpeta = datos_publicados("proyectos")
+    except dependencias.DependenciaFaltante as e:
+        st.sidebar.warning(str(e))
+
+if uploaded_file is not None or datos_carpeta is not None:
+    try:
+        if datos_carpeta is None:
+            # Leer y procesar el archivo Excel (limpieza, códigos, tipo, renombrado y fechas);
+            # los reruns siguientes con el mismo archivo lo toman de la caché
+            with traza.etapa("lectura") as registro:
+                df_completo = leer_exportacion(uploaded_file.getvalue())
+                registro["filas"] = len(df_completo)
         else:
-            # Filtrar por jefatura que contenga 'core bancario' o 'normativo'
-            df_asignatario = df[df['jefatura'].str.lower().str.contains('core bancario|normativo', na=False)].copy()
-            df_asignatario['Asignatario'] = df_asignatario[col_asignatario].apply(extraer_asignatario)
-            asignatarios = df_asignatario['Asignatario'].dropna().unique()
-            asignatarios = sorted(asignatarios)
-
-            # Calcular columnas a mostrar para este tab (evitar columnas inexistentes)
-            columnas_ocultas_asignatario = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion', 'Grupo Jefatura']
-            columnas_a_mostrar_asignatario = [col for col in df_asignatario.columns if col.lower() not in [c.lower() for c in columnas_ocultas_asignatario]]
-
-            for asign in asignatarios:
-                n = df_asignatario[df_asignatario['Asignatario'] == asign].shape[0]
-                color = "#51748b"  # azul para agrupación
-                st.markdown(
-                    f'<div style="background-color:{color};padding:10px 16px;border-radius:6px;margin-bottom:0px;font-weight:bold;font-size:1.1em;">{asign} <span style="float:right">{n}</span></div>',
-                    unsafe_allow_html=True
-                )
-                if n > 0:
-                    st.dataframe(
-                        df_asignatario[df_asignatario['Asignatario'] == asign][columnas_a_mostrar_asignatario].style.apply(highlight_filas, axis=1),
-                        use_container_width=True,
-                        hide_index=True
+            # Ya leída y precalculada en segundo plano; no se modifica, se comparte entre sesiones
+            df_completo = datos_carpeta.df
+            mostrar_origen(datos_carpeta)
+        origen = uploaded_file.file_id if datos_carpeta is None else datos_carpeta.hash
+        # Vista Agosto/25, árbol Gerencia/Unidad de Core Bancario y Normativo, columnas y figuras de la
+        # pestaña Gráficos y estilos de las filas: en paralelo y una sola vez por archivo (ver precalculo.py)
+        precalculado = precalculo.precalcular_proyectos(df_completo, origen, precalculo.NODOS_AGOSTO)
+        # Filtrar solo proyectos cuyas etiquetas contengan '/Agos/25'
+        with traza.etapa("filtros") as registro:
+            df = precalculado["agosto"]
+            registro["filas"] = len(df)
+        # El árbol lo usan el gráfico por Gerencia Principal y la pestaña por Gerencia/Unidad
+        with traza.etapa("árbol de gerencias", filas=len(df)):
+            arbol = precalculado["árbol de gerencias"]
+        css_agosto = precalculado["estilos agosto"]
+
+        # Tabs principales: Datos Completos, Datos Agrupados y Agrupados por Estados
+        main_tab1, main_tab2, main_tab3, tab_gerencia, tab_asignatario = st.tabs(["Datos Completos", "Gráficos", "Agrupados por Estados", "Agrupados por Gerencia/Unidad", "Por Asignatarios"])
+        # Nuevo tab: Agrupados por Asignatario
+        with tab_asignatario, traza.etapa("pestaña:Por Asignatarios", filas=len(df)):
+            st.write("Proyectos agrupados por Asignatario:")
+
+            # Buscar el nombre real de la columna 'asignatario' ignorando mayúsculas, minúsculas y espacios
+            col_asignatario = None
+            for col in df.columns:
+                if col.replace(' ', '').lower() in ["asignatariopredeterminado", "asignatario"]:
+                    col_asignatario = col
+                    break
+            if col_asignatario is None:
+                st.error("No se encontró la columna 'Asignatario' en los datos.")
+            else:
+                # Filtrar por jefatura que contenga 'core bancario' o 'normativo'
+                df_asignatario = filtrar_core(df).copy()
+                df_asignatario['Asignatario'] = aplicar_por_valor(df_asignatario[col_asignatario], extraer_asignatario)
+                asignatarios = df_asignatario['Asignatario'].dropna().unique()
+                asignatarios = sorted(asignatarios)
+
+                # Calcular columnas a mostrar para este tab (evitar columnas inexistentes)
+                columnas_ocultas_asignatario = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion', 'Grupo Jefatura']
+                columnas_a_mostrar_asignatario = [col for col in df_asignatario.columns if col.lower() not in [c.lower() for c in columnas_ocultas_asignatario]]
+
+                for asign in asignatarios:
+                    n = df_asignatario[df_asignatario['Asignatario'] == asign].shape[0]
+                    color = "#51748b"  # azul para agrupación
+                    st.markdown(
+                        f'<div style="background-color:{color};padding:10px 16px;border-radius:6px;margin-bottom:0px;font-weight:bold;font-size:1.1em;">{asign} <span style="float:right">{n}</span></div>',
+                        unsafe_allow_html=True
                     )
-                else:
-                    st.info("No hay proyectos para este asignatario.")
-
-    with main_tab1:
-        st.subheader("Datos completos Core Bancario/Normativo")
-        # --- Bloque resumen ---
-        total_proyectos = len(df)
-        total_finalizados = df['estado_actual'].astype(str).str.lower().eq('finalizado').sum()
-        total_estabilizacion = df['estado_actual'].astype(str).str.lower().eq('estabilización').sum()
-        total_implementados = total_finalizados + total_estabilizacion
-        total_pres_agos = df['etiquetas'].astype(str).str.lower().str.contains('pres/agos/25').sum()
-        total_post_agos = df['etiquetas'].astype(str).str.lower().str.contains('post/agos/25').sum()
-
-        resumen_data = {
-            'Total Proyectos': [total_proyectos],           
-            'Presentación Agosto/25': [total_pres_agos],
-            'Posterior Presentación Agosto/25': [total_post_agos],
-            'Implementados': [total_implementados]
-        }
-        resumen_df = pd.DataFrame(resumen_data)
-        #st.markdown('<div style="background:#f5f5f5;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;margin-bottom:10px;">Resumen general de la planilla</div>', unsafe_allow_html=True)
-        st.dataframe(resumen_df, use_container_width=True, hide_index=True)
-        columnas_ocultas = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion']
-        columnas_a_mostrar = [col for col in df.columns if col.lower() not in columnas_ocultas]
-        # Filtrar solo jefatura Core Bancario y Normativo
-        df_core = df[df['jefatura'].str.lower().str.contains('core bancario|normativo', na=False)].copy()
-        codigos_azules = [
-            "M022/24", "M030/25", "M018/25", "M048/25", "M034/25",
-            "M041/25", "M136/24", "M043/25", "M034/24"
-        ]
-        # Bloque Antes del Freeze (excluyendo Finalizado y Estabilización)
-        estados_excluir = ['finalizado', 'estabilización']
-        df_antes = df_core[
-            (~df_core['nombre'].astype(str).apply(lambda x: any(c in x for c in codigos_azules))) &
-            (~df_core['estado_actual'].astype(str).str.lower().isin(estados_excluir))
-        ]
-        st.markdown('<div style="background:#2c7873;color:#fff;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;">Antes del Freeze</div>', unsafe_allow_html=True)
-        st.success(f"Total de registros: {len(df_antes[columnas_a_mostrar])}")
-        st.dataframe(
-            df_antes[columnas_a_mostrar].style.apply(highlight_filas, axis=1),
-            use_container_width=True,
-            height=(35 * len(df_antes[columnas_a_mostrar]) + 40),
-            hide_index=True
-        )
-        # Bloque Después del Freeze (excluyendo Finalizado y Estabilización)
-        df_despues = df_core[
-            (df_core['nombre'].astype(str).apply(lambda x: any(c in x for c in codigos_azules))) &
-            (~df_core['estado_actual'].astype(str).str.lower().isin(estados_excluir))
-        ]
-        st.markdown('<div style="background:#2980b9;color:#fff;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;">Después del Freeze</div>', unsafe_allow_html=True)
-        st.success(f"Total de registros: {len(df_despues[columnas_a_mostrar])}")
-        st.dataframe(
-            df_despues[columnas_a_mostrar].style.apply(highlight_filas, axis=1),
-            use_container_width=True,
-            height=(35 * len(df_despues[columnas_a_mostrar]) + 40),
-            hide_index=True
-        )
-
-         # --- Tabla solo implementados al final ---
-        # Definir df_core y columnas_a_mostrar si no existen
-        df_core_impl = df[df['jefatura'].str.lower().str.contains('core bancario|normativo', na=False)].copy()
-        columnas_ocultas_impl = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion']
-        columnas_a_mostrar_impl = [col for col in df_core_impl.columns if col.lower() not in columnas_ocultas_impl]
-        df_implementados = df_core_impl[df_core_impl['estado_actual'].astype(str).str.lower().isin(['finalizado', 'estabilización'])]
-        if not df_implementados.empty:
-            st.markdown('<div style="background:#2c7873;color:#fff;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;margin-top:24px;">Implementados (Finalizado o Estabilización)</div>', unsafe_allow_html=True)
+                    if n > 0:
+                        st.dataframe(
+                            con_estilo(df_asignatario[df_asignatario['Asignatario'] == asign][columnas_a_mostrar_asignatario], css_agosto),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                        exportacion.boton_descarga(df_asignatario[df_asignatario['Asignatario'] == asign][columnas_a_mostrar_asignatario], f"asignatario_{asign}", key=f"descarga_asignatario_{asign}")
+                    else:
+                        st.info("No hay proyectos para este asignatario.")
+
+        with main_tab1, traza.etapa("pestaña:Datos Completos", filas=len(df)):
+            st.subheader("Datos completos Core Bancario/Normativo")
+            # --- Bloque resumen ---
+            resumen_df = pd.DataFrame([resumen_agosto(df)])
+            #st.markdown('<div style="background:#f5f5f5;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;margin-bottom:10px;">Resumen general de la planilla</div>', unsafe_allow_html=True)
+            st.dataframe(resumen_df, use_container_width=True, hide_index=True)
+            columnas_ocultas = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion']
+            columnas_a_mostrar = [col for col in df.columns if col.lower() not in columnas_ocultas]
+            # Filtrar solo jefatura Core Bancario y Normativo
+            df_core = filtrar_core(df).copy()
+            codigos_azules = CODIGOS_AZULES
+            # Bloque Antes del Freeze (excluyendo Finalizado y Estabilización)
+            estados_excluir = ['finalizado', 'estabilización']
+            df_antes = df_core[
+                (~df_core['nombre'].astype(str).apply(lambda x: any(c in x for c in codigos_azules))) &
+                (~df_core['estado_actual'].astype(str).str.lower().isin(estados_excluir))
+            ]
+            st.markdown('<div style="background:#2c7873;color:#fff;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;">Antes del Freeze</div>', unsafe_allow_html=True)
+            st.success(f"Total de registros: {len(df_antes[columnas_a_mostrar])}")
             st.dataframe(
-                df_implementados[columnas_a_mostrar_impl].style.apply(highlight_filas, axis=1),
+                con_estilo(df_antes[columnas_a_mostrar], css_agosto),
                 use_container_width=True,
-                height=(35 * len(df_implementados[columnas_a_mostrar_impl]) + 40),
+                height=(35 * len(df_antes[columnas_a_mostrar]) + 40),
                 hide_index=True
             )
-        
-
-    with main_tab2:
-        st.subheader("Gráficos estadísticos de proyectos (solo Jefatura Core Bancario y Normativo)")
-
-        # Filtrar solo jefatura Core Bancario y Normativo
-        df_graf = df[df['jefatura'].str.lower().str.contains('core bancario|normativo', na=False)].copy()
-
-        # Gráfico 1: Proyectos por Estado Actual en orden personalizado
-        orden_estados = [
-            "PMO-Detenido",
-            "PMO-No iniciado",
-            "PMO-Relevamiento PMO",
-            "PMO-Pend. Validación técnica",
-            "DESA-Listo p/ Análisis Técnico",
-            "DESA-Análisis Técnico",
-            "DESA-Pendiente Desarrollo",
-            "DESA-En Curso",
-            "QA-En Pruebas QA",
-            "QA-En Pruebas Detenidas",
-            "QA-En Pruebas UAT",
-            "PROD-Para Comité de Pasajes",
-            "Estabilización",
-            "Finalizado"
-        ]
-        if 'estado_actual' in df_graf.columns:
-            df_graf['estado_actual'] = pd.Categorical(df_graf['estado_actual'], categories=orden_estados, ordered=True)
-            conteo_estados_ordenado = df_graf['estado_actual'].value_counts().reindex(orden_estados).fillna(0)
-            fig2 = px.bar(
-                conteo_estados_ordenado,
-                x=conteo_estados_ordenado.index,
-                y=conteo_estados_ordenado.values,
-                labels={'x': 'Estado Actual', 'y': 'Cantidad'},
-                title='Proyectos por Estado Actual (orden personalizado)',
-                color=conteo_estados_ordenado.index,
-                color_discrete_sequence=["#2980b9", "#2c7873", "#ffd700", "#444444"]*4
-            )
-            st.plotly_chart(fig2, use_container_width=True, key="fig2_estado_actual")
-
-        # Gráfico 2: Proyectos por etiquetas Pres/Agos/25 y Post/Agos/25 (colores similares a Gráfico 1)
-        def etiqueta_tipo(etiquetas):
-            etiquetas = str(etiquetas).lower()
-            if 'post/agos/25' in etiquetas:
-                return 'Post/Agos/25'
-            elif 'pres/agos/25' in etiquetas:
-                return 'Pres/Agos/25'
-            else:
-                return 'Otro'
-        df_graf['Tipo_Etiqueta'] = df_graf['etiquetas'].apply(etiqueta_tipo)
-        conteo_etiqueta = df_graf['Tipo_Etiqueta'].value_counts()
-
-        # Usar colores personalizados: implementados siempre #2c7873
-        color_map = {
-            'Post/Agos/25': '#ffd700',
-            'Pres/Agos/25': '#2980b9',
-            'Otro': '#2c7873'
-        }
-        # Si la categoría representa implementados, forzar color #2c7873
-        # (Aquí solo aplica si quieres que 'Post/Agos/25' o 'Pres/Agos/25' sean implementados, ajusta según tu lógica)
-        # Si quieres que todos sean #2c7873 cuando sean implementados, deberías hacerlo en el gráfico de implementados vs no implementados (fig4 y fig5)
-
-        fig3 = px.pie(
-            conteo_etiqueta,
-            names=conteo_etiqueta.index,
-            values=conteo_etiqueta.values,
-            title='Distribución de proyectos por Pres/Agos/25 y Post/Agos/25',
-            color=conteo_etiqueta.index,
-            color_discrete_map=color_map,
-            hole=0.3
-        )
-        fig3.update_traces(textinfo='label+percent')
-
-        # Gráfico 3b: Torta de implementados/no implementados por tipo de etiqueta (con porcentajes)
-        df_graf['implementado'] = df_graf['estado_actual'].apply(lambda x: 'Implementado' if str(x).strip().lower() in ['estabilización', 'finalizado'] else 'No implementado')
-        df_etiqueta_impl = df_graf.groupby(['Tipo_Etiqueta', 'implementado']).size().reset_index(name='Cantidad')
-        fig3b = px.sunburst(
-            df_etiqueta_impl,
-            path=['Tipo_Etiqueta', 'implementado'],
-            values='Cantidad',
-            color='implementado',
-            color_discrete_map={
-                'Implementado': '#2c7873',
-                'No implementado': '#ffd700'
-            },
-            title='Implementados vs No implementados (pres/agos/25 y post/agos/25)'
-        )
-        fig3b.update_traces(textinfo='label+percent entry')
-
-        # Mostrar ambos gráficos lado a lado
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(fig3, use_container_width=True, key="fig3_etiqueta")
-        with col2:
-            st.plotly_chart(fig3b, use_container_width=True, key="fig3b_sunburst")
-
-        # Gráfico 4: Comparativa de implementados (Estabilización/Finalizado) vs no implementados
-        def estado_implementado(estado):
-            estado = str(estado).strip().lower()
-            if estado in ['estabilización', 'finalizado']:
-                return 'Implementado'
-            else:
-                return 'No implementado'
-        df_graf['implementado'] = df_graf['estado_actual'].apply(estado_implementado)
-        conteo_impl = df_graf['implementado'].value_counts()
-        fig4 = px.pie(
-            conteo_impl,
-            names=conteo_impl.index,
-            values=conteo_impl.values,
-            title='Proyectos implementados vs no implementados',
-            color_discrete_map={
-                'Implementado': '#2c7873',
-                'No implementado': '#ffd700'
-            }
-        )
-        # Forzar color verde en el bloque de 'Implementado'
-        fig4.update_traces(marker=dict(colors=[
-            '#2c7873' if n == 'Implementado' else '#ffd700' for n in conteo_impl.index
-        ]))
-
-        # Gráfico 5: Estados agrupados (Implementado vs No implementado) por Gerencia Principal
-        fig5 = None
-        # Usar la misma lógica de identificación de Gerencia/Unidad que en el tab de agrupados por Gerencia/Unidad
-        def extraer_gerencia(valor):
-            if pd.isna(valor):
-                return "(Sin dato)"
-            return str(valor).split('>')[0].strip()
-
-        col_gerencia = None
-        for col in df_graf.columns:
-            if col.replace(' ', '').lower() in ["gerencia/unidad", "gerenciaunidad"]:
-                col_gerencia = col
-                break
-        if col_gerencia is not None:
-            df_graf = df_graf[df_graf[col_gerencia].notna() & (df_graf[col_gerencia].astype(str).str.strip() != '')].copy()
-            df_graf['Gerencia_Principal'] = df_graf[col_gerencia].apply(extraer_gerencia)
-            df_grouped = df_graf[df_graf['Gerencia_Principal'].notna() & (df_graf['Gerencia_Principal'].astype(str).str.strip() != '')]
-            df_grouped = df_grouped.groupby(['Gerencia_Principal', 'implementado']).size().reset_index(name='Cantidad')
-            if not df_grouped.empty:
-                fig5 = px.bar(
-                    df_grouped,
-                    x='Gerencia_Principal',
-                    y='Cantidad',
-                    color='implementado',
-                    barmode='group',
-                    title='Implementados vs No implementados por Gerencia Principal',
-                    color_discrete_map={
-                        'Implementado': '#2c7873',
-                        'No implementado': '#ffd700'
-                    }
-                )
-        # Mostrar gráfico 4 y 5 lado a lado
-        col3, col4 = st.columns(2)
-        with col3:
-            st.plotly_chart(fig4, use_container_width=True, key="fig4_impl_col")
-        with col4:
-            if fig5 is not None:
-                st.plotly_chart(fig5, use_container_width=True, key="fig5_gerencia")
-            else:
-                st.info("No hay datos suficientes para mostrar el gráfico por Gerencia Principal.")
-
-    with main_tab3:
-        st.subheader("Agrupados por Estados (solo Core)")
-        # Agrupación y visualización por estado para Core
-        def agrupar_jefatura(jef):
-            if pd.isna(jef):
-                return 'Sin Jefatura'
-            jef = str(jef)
-            if 'core bancario' in jef.lower() or 'normativo' in jef.lower():
-                return 'Core'
-            else:
-                return 'Canales'
-        df_agrupado = df.copy()
-        df_agrupado['Grupo Jefatura'] = df_agrupado['jefatura'].apply(agrupar_jefatura)
-        columnas_ocultas_agrupado = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion']
-        columnas_a_mostrar_agrupado = [col for col in df_agrupado.columns if col.lower() not in columnas_ocultas_agrupado]
-        df_core = df_agrupado[df_agrupado['Grupo Jefatura'] == 'Core'].copy()
-
-        # Orden deseado de estados
-        orden_estados = [
-            "PMO-Detenido",
-            "PMO-No iniciado",
-            "PMO-Relevamiento PMO",
-            "PMO-Pend. Validación técnica",
-            "DESA-Listo p/ Análisis Técnico",
-            "DESA-Análisis Técnico",
-            "DESA-Pendiente Desarrollo",
-            "DESA-En Curso",
-            "QA-En Pruebas QA",
-            "QA-En Pruebas Detenidas",
-            "QA-En Pruebas UAT",
-            "PROD-Para Comité de Pasajes",
-            "Estabilización",
-            "Finalizado"
-        ]
-        # Colores suaves para los grupos
-        def obtener_color_estado(estado):
-            # Colores intensos y contrastantes para dark mode, verde más suave
-            if estado.startswith("PMO"):
-                return "#51748b"  
-            elif estado.startswith("DESA"):
-                return "#27a9ae"  
-            elif estado.startswith("QA"):
-                return "#ffd90066"  
-            else:
-                return "#2c7873"  
-
-        # Convertir la columna a categoría para ordenar
-        df_core['estado_actual'] = pd.Categorical(df_core['estado_actual'], categories=orden_estados, ordered=True)
-        # Filtrar solo los estados presentes y en el orden deseado
-        estados_core = [estado for estado in orden_estados if estado in df_core['estado_actual'].cat.categories and (df_core['estado_actual'] == estado).any()]
-
-        st.write("Estados de proyectos Core:")
-        for estado in estados_core:
-            n = df_core[df_core['estado_actual'] == estado].shape[0]
-            color = obtener_color_estado(estado)
-            st.markdown(
-                f'<div style="background-color:{color};padding:10px 16px;border-radius:6px;margin-bottom:0px;font-weight:bold;font-size:1.1em;">{estado} <span style="float:right">{n}</span></div>',
-                unsafe_allow_html=True
+            exportacion.boton_descarga(df_antes[columnas_a_mostrar], "antes_del_freeze", key="descarga_antes_freeze")
+            # Bloque Después del Freeze (excluyendo Finalizado y Estabilización)
+            df_despues = df_core[
+                (df_core['nombre'].astype(str).apply(lambda x: any(c in x for c in codigos_azules))) &
+                (~df_core['estado_actual'].astype(str).str.lower().isin(estados_excluir))
+            ]
+            st.markdown('<div style="background:#2980b9;color:#fff;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;">Después del Freeze</div>', unsafe_allow_html=True)
+            st.success(f"Total de registros: {len(df_despues[columnas_a_mostrar])}")
+            st.dataframe(
+                con_estilo(df_despues[columnas_a_mostrar], css_agosto),
+                use_container_width=True,
+                height=(35 * len(df_despues[columnas_a_mostrar]) + 40),
+                hide_index=True
             )
-            if n > 0:
+            exportacion.boton_descarga(df_despues[columnas_a_mostrar], "despues_del_freeze", key="descarga_despues_freeze")
+
+             # --- Tabla solo implementados al final ---
+            # Definir df_core y columnas_a_mostrar si no existen
+            df_core_impl = filtrar_core(df).copy()
+            columnas_ocultas_impl = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion']
+            columnas_a_mostrar_impl = [col for col in df_core_impl.columns if col.lower() not in columnas_ocultas_impl]
+            df_implementados = df_core_impl[df_core_impl['estado_actual'].astype(str).str.lower().isin(['finalizado', 'estabilización'])]
+            if not df_implementados.empty:
+                st.markdown('<div style="background:#2c7873;color:#fff;padding:8px 16px;border-radius:6px;display:inline-block;font-weight:bold;margin-top:24px;">Implementados (Finalizado o Estabilización)</div>', unsafe_allow_html=True)
                 st.dataframe(
-                    df_core[df_core['estado_actual'] == estado][columnas_a_mostrar_agrupado].style.apply(highlight_filas, axis=1),
+                    con_estilo(df_implementados[columnas_a_mostrar_impl], css_agosto),
                     use_container_width=True,
+                    height=(35 * len(df_implementados[columnas_a_mostrar_impl]) + 40),
                     hide_index=True
                 )
-            else:
-                st.info("No hay proyectos en este estado.")
-
-    # Nuevo tab: Agrupados por Gerencia/Unidad
-    with tab_gerencia:
-        st.write("Proyectos agrupados por Gerencia/Unidad (primer nivel):")
-
-        def extraer_gerencia(valor):
-            if pd.isna(valor):
-                return "(Sin dato)"
-            return str(valor).split('>')[0].strip()
-
-        # Buscar el nombre real de la columna 'Gerencia/Unidad' ignorando mayúsculas, minúsculas y espacios
-        col_gerencia = None
-        for col in df.columns:
-            if col.replace(' ', '').lower() in ["gerencia/unidad", "gerenciaunidad"]:
-                col_gerencia = col
-                break
-        if col_gerencia is None:
-            st.error("No se encontró la columna 'Gerencia/Unidad' en los datos.")
-        else:
-            # Filtrar por jefatura que contenga 'core bancario' o 'normativo'
-            df_jefatura = df[df['jefatura'].str.lower().str.contains('core bancario|normativo', na=False)].copy()
-            df_jefatura['Gerencia_Principal'] = df_jefatura[col_gerencia].apply(extraer_gerencia)
-            gerencias = df_jefatura['Gerencia_Principal'].dropna().unique()
-            gerencias = sorted(gerencias)
-
-            # Calcular columnas a mostrar para este tab (evitar columnas inexistentes)
-            columnas_ocultas_gerencia = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion', 'Grupo Jefatura']
-            columnas_a_mostrar_gerencia = [col for col in df_jefatura.columns if col.lower() not in [c.lower() for c in columnas_ocultas_gerencia]]
-
-            for ger in gerencias:
-                n = df_jefatura[df_jefatura['Gerencia_Principal'] == ger].shape[0]
-                color = "#b96329"  # azul fuerte
+                exportacion.boton_descarga(df_implementados[columnas_a_mostrar_impl], "implementados", key="descarga_implementados")
+        
+
+        with main_tab2, traza.etapa("pestaña:Gráficos", filas=len(df)):
+            st.subheader("Gráficos estadísticos de proyectos (solo Jefatura Core Bancario y Normativo)")
+
+            # Columnas derivadas y figuras ya calculadas (motor pandas); con otro motor los cruces pesados se consultan aquí
+            columnas_graf = precalculado["columnas agosto"]
+            figuras = precalculado["figuras agosto"]
+            df_graf = columnas_graf["graf"]
+
+            # Gráfico 1: Proyectos por Estado Actual en orden personalizado
+            if 'estado_actual' in df_graf.columns:
+                with traza.etapa("gráfico:fig2_estado_actual"):
+                    st.plotly_chart(figuras["estados"], use_container_width=True, key="fig2_estado_actual")
+
+            # Gráfico 2: Proyectos por etiquetas Pres/Agos/25 y Post/Agos/25 (colores similares a Gráfico 1)
+            # Gráfico 3b: Torta de implementados/no implementados por tipo de etiqueta (con porcentajes)
+            # Mostrar ambos gráficos lado a lado
+            col1, col2 = st.columns(2)
+            with col1:
+                with traza.etapa("gráfico:fig3_etiqueta"):
+                    st.plotly_chart(figuras["etiquetas"], use_container_width=True, key="fig3_etiqueta")
+            with col2:
+                with traza.etapa(f"gráfico:fig3b_sunburst ({motor_consultas})"):
+                    if motor_consultas == "pandas":
+                        fig3b = figuras["etiqueta_implementado"]
+                    else:
+                        fig3b = graficos.figura_etiqueta_implementado(df_graf, consulta_graficos(origen, motor_consultas, columnas_graf))
+                    st.plotly_chart(fig3b, use_container_width=True, key="fig3b_sunburst")
+
+            # Gráfico 4: Comparativa de implementados (Estabilización/Finalizado) vs no implementados
+            fig4 = figuras["implementados"]
+
+            # Gráfico 5: Estados agrupados (Implementado vs No implementado) por Gerencia Principal
+            # El primer nivel de la ruta sale del árbol de gerencias (sin recorrer fila por fila)
+            fig5 = figuras["gerencia"]
+            df_gerencia = columnas_graf["gerencia"]
+            if df_gerencia is not None and motor_consultas != "pandas":
+                with traza.etapa(f"gráfico:fig5_gerencia ({motor_consultas})"):
+                    fig5 = graficos.figura_gerencia(df_gerencia, consulta_graficos(origen, motor_consultas, columnas_graf))
+            # Mostrar gráfico 4 y 5 lado a lado
+            col3, col4 = st.columns(2)
+            with col3:
+                st.plotly_chart(fig4, use_container_width=True, key="fig4_impl_col")
+            with col4:
+                if fig5 is not None:
+                    st.plotly_chart(fig5, use_container_width=True, key="fig5_gerencia")
+                else:
+                    st.info("No hay datos suficientes para mostrar el gráfico por Gerencia Principal.")
+
+        with main_tab3, traza.etapa("pestaña:Agrupados por Estados", filas=len(df)):
+            st.subheader("Agrupados por Estados (solo Core)")
+            # Agrupación y visualización por estado para Core
+            df_agrupado = df.copy()
+            df_agrupado['Grupo Jefatura'] = aplicar_por_valor(df_agrupado['jefatura'], agrupar_jefatura)
+            columnas_ocultas_agrupado = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion']
+            columnas_a_mostrar_agrupado = [col for col in df_agrupado.columns if col.lower() not in columnas_ocultas_agrupado]
+            df_core = df_agrupado[df_agrupado['Grupo Jefatura'] == 'Core'].copy()
+
+            # Orden deseado de estados
+            orden_estados = ORDEN_ESTADOS
+            # Convertir la columna a categoría para ordenar
+            df_core['estado_actual'] = pd.Categorical(df_core['estado_actual'], categories=orden_estados, ordered=True)
+            # Filtrar solo los estados presentes y en el orden deseado
+            estados_core = [estado for estado in orden_estados if estado in df_core['estado_actual'].cat.categories and (df_core['estado_actual'] == estado).any()]
+
+            st.write("Estados de proyectos Core:")
+            for estado in estados_core:
+                n = df_core[df_core['estado_actual'] == estado].shape[0]
+                color = obtener_color_estado(estado)
                 st.markdown(
-                    f'<div style="background-color:{color};padding:10px 16px;border-radius:6px;margin-bottom:0px;font-weight:bold;font-size:1.1em;">{ger} <span style="float:right">{n}</span></div>',
+                    f'<div style="background-color:{color};padding:10px 16px;border-radius:6px;margin-bottom:0px;font-weight:bold;font-size:1.1em;">{estado} <span style="float:right">{n}</span></div>',
                     unsafe_allow_html=True
                 )
                 if n > 0:
                     st.dataframe(
-                        df_jefatura[df_jefatura['Gerencia_Principal'] == ger][columnas_a_mostrar_gerencia].style.apply(highlight_filas, axis=1),
+                        con_estilo(df_core[df_core['estado_actual'] == estado][columnas_a_mostrar_agrupado], css_agosto),
                         use_container_width=True,
                         hide_index=True
                     )
+                    exportacion.boton_descarga(df_core[df_core['estado_actual'] == estado][columnas_a_mostrar_agrupado], f"estado_{estado}", key=f"descarga_estado_{estado}")
                 else:
-                    st.info("No hay proyectos en esta gerencia/unidad.")
-    # ...existing code...
+                    st.info("No hay proyectos en este estado.")
+
+        # Nuevo tab: Agrupados por Gerencia/Unidad
+        with tab_gerencia, traza.etapa("pestaña:Agrupados por Gerencia/Unidad", filas=len(df)):
+            if arbol is None:
+                st.error("No se encontró la columna 'Gerencia/Unidad' en los datos.")
+            else:
+                # Calcular columnas a mostrar para este tab (evitar columnas inexistentes)
+                columnas_ocultas_gerencia = ['proyecto matriz', 'autor', 'codigo_proyecto', 'estabilizacion', 'codigo_estabilizacion', 'Grupo Jefatura']
+                columnas_a_mostrar_gerencia = [col for col in arbol.df.columns if col.lower() not in [c.lower() for c in columnas_ocultas_gerencia]]
+
+                # Treemap de todos los niveles con los conteos precalculados del árbol
+                with traza.etapa("gráfico:arbol_gerencias", filas=len(arbol.nodos)):
+                    fig_arbol = precalculado["figuras agosto"]["arbol"]
+                if fig_arbol is not None:
+                    st.plotly_chart(fig_arbol, use_container_width=True, key="arbol_gerencias")
+
+                # Navegación: abrir un nodo es una búsqueda en el índice, no un nuevo filtro sobre los datos
+                st.subheader("Navegar por Gerencia/Unidad")
+                ruta = st.selectbox(
+                    "Nodo",
+                    [""] + arbol.nodos.index.tolist(),
+                    format_func=lambda r: r or "Todas las gerencias",
+                    key="nodo_gerencia",
+                )
+                hijos = arbol.hijos(ruta)
+                if not hijos.empty:
+                    st.write("Conteos por nivel inferior:")
+                    st.dataframe(arbol.tabla(hijos), use_container_width=True, hide_index=True)
+                if ruta:
+                    filas_nodo = arbol.filas(ruta)[columnas_a_mostrar_gerencia]
+                    st.write(f"Proyectos de {ruta} ({len(filas_nodo)}):")
+                    st.dataframe(con_estilo(filas_nodo, css_agosto), use_container_width=True, hide_index=True)
+                    exportacion.boton_descarga(filas_nodo, "gerencia_nodo", key="descarga_nodo_gerencia")
+
+                st.subheader("Proyectos agrupados por Gerencia/Unidad (primer nivel)")
+                for ger, nodo in arbol.raices().iterrows():
+                    n = nodo['Proyectos']
+                    color = "#b96329"  # azul fuerte
+                    st.markdown(
+                        f'<div style="background-color:{color};padding:10px 16px;border-radius:6px;margin-bottom:0px;font-weight:bold;font-size:1.1em;">{ger} <span style="float:right">{n}</span></div>',
+                        unsafe_allow_html=True
+                    )
+                    if n > 0:
+                        df_ger = arbol.filas(ger)[columnas_a_mostrar_gerencia]
+                        st.dataframe(
+                            con_estilo(df_ger, css_agosto),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                        exportacion.boton_descarga(df_ger, f"gerencia_{ger}", key=f"descarga_gerencia_{ger}")
+                    else:
+                        st.info("No hay proyectos en esta gerencia/unidad.")
+        # ...existing code...
+        precalculo.mostrar_informe(precalculado)
+    except Exception as e:
+        st.error(f"Error al procesar el archivo: {str(e)}")
+        error = traza.error()
+        with st.expander("Detalle técnico del error"):
+            if error:
+                st.write(f"Etapa: {error['etapa']}")
+            st.exception(e)
+elif carpeta_configurada() is not None:
+    st.info("Leyendo la exportación de la carpeta de entrada; aparecerá en el próximo rerun. También puedes subir un archivo.")
 else:
-    st.info("Por favor, sube un archivo Excel para comenzar.")
\ No newline at end of file
+    st.info("Por favor, sube un archivo Excel para comenzar.")
+
+# --- Costos de importación (arranque en frío) ---
+with st.sidebar.expander("⏱️ Tiempos de importación"):
+    st.dataframe(dependencias.resumen_tiempos(), use_container_width=True, hide_index=True)
+
+# --- Tiempos por etapa del rerun ---
+instrumentacion.mostrar_panel(traza)
+traza.guardar()
@@ -0,0 +1,113 @@
+"""Importación diferida de dependencias pesadas y medición del arranque en frío.
+
+Los dashboards no instalan paquetes en tiempo de ejecución: si falta una
+dependencia se informa de inmediato para instalarla con requirements.txt.
+
+Para medir el costo de importación de cada dependencia en un proceso limpio:
+    python dependencias.py
+"""
+import importlib
+import importlib.util
+import subprocess
+import sys
+import time
+
+# Segundos que tardó cada importación la primera vez en este proceso (arranque en frío)
+TIEMPOS_IMPORTACION = {}
+# Segundos de la última medición posterior (en caliente: los módulos ya están cargados)
+TIEMPOS_EN_CALIENTE = {}
+
+
+class DependenciaFaltante(ImportError):
+    """Una dependencia requerida no está instalada."""
+
+    def __init__(self, modulo):
+        super().__init__(
+            f"Falta la dependencia '{modulo}'. Instálala con: pip install -r requirements.txt"
+        )
+        self.modulo = modulo
+
+
+def faltantes(*modulos):
+    """Devuelve los módulos que no están instalados, sin importarlos."""
+    return [modulo for modulo in modulos if importlib.util.find_spec(modulo) is None]
+
+def verificar(*modulos):
+    """Falla de inmediato si alguno de los módulos no está instalado."""
+    ausentes = faltantes(*modulos)
+    if ausentes:
+        raise DependenciaFaltante(ausentes[0])
+
+def importar(modulo):
+    """Importa un módulo registrando cuánto tardó la primera vez."""
+    if modulo in sys.modules:
+        return sys.modules[modulo]
+    inicio = time.perf_counter()
+    try:
+        resultado = importlib.import_module(modulo)
+    except ModuleNotFoundError as e:
+        raise DependenciaFaltante(modulo) from e
+    TIEMPOS_IMPORTACION[modulo] = time.perf_counter() - inicio
+    return resultado
+
+def registrar_tiempo(nombre, inicio):
+    """Registra el tiempo transcurrido desde inicio (time.perf_counter()).
+
+    La primera medición de cada nombre queda como la de arranque en frío; las
+    siguientes (reruns con todo ya importado) van aparte, en TIEMPOS_EN_CALIENTE.
+    """
+    segundos = time.perf_counter() - inicio
+    if nombre in TIEMPOS_IMPORTACION:
+        TIEMPOS_EN_CALIENTE[nombre] = segundos
+    else:
+        TIEMPOS_IMPORTACION[nombre] = segundos
+
+def registrar_imports_script(script, inicio):
+    """Registra los imports del encabezado de un script (cada script con su propia clave)."""
+    registrar_tiempo(f"imports de {script}", inicio)
+
+
+def resumen_tiempos():
+    """Tiempos registrados en milisegundos (en frío y último en caliente), del más lento al más rápido."""
+    return [
+        {
+            "Importación": nombre,
+            "ms en frío": round(segundos * 1000, 1),
+            "ms en caliente": round(TIEMPOS_EN_CALIENTE[nombre] * 1000, 1) if nombre in TIEMPOS_EN_CALIENTE else None,
+        }
+        for nombre, segundos in sorted(TIEMPOS_IMPORTACION.items(), key=lambda item: -item[1])
+    ]
+
+
+class ModuloPerezoso:
+    """Se comporta como el módulo indicado, pero lo importa en el primer uso."""
+
+    def __init__(self, modulo):
+        self._nombre_modulo = modulo
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importar(self._nombre_modulo)
+        return getattr(self._modulo, atributo)
+
+
+def tiempos_en_frio(modulos):
+    """Mide la importación de cada módulo en un intérprete nuevo (arranque en frío)."""
+    tiempos = {}
+    for modulo in modulos:
+        codigo = (
+            "import time; inicio = time.perf_counter(); "
+            f"import {modulo}; print(time.perf_counter() - inicio)"
+        )
+        resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True)
+        tiempos[modulo] = float(resultado.stdout) if resultado.returncode == 0 else None
+    return tiempos
+
+
+if __name__ == "__main__":
+    for modulo, segundos in tiempos_en_frio(["pandas", "streamlit", "plotly.express", "openpyxl", "pyarrow"]).items():
+        if segundos is None:
+            print(f"{modulo:<16} no instalado")
+        else:
+            print(f"{modulo:<16} {segundos * 1000:8.1f} ms")
@@ -0,0 +1,91 @@
+"""Estilos de filas y celdas de las tablas de los dashboards (sin Streamlit)."""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Proyectos posteriores al freeze (se resaltan en azul)
+CODIGOS_AZULES = [
+    "M022/24", "M030/25", "M018/25", "M048/25", "M034/25",
+    "M041/25", "M136/24", "M043/25", "M034/24"
+]
+
+
+# Función para mostrar barra de progreso en % Realizado
+def barra_porcentaje(val):
+    try:
+        pct = float(val)
+    except:
+        return val
+    pct = max(0, min(100, pct))
+    color = '#2c7873' if pct == 100 else '#2980b9'
+    return f'<div style="background:#e0e0e0;border-radius:4px;position:relative;height:22px;width:100%;"><div style="background:{color};width:{pct}%;height:100%;border-radius:4px;"></div><span style="position:absolute;left:50%;top:0;transform:translateX(-50%);color:#222;font-weight:bold;">{pct:.0f}%</span></div>'
+
+# Función para resaltar filas:
+# - Verde suave de fondo si estado_actual es 'Estabilización' o 'Finalizado'
+# - Texto dorado si etiquetas contiene 'Post/Agos/25' (aunque el fondo sea verde)
+def highlight_filas(row):
+    estado = str(row.get("estado_actual", "")).strip().lower()
+    tiene_post_agos = "post/agos/25" in str(row.get("etiquetas", "")).lower()
+    nombre = str(row.get("nombre", ""))
+    color = ""
+    # Fondo verde si corresponde
+    if estado in ["finalizado", "estabilización"]:
+        color = "background-color: #2c7873; color: #fff;"
+    # Si tiene Post/Agos/25, forzar color de texto dorado
+    if tiene_post_agos:
+        color = color.replace('color: #fff;', 'color: #ffd700;') if 'color: #fff;' in color else color + ' color: #ffd700;'
+    # Si el nombre contiene alguno de los códigos, forzar color azul
+    if any(codigo in nombre for codigo in CODIGOS_AZULES):
+        # Si ya hay color de fondo, solo cambia el color de letra
+        if 'color:' in color:
+            color = re.sub(r'color: #[0-9a-fA-F]{3,6};?', 'color: #2980b9;', color)
+        else:
+            color += ' color: #2980b9;'
+    return [color] * len(row)
+
+def _columna_texto(df, columna):
+    """Texto de la columna como lo ve highlight_filas con row.get (vacío si no está)."""
+    if columna not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[columna].astype(object).map(str)
+
+def css_filas(df):
+    """El CSS de highlight_filas para cada fila de df (Serie con su índice).
+
+    highlight_filas depende solo de tres condiciones (estado implementado,
+    etiqueta Post/Agos/25 y código azul en el nombre): se evalúan por columna
+    y cada combinación se resuelve una vez con la misma función.
+    """
+    estado = _columna_texto(df, "estado_actual").str.strip().str.lower().isin(["finalizado", "estabilización"])
+    post_agos = _columna_texto(df, "etiquetas").str.lower().str.contains("post/agos/25", regex=False)
+    azul = _columna_texto(df, "nombre").str.contains("|".join(map(re.escape, CODIGOS_AZULES)), regex=True)
+    combinacion = estado.to_numpy(dtype=int) * 4 + post_agos.to_numpy(dtype=int) * 2 + azul.to_numpy(dtype=int)
+    estilos = np.array([
+        highlight_filas({
+            "estado_actual": "finalizado" if c & 4 else "",
+            "etiquetas": "post/agos/25" if c & 2 else "",
+            "nombre": CODIGOS_AZULES[0] if c & 1 else "",
+        })[0]
+        for c in range(8)
+    ], dtype=object)
+    return pd.Series(estilos[combinacion], index=df.index)
+
+def con_estilo(vista, css):
+    """Styler de la vista (un corte de filas del DataFrame de css_filas) con el CSS ya calculado de cada fila."""
+    def estilos(datos):
+        por_fila = css.reindex(datos.index).fillna("").to_numpy()
+        return pd.DataFrame(np.repeat(por_fila[:, None], datos.shape[1], axis=1), index=datos.index, columns=datos.columns)
+    return vista.style.apply(estilos, axis=None)
+
+# Colores suaves para los grupos
+def obtener_color_estado(estado):
+    # Colores intensos y contrastantes para dark mode, verde más suave
+    if estado.startswith("PMO"):
+        return "#51748b"
+    elif estado.startswith("DESA"):
+        return "#27a9ae"
+    elif estado.startswith("QA"):
+        return "#ffd90066"
+    else:
+        return "#2c7873"
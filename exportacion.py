@@ -0,0 +1,99 @@
+"""Exportación de las vistas de detalle a Excel (.xlsx) o Parquet.
+
+El .xlsx se escribe con openpyxl en modo write_only: las filas se vuelcan al
+archivo a medida que se generan, sin armar la hoja completa en memoria. El
+archivo se arma recién cuando el usuario pide la descarga (ver
+boton_descarga), no en cada rerun del dashboard. st.download_button necesita
+el contenido completo, así que el archivo terminado sí queda en memoria.
+"""
+from io import BytesIO
+
+import pandas as pd
+
+import dependencias
+
+FORMATOS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Filas convertidas por bloque al recorrer el DataFrame
+FILAS_POR_BLOQUE = 5000
+
+
+def _bloque_celdas(bloque):
+    """Convierte un bloque de filas a tipos que acepta openpyxl (NaN/NaT -> None)."""
+    bloque = bloque.copy()
+    for columna in bloque.columns:
+        serie = bloque[columna]
+        if isinstance(serie.dtype, pd.DatetimeTZDtype):
+            bloque[columna] = serie.dt.tz_localize(None)
+        elif isinstance(serie.dtype, (pd.CategoricalDtype, pd.PeriodDtype)):
+            bloque[columna] = serie.astype(str).where(serie.notna())
+    bloque = bloque.astype(object)
+    return bloque.where(bloque.notna(), None)
+
+def _filas(df):
+    """Genera las filas del DataFrame como listas, de a bloques."""
+    for inicio in range(0, len(df), FILAS_POR_BLOQUE):
+        bloque = _bloque_celdas(df.iloc[inicio:inicio + FILAS_POR_BLOQUE])
+        for fila in bloque.itertuples(index=False, name=None):
+            yield list(fila)
+
+def escribir_xlsx(df, destino, hoja="Datos"):
+    """Escribe df en destino (ruta o archivo binario) en modo streaming."""
+    openpyxl = dependencias.importar("openpyxl")
+    libro = openpyxl.Workbook(write_only=True)
+    hoja_datos = libro.create_sheet(title=hoja[:31])
+    hoja_datos.append([str(columna) for columna in df.columns])
+    for fila in _filas(df):
+        hoja_datos.append(fila)
+    libro.save(destino)
+
+def escribir_parquet(df, destino):
+    """Escribe df en destino (ruta o archivo binario) como Parquet."""
+    df = df.copy()
+    # Columnas object con tipos mezclados (p. ej. fechas como texto y NaN) no
+    # tienen tipo Arrow directo: se exportan como texto
+    for columna in df.columns[df.dtypes == object]:
+        df[columna] = df[columna].where(df[columna].isna(), df[columna].astype(str))
+    df.columns = [str(columna) for columna in df.columns]
+    df.to_parquet(destino, index=False)
+
+def exportar(df, formato):
+    """Devuelve el contenido del archivo exportado (bytes) en el formato pedido."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    archivo = BytesIO()
+    if formato == "xlsx":
+        escribir_xlsx(df, archivo)
+    else:
+        escribir_parquet(df, archivo)
+    return archivo.getvalue()
+
+def nombre_archivo(nombre, formato):
+    """Nombre de archivo seguro a partir del título de la vista."""
+    base = "".join(c if c.isalnum() or c in "-_" else "_" for c in nombre).strip("_")
+    return f"{base or 'detalle'}.{formato}"
+
+
+def boton_descarga(df, nombre, key):
+    """Descarga de la vista: el archivo se genera solo al pulsar 'Preparar descarga'."""
+    import streamlit as st
+    col_formato, col_boton = st.columns([1, 3])
+    formato = col_formato.selectbox(
+        "Formato", list(FORMATOS), key=f"{key}_formato", label_visibility="collapsed"
+    )
+    if col_boton.button("⬇️ Preparar descarga", key=f"{key}_preparar", disabled=df.empty):
+        with st.spinner(f"Generando {formato} ({len(df)} filas)..."):
+            contenido = exportar(df, formato)
+        # on_click="ignore": descargar no dispara un rerun, y el archivo se
+        # descarta en el siguiente rerun en lugar de quedar en memoria
+        col_boton.download_button(
+            f"Descargar {nombre_archivo(nombre, formato)}",
+            data=contenido,
+            file_name=nombre_archivo(nombre, formato),
+            mime=FORMATOS[formato],
+            key=f"{key}_descargar",
+            on_click="ignore",
+        )
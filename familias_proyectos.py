@@ -0,0 +1,128 @@
+import time
+_inicio_importaciones = time.perf_counter()
+import numpy as np
+import streamlit as st
+from io import BytesIO
+import dependencias
+import exportacion
+import instrumentacion
+from procesamiento import leer_proyectos, ORDEN_ESTADOS
+from jerarquia_proyectos import GrafoProyectos
+from estilos import obtener_color_estado
+dependencias.registrar_imports_script("familias_proyectos", _inicio_importaciones)
+
+# Plotly se importa recién al construir el primer gráfico
+px = dependencias.ModuloPerezoso("plotly.express")
+
+st.set_page_config(page_title="Familias de Proyectos", page_icon="🌳", layout="wide")
+# Tiempos por etapa de este rerun
+traza = instrumentacion.Traza("familias_proyectos")
+st.title("🌳 Proyectos matriz, subproyectos y estabilizaciones")
+
+# Verificar dependencias sin instalar nada en tiempo de ejecución
+try:
+    dependencias.verificar("openpyxl", "plotly")
+except dependencias.DependenciaFaltante as e:
+    st.error(str(e))
+    st.stop()
+
+# Columnas que se muestran de cada integrante de la familia
+COLUMNAS_FAMILIA = ["nivel", "relacion", "nombre", "estado_actual", "padre", "asignatario", "gestor",
+                    "fecha_inicio", "fecha_fin", "fecha_pasaje_prod"]
+
+
+@st.cache_resource(show_spinner="Armando la jerarquía de proyectos...", max_entries=4)
+def construir_grafo(contenido):
+    """Lee la exportación y arma el índice padre/hijos; se comparte por contenido del archivo."""
+    dependencias.importar("openpyxl")
+    return GrafoProyectos(leer_proyectos(BytesIO(contenido)))
+
+
+archivo = st.sidebar.file_uploader("Sube el archivo Excel de proyectos", type=["xlsx"], key="exportacion_familias")
+
+if archivo is not None:
+    try:
+        # El grafo se arma una vez por archivo; los reruns solo hacen búsquedas en él
+        with traza.etapa("lectura y jerarquía") as registro:
+            grafo = construir_grafo(archivo.getvalue())
+            df = grafo.df
+            registro["filas"] = len(df)
+        familias = grafo.familias
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Familias", len(familias))
+        col2.metric("Subproyectos", int(familias["Subproyectos"].sum()))
+        col3.metric("Estabilizaciones", int(familias["Estabilizaciones"].sum()))
+        col4.metric("Familias con pendientes", int((familias["Pendientes"] > 0).sum()))
+
+        st.subheader("Estado consolidado por familia")
+        solo_pendientes = st.checkbox("Solo familias con pendientes", key="solo_familias_pendientes")
+        tabla = familias[familias["Pendientes"] > 0] if solo_pendientes else familias
+        st.dataframe(tabla, use_container_width=True, hide_index=True)
+        exportacion.boton_descarga(tabla, "familias_proyectos", key="descarga_familias")
+
+        st.subheader("Familia de un proyecto")
+        if familias.empty:
+            st.info("La exportación no tiene proyectos con subproyectos ni estabilizaciones.")
+        else:
+            # Cualquier integrante lleva a su familia completa (búsqueda en el índice, sin filtrar el DataFrame)
+            nombres = df["nombre"].astype(str).to_numpy()
+            opciones = np.flatnonzero(np.isin(grafo.raiz, familias.index.to_numpy()))
+            opciones = opciones[np.argsort(nombres[opciones], kind="stable")]
+            posicion = st.selectbox(
+                "Proyecto",
+                opciones.tolist(),
+                format_func=lambda p: nombres[p],
+                key="proyecto_familia",
+            )
+            with traza.etapa("familia") as registro:
+                familia = grafo.familia(posicion)
+                registro["filas"] = len(familia)
+            consolidado = familias.loc[grafo.raiz[posicion]]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Integrantes", int(consolidado["Integrantes"]))
+            col2.metric("Pendientes", int(consolidado["Pendientes"]))
+            col3.metric("Estado más atrasado", consolidado["Estado más atrasado"])
+
+            with traza.etapa("gráfico:familia", filas=len(familia)):
+                recorrido = familia.index.to_numpy()
+                padres = grafo.padre[recorrido]
+                datos = familia.assign(
+                    id=recorrido.astype(str),
+                    id_padre=np.where(padres >= 0, padres.astype(str), ""),
+                    cantidad=1,
+                )
+                fig = px.treemap(
+                    datos,
+                    ids="id",
+                    parents="id_padre",
+                    names="nombre",
+                    values="cantidad",
+                    color="estado_actual",
+                    color_discrete_map={estado: obtener_color_estado(estado) for estado in ORDEN_ESTADOS},
+                    title="Familia del proyecto (color por estado)",
+                )
+                fig.update_traces(branchvalues="remainder")
+                st.plotly_chart(fig, use_container_width=True, key="familia_proyecto")
+
+            columnas = [c for c in COLUMNAS_FAMILIA if c in familia.columns]
+            st.dataframe(familia[columnas], use_container_width=True, hide_index=True)
+            exportacion.boton_descarga(familia[columnas], "familia_proyecto", key="descarga_familia")
+
+    except Exception as e:
+        st.error(f"Ocurrió un error al procesar el archivo: {e}")
+        error = traza.error()
+        with st.expander("Detalle técnico del error"):
+            if error:
+                st.write(f"Etapa: {error['etapa']}")
+            st.exception(e)
+else:
+    st.info("Por favor, sube un archivo Excel para comenzar.")
+
+# --- Costos de importación (arranque en frío) ---
+with st.sidebar.expander("⏱️ Tiempos de importación"):
+    st.dataframe(dependencias.resumen_tiempos(), use_container_width=True, hide_index=True)
+
+# --- Tiempos por etapa del rerun ---
+instrumentacion.mostrar_panel(traza)
+traza.guardar()
@@ -0,0 +1,111 @@
+import time
+_inicio_importaciones = time.perf_counter()
+import os
+import streamlit as st
+import dependencias
+import exportacion
+import instrumentacion
+from historico import listar_exportaciones, firma_archivos, construir_historico, flujo_acumulado
+dependencias.registrar_imports_script("flujo_acumulado", _inicio_importaciones)
+
+# Plotly se importa recién al construir el primer gráfico
+px = dependencias.ModuloPerezoso("plotly.express")
+
+st.set_page_config(page_title="Flujo Acumulado de Proyectos", page_icon="📈", layout="wide")
+# Tiempos por etapa de este rerun
+traza = instrumentacion.Traza("flujo_acumulado")
+st.title("📈 Diagrama de flujo acumulado por estado")
+
+# Verificar dependencias sin instalar nada en tiempo de ejecución
+try:
+    dependencias.verificar("openpyxl", "plotly", "pyarrow")
+except dependencias.DependenciaFaltante as e:
+    st.error(str(e))
+    st.stop()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def leer_historico(carpeta, firma, _procesos):
+    """construir_historico, una vez por contenido de la carpeta (firma: nombre, tamaño y fecha de cada archivo)."""
+    barra = st.progress(0.0, text="Leyendo exportaciones...")
+
+    def progreso(hechos, total, ruta):
+        barra.progress(hechos / total if total else 1.0, text=f"Leyendo exportaciones... {hechos}/{total}")
+
+    resultado = construir_historico(carpeta, procesos=_procesos, progreso=progreso)
+    barra.empty()
+    return resultado
+
+
+# --- Carpeta con las exportaciones semanales ---
+st.sidebar.header("📁 Exportaciones históricas")
+carpeta = st.sidebar.text_input(
+    "Carpeta con las exportaciones (.xlsx)",
+    value=os.environ.get("DASHBOARD_HISTORICO", "historico"),
+    key="carpeta_historico",
+)
+procesos = st.sidebar.number_input("Procesos en paralelo", min_value=1, max_value=os.cpu_count() or 1,
+                                   value=os.cpu_count() or 1, key="procesos_historico")
+
+if not os.path.isdir(carpeta):
+    st.info("Indica una carpeta existente con las exportaciones semanales de proyectos.")
+else:
+    try:
+        # Cada archivo se lee una sola vez: los ya leídos salen de la caché por hash
+        # y el resultado se reutiliza mientras no cambie la carpeta (los widgets solo recalculan el gráfico)
+        with traza.etapa("lectura") as registro:
+            historico, estadisticas = leer_historico(carpeta, firma_archivos(listar_exportaciones(carpeta)), int(procesos))
+            registro["filas"] = estadisticas["archivos"]
+
+        st.sidebar.success(
+            f"✅ {estadisticas['archivos']} archivos: {estadisticas['desde_cache']} desde caché, "
+            f"{estadisticas['procesados']} leídos ahora"
+        )
+        for nombre, error in estadisticas["errores"].items():
+            st.warning(f"No se pudo leer {nombre}: {error}")
+
+        if historico.empty:
+            st.info("La carpeta no contiene exportaciones válidas.")
+        else:
+            # --- Filtros ---
+            st.sidebar.header("🔍 Filtros")
+            jefaturas = sorted(historico["jefatura"].unique())
+            seleccion = st.sidebar.multiselect("Jefaturas", options=jefaturas, key="jefaturas_historico")
+
+            with traza.etapa("flujo acumulado", filas=len(historico)):
+                tabla = flujo_acumulado(historico, seleccion)
+                datos = tabla.reset_index().melt(id_vars="fecha", var_name="Estado", value_name="Proyectos")
+
+            with traza.etapa("gráfico:flujo_acumulado", filas=len(datos)):
+                # Apilado desde el último estado (Finalizado abajo) hacia el primero
+                fig = px.area(
+                    datos,
+                    x="fecha",
+                    y="Proyectos",
+                    color="Estado",
+                    category_orders={"Estado": list(reversed(tabla.columns))},
+                    labels={"fecha": "Fecha de la exportación"},
+                    title="Proyectos por estado en cada exportación",
+                )
+                fig.update_layout(legend_traceorder="reversed")
+                st.plotly_chart(fig, use_container_width=True, key="flujo_acumulado")
+
+            st.subheader("Proyectos por estado y fecha")
+            st.dataframe(tabla, use_container_width=True)
+            exportacion.boton_descarga(tabla.reset_index(), "flujo_acumulado", key="descarga_flujo")
+
+    except Exception as e:
+        st.error(f"Ocurrió un error al procesar la carpeta de exportaciones: {e}")
+        error = traza.error()
+        with st.expander("Detalle técnico del error"):
+            if error:
+                st.write(f"Etapa: {error['etapa']}")
+            st.exception(e)
+
+# --- Costos de importación (arranque en frío) ---
+with st.sidebar.expander("⏱️ Tiempos de importación"):
+    st.dataframe(dependencias.resumen_tiempos(), use_container_width=True, hide_index=True)
+
+# --- Tiempos por etapa del rerun ---
+instrumentacion.mostrar_panel(traza)
+traza.guardar()
@@ -0,0 +1,234 @@
+"""Generador de exportaciones sintéticas para pruebas y benchmarks.
+
+Produce exportaciones de proyectos de Redmine (título en las primeras filas y
+encabezado en la fila 4, con las mismas columnas que la exportación real) y
+listados de objetos a migrar con las hojas 'Dia a Dia' e 'Incidentes'.
+
+Ejemplos:
+    python generador_sintetico.py proyectos --filas 10000 --salida proyectos.xlsx
+    python generador_sintetico.py migracion --filas 5000 --fecha 2025-09-11
+    python generador_sintetico.py proyectos --filas 1000000 --salida proyectos.parquet
+
+Los .xlsx se escriben en modo streaming (openpyxl write_only), de modo que
+generar 1M de filas no requiere mantener el libro completo en memoria.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import dependencias
+from procesamiento import ORDEN_ESTADOS
+
+# Filas de título que preceden al encabezado (que queda en la fila 4)
+FILAS_TITULO = 3
+
+JEFATURAS = [
+    "Core Bancario", "Core Bancario - Normativo", "Normativo", "Canales Digitales",
+    "Canales Presenciales", "Sistemas Centrales", "Datos y Analítica"
+]
+NOMBRES = ["Ana", "Luis", "María", "Jorge", "Lucía", "Diego", "Sofía", "Martín", "Valeria", "Pablo",
+           "Carla", "Federico", "Julieta", "Nicolás", "Florencia", "Santiago", "Camila", "Tomás"]
+APELLIDOS = ["García", "Fernández", "López", "Martínez", "Pérez", "Gómez", "Díaz", "Romero",
+             "Sosa", "Álvarez", "Torres", "Ruiz", "Benítez", "Acosta", "Medina", "Castro"]
+GERENCIAS = {
+    "Gerencia de Operaciones": ["Unidad de Pagos", "Unidad de Cámara", "Unidad de Comercio Exterior"],
+    "Gerencia de Banca Minorista": ["Unidad de Tarjetas", "Unidad de Préstamos", "Unidad de Cuentas"],
+    "Gerencia de Riesgos": ["Unidad de Riesgo Crediticio", "Unidad de Riesgo Operacional"],
+    "Gerencia de Finanzas": ["Unidad de Contabilidad", "Unidad de Tesorería", "Unidad de Impuestos"],
+    "Gerencia de Cumplimiento": ["Unidad de Prevención de Lavado", "Unidad Regulatoria"],
+    "Gerencia de Tecnología": ["Unidad de Infraestructura", "Unidad de Arquitectura", "Unidad de Seguridad"],
+    "Gerencia Comercial": ["Unidad de Empresas", "Unidad de Banca Privada"],
+}
+EQUIPOS = ["Equipo Core", "Equipo Integraciones", "Equipo Reportes", "Equipo Batch"]
+ETIQUETAS = ["Pres/Agos/25", "Post/Agos/25", "Pre-Migración-NBT", "Regulatorio", "Prioridad Alta",
+             "BCRA", "Canales", "Quick Win", "Deuda Técnica"]
+TEMAS = ["Migración de cuentas", "Nuevo esquema de comisiones", "Adecuación normativa", "Transferencias inmediatas",
+         "Régimen informativo", "Refactor de batch nocturno", "Alta de productos", "Conciliación automática",
+         "Integración con canales", "Mejora de performance", "Reportes regulatorios", "Débitos automáticos"]
+# Prefijo -> peso en la exportación
+PREFIJOS = {"P": 0.38, "M": 0.25, "I": 0.08, "A": 0.04, "N": 0.10, "E": 0.15}
+PESOS_ESTADOS = np.array([4, 6, 3, 3, 3, 5, 4, 9, 6, 2, 5, 3, 12, 35], dtype=float)
+
+COLUMNAS_EXPORTACION = [
+    "Nombre", "Estado Actual", "Jefatura", "Asignatario predeterminado", "Fecha de inicio", "Fecha de fin",
+    "Actualizado por última vez", "Etiquetas", "Gestor del proyecto", "Propietario del proyecto",
+    "Gerencia/Unidad", "Fecha Pasaje a Producción", "Estabilización", "Autor", "Proyecto matriz", "% Realizado"
+]
+
+
+def _elegir(rng, opciones, n, probabilidad_vacio=0.0, pesos=None):
+    """Elige n valores de opciones (objeto, con None según probabilidad_vacio)."""
+    valores = np.asarray(opciones, dtype=object)[rng.choice(len(opciones), size=n, p=pesos)]
+    if probabilidad_vacio:
+        valores[rng.random(n) < probabilidad_vacio] = None
+    return valores
+
+def _personas(rng, cantidad):
+    return sorted({f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}" for _ in range(cantidad * 3)})[:cantidad]
+
+def _fechas(rng, n, desde, dias, probabilidad_vacio):
+    fechas = pd.Timestamp(desde) + pd.to_timedelta(rng.integers(0, dias, size=n), unit="D")
+    return pd.Series(fechas).mask(rng.random(n) < probabilidad_vacio)
+
+def generar_proyectos(filas, semilla=0):
+    """DataFrame con las columnas originales de la exportación de proyectos."""
+    rng = np.random.default_rng(semilla)
+    prefijos = rng.choice(list(PREFIJOS), size=filas, p=list(PREFIJOS.values()))
+    numeros = np.arange(1, filas + 1)
+    anios = rng.choice(["23", "24", "25"], size=filas, p=[0.1, 0.35, 0.55])
+    temas = rng.choice(TEMAS, size=filas)
+    # Separadores con espacios irregulares, como en la carga manual de Redmine
+    separadores = rng.choice([" - ", "-", " -", "- ", "  -  "], size=filas)
+    codigos = np.char.add(np.char.add(prefijos, np.char.zfill(numeros.astype(str), 3)), np.char.add("/", anios))
+
+    # Las estabilizaciones apuntan a un proyecto base (P o M) que las contiene
+    indices_base = np.flatnonzero(np.isin(prefijos, ["P", "M"]))
+    es_estabilizacion = prefijos == "E"
+    nombres = np.char.add(np.char.add(codigos, separadores), temas).astype(object)
+    proyecto_matriz = np.full(filas, None, dtype=object)
+    if len(indices_base):
+        bases = rng.choice(indices_base, size=int(es_estabilizacion.sum()))
+        numeros_estab = rng.integers(1, 9, size=len(bases))
+        nombres[es_estabilizacion] = [
+            f"E{numero}{sep}{codigos[base]}{sep}Estabilización {temas[base]}"
+            for numero, sep, base in zip(numeros_estab, separadores[es_estabilizacion], bases)
+        ]
+    # Espacios iniciales ocasionales
+    con_espacio = rng.random(filas) < 0.05
+    nombres[con_espacio] = [" " + nombre for nombre in nombres[con_espacio]]
+    if len(indices_base):
+        proyecto_matriz[es_estabilizacion] = nombres[bases]
+        # Algunos proyectos son subproyectos de otro proyecto matriz
+        subproyectos = np.flatnonzero((prefijos == "P") & (rng.random(filas) < 0.08))
+        proyecto_matriz[subproyectos] = nombres[rng.choice(indices_base, size=len(subproyectos))]
+
+    estados = rng.choice(ORDEN_ESTADOS, size=filas, p=PESOS_ESTADOS / PESOS_ESTADOS.sum())
+    implementado = np.isin(estados, ["Finalizado", "Estabilización"])
+
+    personas = _personas(rng, 60)
+    gestores = _personas(rng, 15)
+    rutas_gerencia = [
+        f"{gerencia} > {unidad}" + (f" > {equipo}" if equipo else "")
+        for gerencia, unidades in GERENCIAS.items() for unidad in unidades for equipo in [None] + EQUIPOS[:2]
+    ]
+
+    cantidad_etiquetas = rng.choice([0, 1, 2, 3], size=filas, p=[0.15, 0.45, 0.3, 0.1])
+    etiquetas = np.array([
+        ", ".join(rng.choice(ETIQUETAS, size=k, replace=False)) if k else None
+        for k in cantidad_etiquetas
+    ], dtype=object)
+
+    fecha_inicio = _fechas(rng, filas, "2023-01-01", 1000, 0.12)
+    fecha_fin = (fecha_inicio + pd.to_timedelta(rng.integers(30, 400, size=filas), unit="D")).mask(rng.random(filas) < 0.15)
+    pasaje = _fechas(rng, filas, "2023-06-01", 850, 0.1).where(implementado)
+
+    return pd.DataFrame({
+        "Nombre": nombres,
+        "Estado Actual": estados,
+        "Jefatura": _elegir(rng, JEFATURAS, filas, pesos=[0.35, 0.1, 0.1, 0.15, 0.1, 0.1, 0.1]),
+        "Asignatario predeterminado": _elegir(rng, personas, filas, 0.08),
+        "Fecha de inicio": fecha_inicio,
+        "Fecha de fin": fecha_fin,
+        "Actualizado por última vez": _fechas(rng, filas, "2025-06-01", 120, 0.0),
+        "Etiquetas": etiquetas,
+        "Gestor del proyecto": _elegir(rng, gestores, filas, 0.1),
+        "Propietario del proyecto": _elegir(rng, personas, filas),
+        "Gerencia/Unidad": _elegir(rng, rutas_gerencia, filas, 0.05),
+        "Fecha Pasaje a Producción": pasaje,
+        "Estabilización": np.where(es_estabilizacion, "Sí", ""),
+        "Autor": _elegir(rng, gestores, filas),
+        "Proyecto matriz": proyecto_matriz,
+        "% Realizado": np.where(implementado, 100, rng.integers(0, 100, size=filas)),
+    }, columns=COLUMNAS_EXPORTACION)
+
+def generar_migracion(filas, semilla=0, proporcion_incidentes=0.2):
+    """Devuelve (dia_a_dia, incidentes) con las columnas del listado de migración."""
+    rng = np.random.default_rng(semilla)
+    proyectos = [f"P{numero:03d}/25 - {tema}" for numero, tema in zip(range(1, 41), TEMAS * 4)]
+    responsables = _personas(rng, 12)
+    compilado = _elegir(rng, ["SI", "NO", "N/A", "SI - con observaciones"], filas, 0.05, pesos=[0.55, 0.25, 0.12, 0.08])
+    compilado_si = np.array([isinstance(valor, str) and "SI" in valor for valor in compilado])
+    xpz = np.where(compilado_si & (rng.random(filas) < 0.7), "SI", np.where(rng.random(filas) < 0.5, "NO", ""))
+    responsable = _elegir(rng, responsables + ["N/A"], filas, 0.1)
+    fecha_objeto = _fechas(rng, filas, "2025-07-01", 80, 0.0)
+    fecha_xpz = _fechas(rng, filas, "2025-08-01", 45, 0.0).where(xpz == "SI")
+    df = pd.DataFrame({
+        "PROYECTO": _elegir(rng, proyectos, filas, 0.02),
+        "OBJETO": [f"OBJ{numero:06d}" for numero in range(filas)],
+        "TIPO OBJETO": _elegir(rng, ["Procedure", "Transaction", "WebPanel", "DataProvider", "Report"], filas),
+        "RESPONSABLE MIGRACION": responsable,
+        "COMPILADO?": compilado,
+        "TESTEADO": _elegir(rng, ["SI", "NO", "N/A"], filas, 0.1),
+        "XPZ enviado": xpz,
+        "FECHA OBJETO": fecha_objeto,
+        "FECHA XPZ": fecha_xpz,
+        "FECHA XPZ GX8": fecha_xpz,
+        "OBSERVACIONES": _elegir(rng, ["", "Revisar dependencias", "Pendiente de QA", "Ok"], filas),
+    })
+    es_incidente = rng.random(filas) < proporcion_incidentes
+    return df[~es_incidente].reset_index(drop=True), df[es_incidente].reset_index(drop=True)
+
+def _valor_celda(valor):
+    if valor is None or valor is pd.NaT or (isinstance(valor, float) and np.isnan(valor)):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+def _escribir_hoja(libro, titulo, df, filas_titulo=()):
+    hoja = libro.create_sheet(titulo)
+    for fila in filas_titulo:
+        hoja.append(fila)
+    hoja.append(list(df.columns))
+    for fila in df.itertuples(index=False, name=None):
+        hoja.append([_valor_celda(valor) for valor in fila])
+
+def escribir_proyectos(df, salida):
+    """Escribe la exportación en .xlsx (encabezado en la fila 4) o .parquet."""
+    if str(salida).endswith(".parquet"):
+        df.to_parquet(salida, index=False)
+        return
+    openpyxl = dependencias.importar("openpyxl")
+    libro = openpyxl.Workbook(write_only=True)
+    titulo = [["Proyectos"], [f"Exportación sintética - {len(df)} proyectos"], []]
+    _escribir_hoja(libro, "Proyectos", df, titulo[:FILAS_TITULO])
+    libro.save(salida)
+
+def escribir_migracion(dia_a_dia, incidentes, salida):
+    """Escribe el listado de migración con las hojas 'Dia a Dia' e 'Incidentes'."""
+    openpyxl = dependencias.importar("openpyxl")
+    libro = openpyxl.Workbook(write_only=True)
+    _escribir_hoja(libro, "Dia a Dia", dia_a_dia)
+    _escribir_hoja(libro, "Incidentes", incidentes)
+    libro.save(salida)
+
+def nombre_listado_migracion(fecha):
+    """Nombre del archivo diario, p. ej. 'Listado de Objetos a migrar_al_11_09.xlsx'."""
+    fecha = pd.Timestamp(fecha)
+    return f"Listado de Objetos a migrar_al_{fecha:%d_%m}.xlsx"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera exportaciones sintéticas de proyectos y migración.")
+    parser.add_argument("tipo", choices=["proyectos", "migracion"])
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo de salida (.xlsx; para proyectos también .parquet)")
+    parser.add_argument("--fecha", default="2025-09-11", help="Fecha del listado de migración (define el nombre por defecto)")
+    args = parser.parse_args(argv)
+
+    if args.tipo == "proyectos":
+        salida = args.salida or "proyectos_sinteticos.xlsx"
+        escribir_proyectos(generar_proyectos(args.filas, args.semilla), salida)
+    else:
+        salida = args.salida or nombre_listado_migracion(args.fecha)
+        escribir_migracion(*generar_migracion(args.filas, args.semilla), salida)
+    print(f"{args.filas} filas escritas en {salida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
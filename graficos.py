@@ -0,0 +1,124 @@
+"""Construcción de las figuras de la pestaña "Gráficos" del dashboard Agosto/25.
+
+Cada función recibe el DataFrame ya filtrado (solo Core Bancario y Normativo)
+con las columnas derivadas Tipo_Etiqueta e implementado, y devuelve la figura
+de Plotly sin mostrarla, para poder reutilizarla fuera de Streamlit. Los
+cruces más pesados (etiqueta x implementado, gerencia x implementado) aceptan
+además una consulta (ver consultas.py) para agregarlos con otro motor.
+"""
+import pandas as pd
+
+import dependencias
+from consultas import ConsultaPandas
+from procesamiento import ORDEN_ESTADOS
+
+# Plotly se importa recién al construir la primera figura
+px = dependencias.ModuloPerezoso("plotly.express")
+
+COLORES_IMPLEMENTADO = {
+    'Implementado': '#2c7873',
+    'No implementado': '#ffd700'
+}
+
+
+def figura_estados(df_graf):
+    """Gráfico 1: Proyectos por Estado Actual en orden personalizado."""
+    estados = pd.Categorical(df_graf['estado_actual'], categories=ORDEN_ESTADOS, ordered=True)
+    conteo_estados_ordenado = pd.Series(estados).value_counts().reindex(ORDEN_ESTADOS).fillna(0)
+    return px.bar(
+        conteo_estados_ordenado,
+        x=conteo_estados_ordenado.index,
+        y=conteo_estados_ordenado.values,
+        labels={'x': 'Estado Actual', 'y': 'Cantidad'},
+        title='Proyectos por Estado Actual (orden personalizado)',
+        color=conteo_estados_ordenado.index,
+        color_discrete_sequence=["#2980b9", "#2c7873", "#ffd700", "#444444"]*4
+    )
+
+def figura_etiquetas(df_graf):
+    """Gráfico 2: Proyectos por etiquetas Pres/Agos/25 y Post/Agos/25."""
+    conteo_etiqueta = df_graf['Tipo_Etiqueta'].value_counts()
+    # Usar colores personalizados: implementados siempre #2c7873
+    color_map = {
+        'Post/Agos/25': '#ffd700',
+        'Pres/Agos/25': '#2980b9',
+        'Otro': '#2c7873'
+    }
+    fig = px.pie(
+        conteo_etiqueta,
+        names=conteo_etiqueta.index,
+        values=conteo_etiqueta.values,
+        title='Distribución de proyectos por Pres/Agos/25 y Post/Agos/25',
+        color=conteo_etiqueta.index,
+        color_discrete_map=color_map,
+        hole=0.3
+    )
+    fig.update_traces(textinfo='label+percent')
+    return fig
+
+def figura_etiqueta_implementado(df_graf, consulta=None):
+    """Gráfico 3b: implementados/no implementados por tipo de etiqueta (con porcentajes)."""
+    consulta = consulta or ConsultaPandas(df_graf)
+    df_etiqueta_impl = consulta.agrupar(['Tipo_Etiqueta', 'implementado'])
+    fig = px.sunburst(
+        df_etiqueta_impl,
+        path=['Tipo_Etiqueta', 'implementado'],
+        values='Cantidad',
+        color='implementado',
+        color_discrete_map=COLORES_IMPLEMENTADO,
+        title='Implementados vs No implementados (pres/agos/25 y post/agos/25)'
+    )
+    fig.update_traces(textinfo='label+percent entry')
+    return fig
+
+def figura_implementados(df_graf):
+    """Gráfico 4: Comparativa de implementados (Estabilización/Finalizado) vs no implementados."""
+    conteo_impl = df_graf['implementado'].value_counts()
+    fig = px.pie(
+        conteo_impl,
+        names=conteo_impl.index,
+        values=conteo_impl.values,
+        title='Proyectos implementados vs no implementados',
+        color_discrete_map=COLORES_IMPLEMENTADO
+    )
+    # Forzar color verde en el bloque de 'Implementado'
+    fig.update_traces(marker=dict(colors=[
+        '#2c7873' if n == 'Implementado' else '#ffd700' for n in conteo_impl.index
+    ]))
+    return fig
+
+def figura_gerencia(df_graf, consulta=None):
+    """Gráfico 5: Implementado vs No implementado por Gerencia_Principal (None si no hay datos)."""
+    consulta = consulta or ConsultaPandas(df_graf)
+    df_grouped = consulta.agrupar(['Gerencia_Principal', 'implementado'], [('Gerencia_Principal', 'no_vacio')])
+    if df_grouped.empty:
+        return None
+    return px.bar(
+        df_grouped,
+        x='Gerencia_Principal',
+        y='Cantidad',
+        color='implementado',
+        barmode='group',
+        title='Implementados vs No implementados por Gerencia Principal',
+        color_discrete_map=COLORES_IMPLEMENTADO
+    )
+
+def figura_arbol_gerencias(nodos):
+    """Treemap Gerencia > Unidad > ... con los conteos de ArbolGerencias.nodos (None si no hay nodos)."""
+    if nodos.empty:
+        return None
+    datos = nodos.reset_index()
+    fig = px.treemap(
+        datos,
+        ids='ruta',
+        names='nombre',
+        parents='padre',
+        values='Proyectos',
+        color='% implementado',
+        color_continuous_scale=[COLORES_IMPLEMENTADO['No implementado'], COLORES_IMPLEMENTADO['Implementado']],
+        range_color=(0, 100),
+        hover_data={'Implementados': True, 'No implementados': True},
+        title='Proyectos por Gerencia/Unidad (clic para abrir un nivel)',
+    )
+    fig.update_traces(branchvalues='total', maxdepth=2)
+    return fig
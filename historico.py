@@ -0,0 +1,336 @@
+"""Histórico de exportaciones: flujo acumulado de proyectos y avance de la migración.
+
+Cada exportación semanal de proyectos de una carpeta se lee con el mismo
+procesamiento que el dashboard (procesamiento.leer_proyectos) y se reduce a la
+cantidad de proyectos por jefatura y estado. Del mismo modo, cada listado
+diario de migración ("Listado de Objetos a migrar_al_DD_MM.xlsx") se reduce a
+contadores por responsable y proyecto. El resultado de cada archivo se guarda
+en una caché en disco indexada por el hash del contenido: al agregar una
+semana (o un día) nuevo solo se lee ese archivo. La caché guarda solo lo que
+depende del contenido; la fecha de corte sale también del nombre y de la fecha
+de modificación, así que se agrega a cada archivo al leerlo (dos archivos
+iguales con distinto nombre quedan en sus fechas). Los archivos sin caché se
+procesan en paralelo en un pool de procesos.
+
+Uso por línea de comandos:
+    python historico.py carpeta_exportaciones [--salida flujo.csv] [--procesos 4]
+    python historico.py carpeta_listados --migracion [--por Responsable_Migracion]
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from procesamiento import leer_hojas_migracion, leer_proyectos, ordenar_estados, procesar_migracion
+
+# Carpeta de caché (dentro de la carpeta de exportaciones)
+CARPETA_CACHE = ".cache_historico"
+# Se incrementa cuando cambia el contenido de los resúmenes guardados
+VERSION_CACHE = 3
+
+# Fechas reconocidas en el nombre del archivo: 2025-08-29, 20250829, 29_08_2025, 29-08-2025
+_PATRONES_FECHA = [
+    (re.compile(r"(\d{4})[-_](\d{2})[-_](\d{2})"), ("anio", "mes", "dia")),
+    (re.compile(r"(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)"), ("anio", "mes", "dia")),
+    (re.compile(r"(\d{2})[-_](\d{2})[-_](\d{4})"), ("dia", "mes", "anio")),
+]
+
+
+def hash_archivo(ruta, bloque=1024 * 1024):
+    """SHA-256 del contenido del archivo (clave de la caché)."""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for parte in iter(lambda: f.read(bloque), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+def fecha_desde_nombre(nombre):
+    """Fecha de corte tomada del nombre del archivo, o None si no tiene."""
+    for patron, orden in _PATRONES_FECHA:
+        match = patron.search(nombre)
+        if match:
+            partes = dict(zip(orden, (int(g) for g in match.groups())))
+            try:
+                return datetime(partes["anio"], partes["mes"], partes["dia"])
+            except ValueError:
+                continue
+    return None
+
+def listar_exportaciones(carpeta):
+    """Exportaciones .xlsx de la carpeta (se ignoran los temporales de Excel '~$')."""
+    return sorted(
+        os.path.join(carpeta, nombre)
+        for nombre in os.listdir(carpeta)
+        if nombre.lower().endswith(".xlsx") and not nombre.startswith("~$")
+    )
+
+def firma_archivos(rutas):
+    """(nombre, tamaño, fecha de modificación) de cada archivo: cambia si se agrega, quita o reemplaza alguno."""
+    return tuple((os.path.basename(ruta), os.path.getsize(ruta), os.path.getmtime(ruta)) for ruta in rutas)
+
+def resumir_exportacion(ruta):
+    """Lee una exportación y la reduce a cantidad de proyectos por jefatura y estado.
+
+    Cada grupo lleva también su última fecha 'actualizado' (para fecha_exportacion).
+    """
+    df = leer_proyectos(ruta)
+    return (
+        df.assign(jefatura=df["jefatura"].fillna("(sin jefatura)"), estado_actual=df["estado_actual"].fillna("(sin estado)"))
+        .groupby(["jefatura", "estado_actual"], sort=False)
+        .agg(cantidad=("estado_actual", "size"), ultimo_actualizado=("actualizado", "max"))
+        .reset_index()
+    )
+
+def fecha_exportacion(ruta, resumen):
+    """Fecha de corte de la exportación.
+
+    Sale del nombre del archivo; si no tiene, se usa la última fecha
+    'actualizado' de la exportación y, si tampoco hay, la fecha de
+    modificación del archivo.
+    """
+    fecha = fecha_desde_nombre(os.path.basename(ruta))
+    if fecha is None and resumen["ultimo_actualizado"].notna().any():
+        fecha = resumen["ultimo_actualizado"].max().normalize().to_pydatetime()
+    if fecha is None:
+        fecha = datetime.fromtimestamp(os.path.getmtime(ruta))
+    return pd.Timestamp(fecha)
+
+def _ruta_cache(carpeta_cache, tipo, hash_contenido):
+    return os.path.join(carpeta_cache, f"{tipo}-v{VERSION_CACHE}-{hash_contenido}.parquet")
+
+def _leer_cache(cache):
+    """Resumen guardado, o None si no está o no se puede leer (el archivo dañado se borra)."""
+    if not os.path.exists(cache):
+        return None
+    try:
+        return pd.read_parquet(cache)
+    except Exception:
+        # Escritura interrumpida de una versión anterior: se trata como ausente y se vuelve a leer el archivo
+        try:
+            os.remove(cache)
+        except OSError:
+            pass
+        return None
+
+def _guardar_cache(resumen, cache):
+    """Escribe el resumen con un nombre temporal y lo renombra: nadie ve un archivo a medias."""
+    temporal = f"{cache}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        resumen.to_parquet(temporal, index=False)
+        os.replace(temporal, cache)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+def _con_fecha(resumen, ruta, fechar):
+    if fechar is not None:
+        resumen.insert(0, "fecha", fechar(ruta, resumen))
+    return resumen
+
+def procesar_archivos(rutas, resumir, tipo, carpeta_cache, procesos=None, progreso=None, fechar=None):
+    """Aplica resumir(ruta) a cada archivo, leyendo solo los que no están en caché.
+
+    Los pendientes se procesan en paralelo en un pool de procesos (resumir debe
+    ser una función de módulo). tipo separa las cachés de distintos resúmenes.
+    fechar(ruta, resumen), si se indica, da la fecha de cada archivo, que se
+    agrega como primera columna 'fecha' después de la caché (no se guarda en ella).
+    progreso(hechos, total, ruta) se llama a medida que termina cada archivo.
+    Devuelve (resultados, estadisticas) con estadisticas = {'archivos',
+    'desde_cache', 'procesados', 'errores'}.
+    """
+    os.makedirs(carpeta_cache, exist_ok=True)
+    resultados = []
+    pendientes = {}
+    for ruta in rutas:
+        cache = _ruta_cache(carpeta_cache, tipo, hash_archivo(ruta))
+        resumen = _leer_cache(cache)
+        if resumen is not None:
+            resultados.append(_con_fecha(resumen, ruta, fechar))
+        else:
+            pendientes[ruta] = cache
+    hechos = len(resultados)
+    if progreso:
+        progreso(hechos, len(rutas), None)
+
+    errores = {}
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            futuros = {pool.submit(resumir, ruta): ruta for ruta in pendientes}
+            for futuro in as_completed(futuros):
+                ruta = futuros[futuro]
+                try:
+                    resumen = futuro.result()
+                except Exception as e:
+                    errores[os.path.basename(ruta)] = f"{type(e).__name__}: {e}"
+                else:
+                    _guardar_cache(resumen, pendientes[ruta])
+                    resultados.append(_con_fecha(resumen, ruta, fechar))
+                hechos += 1
+                if progreso:
+                    progreso(hechos, len(rutas), ruta)
+
+    estadisticas = {
+        "archivos": len(rutas),
+        "desde_cache": len(rutas) - len(pendientes),
+        "procesados": len(pendientes) - len(errores),
+        "errores": errores,
+    }
+    return resultados, estadisticas
+
+def construir_historico(carpeta, procesos=None, carpeta_cache=None, progreso=None):
+    """Conteos por fecha, jefatura y estado de todas las exportaciones de la carpeta.
+
+    Devuelve (historico, estadisticas); ver procesar_archivos.
+    """
+    resultados, estadisticas = procesar_archivos(
+        listar_exportaciones(carpeta), resumir_exportacion, "proyectos",
+        carpeta_cache or os.path.join(carpeta, CARPETA_CACHE), procesos, progreso, fecha_exportacion,
+    )
+    historico = pd.concat(resultados, ignore_index=True) if resultados else pd.DataFrame(
+        columns=["fecha", "jefatura", "estado_actual", "cantidad", "ultimo_actualizado"]
+    )
+    return historico, estadisticas
+
+def flujo_acumulado(historico, jefaturas=None):
+    """Tabla fecha x estado (cantidad de proyectos) para el diagrama de flujo acumulado."""
+    if jefaturas:
+        historico = historico[historico["jefatura"].isin(jefaturas)]
+    tabla = historico.pivot_table(index="fecha", columns="estado_actual", values="cantidad", aggfunc="sum", fill_value=0)
+    return tabla[ordenar_estados(tabla.columns)].sort_index()
+
+
+# --- Listados diarios de migración ---
+# "Listado de Objetos a migrar_al_11_09.xlsx" (día y mes; el año es opcional: _al_11_09_2025)
+PATRON_LISTADO = re.compile(r"migrar_al_(\d{1,2})_(\d{1,2})(?:_(\d{4}))?", re.IGNORECASE)
+
+# Métricas acumuladas por día del listado de migración
+METRICAS_MIGRACION = ["objetos", "compilados", "pendientes_compilar", "xpz_enviados", "xpz_pend_envio"]
+
+
+def listar_listados_migracion(carpeta):
+    """Listados diarios de migración de la carpeta (nombre con _al_DD_MM)."""
+    return [ruta for ruta in listar_exportaciones(carpeta) if PATRON_LISTADO.search(os.path.basename(ruta))]
+
+def fecha_listado(ruta):
+    """Fecha del listado según su nombre.
+
+    Si el nombre no trae el año se usa el de la fecha de modificación del
+    archivo (o el anterior, si con ese año la fecha quedaría en el futuro).
+    """
+    dia, mes, anio = PATRON_LISTADO.search(os.path.basename(ruta)).groups()
+    if anio is None:
+        modificado = datetime.fromtimestamp(os.path.getmtime(ruta))
+        anio = modificado.year
+        if datetime(anio, int(mes), int(dia)) > modificado:
+            anio -= 1
+    return pd.Timestamp(int(anio), int(mes), int(dia))
+
+def resumir_listado_migracion(ruta):
+    """Lee un listado diario y lo reduce a contadores por responsable y proyecto."""
+    df = procesar_migracion(leer_hojas_migracion(ruta))
+    tiene_xpz = "XPZ enviado" in df.columns
+    marcas = pd.DataFrame({
+        "Responsable_Migracion": df["Responsable_Migracion"],
+        "Proyecto": df["Proyecto"],
+        "compilado": (df["estado_compilado"] == "SI").to_numpy(),
+        "pendiente_compilar": (df["estado_compilado"] == "NO").to_numpy(),
+        "xpz_enviado": (df["estado_xpz"] == "SI").to_numpy() & tiene_xpz,
+    })
+    resumen = marcas.groupby(["Responsable_Migracion", "Proyecto"], sort=False).agg(
+        objetos=("compilado", "size"),
+        compilados=("compilado", "sum"),
+        pendientes_compilar=("pendiente_compilar", "sum"),
+        xpz_enviados=("xpz_enviado", "sum"),
+    ).reset_index()
+    return resumen
+
+def construir_historico_migracion(carpeta, procesos=None, carpeta_cache=None, progreso=None):
+    """Contadores por fecha, responsable y proyecto de todos los listados de la carpeta.
+
+    Devuelve (historico, estadisticas); ver procesar_archivos.
+    """
+    resultados, estadisticas = procesar_archivos(
+        listar_listados_migracion(carpeta), resumir_listado_migracion, "migracion",
+        carpeta_cache or os.path.join(carpeta, CARPETA_CACHE), procesos, progreso,
+        # La fecha sale del nombre (y de la fecha de modificación), no del contenido
+        lambda ruta, resumen: fecha_listado(ruta),
+    )
+    historico = pd.concat(resultados, ignore_index=True) if resultados else pd.DataFrame(
+        columns=["fecha", "Responsable_Migracion", "Proyecto"] + METRICAS_MIGRACION[:-1]
+    )
+    return historico, estadisticas
+
+def tendencia_migracion(historico, por=None, responsables=None, proyectos=None):
+    """Métricas por día (y por 'Responsable_Migracion' o 'Proyecto' si se indica `por`)."""
+    if responsables:
+        historico = historico[historico["Responsable_Migracion"].isin(responsables)]
+    if proyectos:
+        historico = historico[historico["Proyecto"].isin(proyectos)]
+    claves = ["fecha"] + ([por] if por else [])
+    tendencia = historico.groupby(claves)[METRICAS_MIGRACION[:-1]].sum().reset_index()
+    tendencia["xpz_pend_envio"] = tendencia["compilados"] - tendencia["xpz_enviados"]
+    return tendencia.sort_values(claves, ignore_index=True)
+
+def avance_diario(tendencia, por=None):
+    """Ritmo diario entre listados consecutivos (objetos por día calendario).
+
+    Compilados/día y XPZ enviados/día son lo que crecieron esas métricas;
+    'Quema pendientes/día' es cuánto bajaron los pendientes a compilar.
+    """
+    grupos = tendencia.groupby(por, sort=False) if por else [(None, tendencia)]
+    partes = []
+    for _, datos in grupos:
+        datos = datos.sort_values("fecha")
+        dias = datos["fecha"].diff().dt.days
+        parte = datos[["fecha"] + ([por] if por else [])].copy()
+        parte["Compilados/día"] = datos["compilados"].diff() / dias
+        parte["XPZ enviados/día"] = datos["xpz_enviados"].diff() / dias
+        parte["Quema pendientes/día"] = -datos["pendientes_compilar"].diff() / dias
+        partes.append(parte.iloc[1:])
+    if not partes:
+        return pd.DataFrame(columns=["fecha", "Compilados/día", "XPZ enviados/día", "Quema pendientes/día"])
+    return pd.concat(partes, ignore_index=True).round(2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flujo acumulado de proyectos por estado (o avance diario de la migración) a partir de una carpeta de exportaciones.")
+    parser.add_argument("carpeta", help="Carpeta con las exportaciones semanales o los listados diarios (.xlsx)")
+    parser.add_argument("--procesos", type=int, help="Cantidad de procesos (por defecto, uno por CPU)")
+    parser.add_argument("--jefatura", action="append", help="Filtrar por jefatura (se puede repetir)")
+    parser.add_argument("--migracion", action="store_true", help="Leer listados diarios de migración en lugar de exportaciones de proyectos")
+    parser.add_argument("--por", choices=["Responsable_Migracion", "Proyecto"], help="Con --migracion: abrir la tendencia por responsable o proyecto")
+    parser.add_argument("--salida", help="Guardar la tabla resultante en CSV")
+    args = parser.parse_args(argv)
+
+    def progreso(hechos, total, ruta):
+        if ruta:
+            print(f"[{hechos}/{total}] {os.path.basename(ruta)}", file=sys.stderr)
+
+    construir = construir_historico_migracion if args.migracion else construir_historico
+    historico, estadisticas = construir(args.carpeta, procesos=args.procesos, progreso=progreso)
+    print(
+        f"{estadisticas['archivos']} archivos: {estadisticas['desde_cache']} desde caché, "
+        f"{estadisticas['procesados']} procesados, {len(estadisticas['errores'])} con error",
+        file=sys.stderr,
+    )
+    for nombre, error in estadisticas["errores"].items():
+        print(f"  {nombre}: {error}", file=sys.stderr)
+    if args.migracion:
+        tabla = tendencia_migracion(historico, args.por)
+    else:
+        tabla = flujo_acumulado(historico, args.jefatura)
+    if args.salida:
+        tabla.to_csv(args.salida, index=not args.migracion)
+    else:
+        print(tabla.to_string())
+    return 1 if estadisticas["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
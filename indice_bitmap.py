@@ -0,0 +1,115 @@
+"""Índice de bitmaps para combinar filtros por valores categóricos.
+
+Por cada valor de cada columna filtrable se guarda un bitmap empaquetado
+(np.packbits, un bit por fila). Elegir varios valores de una columna es un OR
+de sus bitmaps, combinar columnas es un AND (o un OR) entre los resultados y
+los conteos salen de contar bits en 1 (np.bitwise_count), sin volver a
+recorrer el DataFrame. Las etiquetas son multivalor: una fila tiene un bit en
+1 en el bitmap de cada una de sus etiquetas.
+"""
+import numpy as np
+import pandas as pd
+
+from procesamiento import ordenar_estados
+
+# Columnas filtrables: columna -> etiqueta para mostrar
+COLUMNAS_FILTRO = {
+    "estado_actual": "Estado",
+    "tipo": "Tipo",
+    "gestor": "Gestor",
+    "asignatario": "Asignatario",
+    "gerencia": "Gerencia/Unidad",
+    "etiquetas": "Etiqueta",
+}
+# Columnas con varios valores por fila separados por coma
+COLUMNAS_MULTIVALOR = {"etiquetas"}
+SIN_DATO = "(Sin dato)"
+
+
+def contar(bits):
+    """Cantidad de filas (bits en 1) de un bitmap; con una matriz, una cantidad por fila de bitmaps."""
+    return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+
+
+class IndiceBitmap:
+    """Bitmaps empaquetados por valor de cada columna filtrable."""
+
+    def __init__(self, df, columnas=COLUMNAS_FILTRO):
+        self.filas = len(df)
+        self._valores = {}
+        self._bitmaps = {}
+        for columna in columnas:
+            if columna not in df.columns:
+                continue
+            serie = df[columna].astype("string").str.strip().reset_index(drop=True)
+            serie = serie.where(serie != "").fillna(SIN_DATO)
+            if columna in COLUMNAS_MULTIVALOR:
+                # Una entrada por (fila, valor): el bitmap de cada valor marca todas sus filas
+                partes = serie.str.split(",").explode().str.strip()
+                partes = partes[partes != ""]
+                filas, valores = partes.index.to_numpy(), partes.to_numpy()
+            else:
+                filas, valores = np.arange(self.filas), serie.to_numpy()
+            codigos, unicos = pd.factorize(valores)
+            orden = ordenar_estados(unicos) if columna == "estado_actual" else sorted(unicos)
+            posicion = {valor: i for i, valor in enumerate(orden)}
+            self._valores[columna] = orden
+            self._bitmaps[columna] = self._empaquetar(np.array([posicion[v] for v in unicos], dtype=np.intp)[codigos], filas, len(orden))
+
+    def _empaquetar(self, codigos, filas, cantidad):
+        """Bitmaps empaquetados (uno por código) con el bit de cada fila en 1.
+
+        Se prenden los bits directamente en los bytes (mismo orden que
+        np.packbits): no se arma la matriz de un booleano por fila y valor.
+        """
+        bitmaps = np.zeros((cantidad, (self.filas + 7) // 8), dtype=np.uint8)
+        bits = np.left_shift(1, 7 - (filas & 7)).astype(np.uint8)
+        np.bitwise_or.at(bitmaps, (codigos, filas >> 3), bits)
+        return bitmaps
+
+    def columnas(self):
+        return list(self._valores)
+
+    def valores(self, columna):
+        """Valores distintos de la columna, en el orden de sus bitmaps."""
+        return self._valores[columna]
+
+    def todos(self):
+        """Bitmap con todas las filas en 1."""
+        return np.packbits(np.ones(self.filas, dtype=bool))
+
+    def desde_mascara(self, mascara):
+        """Empaqueta una máscara booleana (por ejemplo, la de jefatura) para combinarla con los bitmaps."""
+        return np.packbits(np.asarray(mascara, dtype=bool))
+
+    def mascara(self, bits):
+        """Máscara booleana de las filas de un bitmap."""
+        return np.unpackbits(bits, count=self.filas).astype(bool)
+
+    def seleccion(self, columna, valores, todas=False):
+        """Bitmap de las filas con alguno de los valores (todos, si todas=True). Sin valores no filtra."""
+        if not valores:
+            return self.todos()
+        posiciones = [self._valores[columna].index(v) for v in valores]
+        bitmaps = self._bitmaps[columna][posiciones]
+        return np.bitwise_and.reduce(bitmaps) if todas else np.bitwise_or.reduce(bitmaps)
+
+    def combinar(self, selecciones, modo="AND", todas=()):
+        """Combina las selecciones {columna: valores} con AND u OR entre columnas.
+
+        Dentro de cada columna los valores se combinan con OR, salvo las
+        columnas de `todas`, que exigen todos los valores elegidos. Las columnas
+        sin valores elegidos no participan.
+        """
+        bitmaps = [self.seleccion(columna, valores, columna in todas) for columna, valores in selecciones.items() if valores]
+        if not bitmaps:
+            return self.todos()
+        operacion = np.bitwise_and if modo == "AND" else np.bitwise_or
+        return operacion.reduce(bitmaps)
+
+    def conteos(self, columna, bits=None):
+        """Filas de cada valor de la columna dentro de un bitmap (popcount del AND)."""
+        bitmaps = self._bitmaps[columna]
+        if bits is not None:
+            bitmaps = bitmaps & bits
+        return dict(zip(self._valores[columna], contar(bitmaps).tolist()))
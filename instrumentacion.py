@@ -0,0 +1,121 @@
+"""Medición por etapas de cada ejecución (rerun) de los dashboards.
+
+Cada rerun crea una Traza; cada etapa (lectura, limpieza, filtros, pestañas,
+gráficos) se mide con `with traza.etapa(nombre, filas=...)`. Al final del
+script la traza se agrega como registros JSON (una línea por etapa) al archivo
+indicado en la variable de entorno DASHBOARD_TRAZAS (por defecto
+trazas_dashboard.jsonl), para armar histogramas de latencia por etapa.
+
+Los tiempos de importación en frío (ver dependencias.py) se escriben una sola
+vez por proceso, en la primera traza que se guarda después de medirlos, como
+etapas "importación en frío:<nombre>".
+"""
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import dependencias
+
+ARCHIVO_TRAZAS = os.environ.get("DASHBOARD_TRAZAS", "trazas_dashboard.jsonl")
+
+# Importaciones en frío ya escritas en alguna traza de este proceso
+_IMPORTACIONES_ESCRITAS = set()
+_LOCK_IMPORTACIONES = threading.Lock()
+# Las sesiones del mismo servidor son hilos que agregan al mismo archivo
+_LOCK_ARCHIVO = threading.Lock()
+
+
+def _importaciones_en_frio():
+    """Registros de las importaciones en frío que todavía no se escribieron en ninguna traza."""
+    with _LOCK_IMPORTACIONES:
+        nuevas = {nombre: segundos for nombre, segundos in list(dependencias.TIEMPOS_IMPORTACION.items())
+                  if nombre not in _IMPORTACIONES_ESCRITAS}
+        _IMPORTACIONES_ESCRITAS.update(nuevas)
+    return [
+        {"etapa": f"importación en frío:{nombre}", "filas": None, "estado": "ok", "ms": round(segundos * 1000, 2)}
+        for nombre, segundos in nuevas.items()
+    ]
+
+
+class Traza:
+    """Registros de tiempo y cantidad de filas de las etapas de un rerun."""
+
+    def __init__(self, script):
+        self.script = script
+        self.id_rerun = uuid.uuid4().hex[:12]
+        self.inicio = time.perf_counter()
+        self.fecha = datetime.now().isoformat(timespec="seconds")
+        self.registros = []
+        # Después de guardar, lo que se mida va en la traza propia de un rerun parcial (ver secciones.fragmento)
+        self.guardada = False
+
+    @contextmanager
+    def etapa(self, nombre, filas=None):
+        """Mide el bloque; el registro devuelto admite completar 'filas' adentro."""
+        registro = {"etapa": nombre, "filas": filas, "estado": "ok"}
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        except Exception as e:
+            registro["estado"] = "error"
+            registro["error"] = f"{type(e).__name__}: {e}"
+            registro["traceback"] = traceback.format_exc()
+            raise
+        finally:
+            registro["ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+            self.registros.append(registro)
+
+    def marca(self, nombre):
+        """Registra el tiempo desde el inicio del rerun hasta aquí (p. ej. el primer contenido útil)."""
+        self.registros.append({"etapa": nombre, "filas": None, "estado": "ok", "ms": self.total_ms()})
+
+    def total_ms(self):
+        return round((time.perf_counter() - self.inicio) * 1000, 2)
+
+    def error(self):
+        """Primer registro con error (la etapa más interna que falló), o None."""
+        return next((registro for registro in self.registros if registro["estado"] == "error"), None)
+
+    def resumen(self):
+        """Filas para mostrar en el panel lateral, en orden de finalización."""
+        filas = [
+            {"Etapa": registro["etapa"], "ms": registro["ms"], "Filas": registro["filas"], "Estado": registro["estado"]}
+            for registro in self.registros
+        ]
+        filas.append({"Etapa": "Total rerun", "ms": self.total_ms(), "Filas": None, "Estado": ""})
+        return filas
+
+    def guardar(self, archivo=None):
+        """Agrega los registros de este rerun al archivo de trazas (JSON Lines)."""
+        total = self.total_ms()
+        registros = _importaciones_en_frio() + self.registros + [{"etapa": "total", "filas": None, "estado": "ok", "ms": total}]
+        lineas = []
+        for registro in registros:
+            linea = {"fecha": self.fecha, "script": self.script, "rerun": self.id_rerun, **registro}
+            linea.pop("traceback", None)
+            lineas.append(json.dumps(linea, ensure_ascii=False, default=str) + "\n")
+        # El rerun completo en una sola escritura para que no se mezcle con el de otra sesión
+        with _LOCK_ARCHIVO, open(archivo or ARCHIVO_TRAZAS, "a", encoding="utf-8") as f:
+            f.write("".join(lineas))
+        self.guardada = True
+
+
+def leer_trazas(archivo=None):
+    """Lee el archivo de trazas como DataFrame (para histogramas por etapa)."""
+    import pandas as pd
+    return pd.read_json(archivo or ARCHIVO_TRAZAS, lines=True)
+
+
+def mostrar_panel(traza):
+    """Panel lateral opcional con los tiempos del rerun actual."""
+    import streamlit as st
+    if st.sidebar.checkbox("⏱️ Panel de rendimiento", key="panel_rendimiento"):
+        st.sidebar.dataframe(traza.resumen(), use_container_width=True, hide_index=True)
+        error = traza.error()
+        if error:
+            st.sidebar.error(f"Falló la etapa '{error['etapa']}': {error['error']}")
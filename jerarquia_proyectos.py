@@ -0,0 +1,187 @@
+"""Jerarquía de proyectos: proyecto matriz, subproyectos y estabilizaciones.
+
+Cada fila de la exportación (ya procesada con procesar_proyectos) apunta a su
+padre por la columna 'Proyecto matriz' (nombre del proyecto padre) o, si no
+la tiene y es una estabilización (E-código), al proyecto base con el mismo
+codigo_proyecto. Los padres se resuelven con búsquedas en tablas hash (sin
+recorrer filas) y con ellos se arman dos índices CSR: hijos de cada fila y
+miembros de cada familia (todas las filas con la misma raíz), de modo que
+obtener los hijos o la familia completa de un proyecto es un corte de arreglo.
+"""
+import numpy as np
+import pandas as pd
+
+from procesamiento import ESTADOS_IMPLEMENTADOS, ORDEN_ESTADOS
+
+RELACION_SUBPROYECTO = "Subproyecto"
+RELACION_ESTABILIZACION = "Estabilización"
+
+# Profundidad máxima que se recorre; lo que no termina antes es un ciclo y se corta
+MAX_NIVELES = 1000
+
+
+def columna_matriz(df):
+    """Nombre real de la columna 'Proyecto matriz' (None si no está)."""
+    for col in df.columns:
+        if str(col).replace(' ', '').lower() == "proyectomatriz":
+            return col
+    return None
+
+def _limpiar_nombres(serie):
+    """Mismo criterio que limpiar_espacios_guion, vectorizado, y sin espacios finales."""
+    texto = serie.astype("string").str.lstrip().str.replace(r"\s*-\s*", "-", regex=True).str.strip()
+    return texto.where(texto != "")
+
+def _posiciones_unicas(claves):
+    """Tabla hash clave -> posición de su primera aparición (ignora claves vacías)."""
+    primera = claves.notna() & ~claves.duplicated()
+    return pd.Index(claves[primera]), np.flatnonzero(primera.to_numpy())
+
+def _buscar(tabla, buscadas):
+    """Posición de cada clave buscada en la tabla de _posiciones_unicas (-1 si no está)."""
+    indice, posiciones = tabla
+    encontrada = indice.get_indexer(buscadas)
+    return np.where(encontrada >= 0, posiciones[encontrada], -1)
+
+def _indice_csr(grupos, cantidad):
+    """Agrupa las posiciones por grupo: (orden, inicio, fin) con los miembros de g en orden[inicio[g]:fin[g]]."""
+    orden = np.argsort(grupos, kind="stable")
+    ordenados = grupos[orden]
+    grupos_posibles = np.arange(cantidad)
+    return orden, np.searchsorted(ordenados, grupos_posibles, "left"), np.searchsorted(ordenados, grupos_posibles, "right")
+
+
+class GrafoProyectos:
+    """Índice padre/hijos de los proyectos de una exportación.
+
+    Por fila (posición iloc) guarda padre (-1 si es raíz), raíz de su familia,
+    nivel (0 en la raíz) y relación con el padre. `familias` tiene el estado
+    consolidado de cada familia con más de un integrante.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        n = len(df)
+        nombres = _limpiar_nombres(df["nombre"]).reset_index(drop=True)
+        codigos = df["codigo_proyecto"].astype("string").reset_index(drop=True)
+        es_base = df["codigo_estabilizacion"].isna().to_numpy()
+        por_nombre = _posiciones_unicas(nombres)
+        por_codigo = _posiciones_unicas(codigos.where(es_base))
+        self._por_nombre, self._por_codigo = por_nombre, por_codigo
+
+        padre = np.full(n, -1)
+        columna = columna_matriz(df)
+        if columna is not None:
+            matriz = _limpiar_nombres(df[columna]).reset_index(drop=True)
+            # Primero por nombre exacto; si no, por el código de proyecto del nombre de la matriz
+            codigo_matriz = matriz.str.replace(r"^E\d+-", "", regex=True).str.extract(r"([PMANAI]\d+/\d+)", expand=False)
+            padre = _buscar(por_nombre, matriz)
+            padre = np.where(padre >= 0, padre, _buscar(por_codigo, codigo_matriz))
+        # Estabilizaciones sin proyecto matriz: el proyecto base con el mismo código
+        sin_padre = (padre < 0) & ~es_base
+        padre[sin_padre] = _buscar(por_codigo, codigos[sin_padre])
+        padre[padre == np.arange(n)] = -1
+        self.padre = padre
+        self._resolver_raices()
+
+        self.relacion = np.where(
+            self.padre < 0, "", np.where(es_base, RELACION_SUBPROYECTO, RELACION_ESTABILIZACION)
+        ).astype(object)
+        self._hijos = _indice_csr(self.padre, n)
+        self._familia = _indice_csr(self.raiz, n)
+        self.familias = self._consolidar()
+
+    def _resolver_raices(self):
+        """Raíz y nivel de cada fila subiendo por los padres en pasos vectorizados."""
+        n = len(self.padre)
+        raiz = np.arange(n)
+        nivel = np.zeros(n, dtype=np.int64)
+        actual = self.padre.copy()
+        for _ in range(MAX_NIVELES):
+            activos = actual >= 0
+            if not activos.any():
+                break
+            raiz[activos] = actual[activos]
+            nivel[activos] += 1
+            actual[activos] = self.padre[actual[activos]]
+        else:
+            # Ciclo en los datos: después de tantos pasos las filas activas están
+            # dentro del ciclo; sus integrantes pasan a ser raíces
+            self.padre[np.unique(actual[actual >= 0])] = -1
+            return self._resolver_raices()
+        self.raiz = raiz
+        self.nivel = nivel
+
+    def _consolidar(self):
+        """Estado consolidado por familia (solo las que tienen más de un integrante)."""
+        estado = self.df["estado_actual"].to_numpy()
+        implementado = np.isin(estado, ESTADOS_IMPLEMENTADOS)
+        # Posición del estado en el flujo: el menor entre los pendientes es el más atrasado
+        posicion_estado = pd.Series(estado).map({e: i for i, e in enumerate(ORDEN_ESTADOS)}).fillna(-1).to_numpy()
+        datos = pd.DataFrame({
+            "raiz": self.raiz,
+            "subproyecto": self.relacion == RELACION_SUBPROYECTO,
+            "estabilizacion": self.relacion == RELACION_ESTABILIZACION,
+            "implementado": implementado,
+            "posicion_pendiente": np.where(implementado, np.nan, posicion_estado),
+        })
+        resumen = datos.groupby("raiz").agg(
+            Integrantes=("raiz", "size"),
+            Subproyectos=("subproyecto", "sum"),
+            Estabilizaciones=("estabilizacion", "sum"),
+            Implementados=("implementado", "sum"),
+            posicion_pendiente=("posicion_pendiente", "min"),
+        )
+        resumen = resumen[resumen["Integrantes"] > 1]
+        raices = resumen.index.to_numpy()
+        resumen.insert(0, "Proyecto matriz", self.df["nombre"].to_numpy()[raices])
+        resumen.insert(1, "Estado matriz", estado[raices])
+        resumen["Pendientes"] = resumen["Integrantes"] - resumen["Implementados"]
+        resumen["% implementado"] = (resumen["Implementados"] / resumen["Integrantes"] * 100).round(1)
+        etapas = np.array(ORDEN_ESTADOS + ["(otro)"], dtype=object)
+        atrasado = resumen["posicion_pendiente"].to_numpy()
+        resumen["Estado más atrasado"] = np.where(
+            np.isnan(atrasado), "Implementada", etapas[np.nan_to_num(atrasado, nan=0).astype(int)]
+        )
+        return resumen.drop(columns="posicion_pendiente").rename_axis("posicion")
+
+    def posicion(self, clave):
+        """Posición del proyecto por nombre o por código de proyecto base (-1 si no está)."""
+        limpia = _limpiar_nombres(pd.Series([clave]))
+        encontrada = _buscar(self._por_nombre, limpia)[0]
+        return encontrada if encontrada >= 0 else _buscar(self._por_codigo, limpia)[0]
+
+    def hijos(self, posicion):
+        """Posiciones de los hijos directos de una fila."""
+        orden, inicio, fin = self._hijos
+        return orden[inicio[posicion]:fin[posicion]]
+
+    def miembros(self, posicion):
+        """Posiciones de toda la familia de una fila (la raíz y sus descendientes)."""
+        orden, inicio, fin = self._familia
+        raiz = self.raiz[posicion]
+        return orden[inicio[raiz]:fin[raiz]]
+
+    def recorrido(self, posicion):
+        """Posiciones de la familia en orden de árbol (cada proyecto seguido de sus hijos)."""
+        recorrido = []
+        pendientes = [self.raiz[posicion]]
+        while pendientes:
+            actual = pendientes.pop()
+            recorrido.append(actual)
+            pendientes.extend(self.hijos(actual)[::-1])
+        return np.asarray(recorrido)
+
+    def familia(self, posicion):
+        """Filas de la familia en orden de árbol con las columnas nivel, relacion y padre (nombre del padre).
+
+        El índice es la posición de cada fila en el grafo.
+        """
+        recorrido = self.recorrido(posicion)
+        filas = self.df.iloc[recorrido].copy()
+        filas.index = pd.Index(recorrido, name="posicion")
+        padres = self.padre[recorrido]
+        filas.insert(0, "nivel", self.nivel[recorrido])
+        filas.insert(1, "relacion", self.relacion[recorrido])
+        filas.insert(2, "padre", np.where(padres >= 0, self.df["nombre"].to_numpy()[np.maximum(padres, 0)], None))
+        return filas
@@ -0,0 +1,91 @@
+"""Cálculo de KPIs sin interfaz gráfica, pensado para ejecutarse desde cron.
+
+Ejemplos:
+    python kpis_cli.py --proyectos export.xlsx --migracion "Listado de Objetos a migrar_al_11_09.xlsx" --salida kpis.json
+    python kpis_cli.py --proyectos export.xlsx --salida kpis.parquet --formato parquet
+
+No importa Streamlit ni Plotly: reutiliza el procesamiento de procesamiento.py.
+"""
+import argparse
+import json
+import sys
+import time
+
+import pandas as pd
+
+import procesamiento
+
+
+def calcular_kpis(archivo_proyectos=None, archivo_migracion=None, jefaturas=None):
+    """Calcula los KPIs del lunes a partir de las exportaciones indicadas."""
+    kpis = {}
+    if archivo_proyectos is not None:
+        df = procesamiento.leer_proyectos(archivo_proyectos)
+        if jefaturas is None:
+            jefaturas = procesamiento.jefaturas_por_defecto(df)
+        df_filtrado = df[df['jefatura'].isin(jefaturas)]
+        kpis['indicadores'] = procesamiento.calcular_indicadores(df_filtrado)
+        kpis['jefaturas'] = list(jefaturas)
+        kpis['agosto'] = procesamiento.resumen_agosto(procesamiento.filtrar_agosto(df))
+    if archivo_migracion is not None:
+        df_migracion = procesamiento.leer_migracion(archivo_migracion)
+        resumen = procesamiento.resumen_por_responsable(df_migracion)
+        kpis['migracion'] = procesamiento.kpis_migracion(df_migracion)
+        kpis['migracion_por_responsable'] = [
+            {columna: (int(valor) if columna != 'Responsable_Migracion' else valor) for columna, valor in fila.items()}
+            for fila in resumen[['Responsable_Migracion', 'Asignaciones', 'Compilados', 'XPZ_Enviados', 'XPZ_Pend_Envio']].to_dict('records')
+        ]
+    return kpis
+
+def kpis_a_tabla(kpis):
+    """Aplana los KPIs en formato largo (seccion, grupo, metrica, valor) para Parquet."""
+    filas = []
+    for seccion in ['indicadores', 'agosto', 'migracion']:
+        for metrica, valor in kpis.get(seccion, {}).items():
+            filas.append({'seccion': seccion, 'grupo': '', 'metrica': metrica, 'valor': int(valor)})
+    for fila in kpis.get('migracion_por_responsable', []):
+        for metrica, valor in fila.items():
+            if metrica != 'Responsable_Migracion':
+                filas.append({'seccion': 'migracion_por_responsable', 'grupo': fila['Responsable_Migracion'], 'metrica': metrica, 'valor': valor})
+    return pd.DataFrame(filas, columns=['seccion', 'grupo', 'metrica', 'valor'])
+
+def escribir_kpis(kpis, salida, formato):
+    if formato == 'parquet':
+        kpis_a_tabla(kpis).to_parquet(salida, index=False)
+    elif salida == '-':
+        json.dump(kpis, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(kpis, f, ensure_ascii=False, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula los KPIs de proyectos y migración sin Streamlit.")
+    parser.add_argument('--proyectos', help="Exportación de proyectos de Redmine (.xlsx, encabezado en la fila 4)")
+    parser.add_argument('--migracion', help="Listado de objetos a migrar (.xlsx con hojas 'Dia a Dia' e 'Incidentes')")
+    parser.add_argument('--jefatura', action='append', dest='jefaturas',
+                        help="Jefatura a incluir en los indicadores (repetible). Por defecto, las de Core Bancario")
+    parser.add_argument('--salida', default='-', help="Archivo de salida ('-' para stdout, solo JSON)")
+    parser.add_argument('--formato', choices=['json', 'parquet'],
+                        help="Formato de salida. Por defecto se deduce de la extensión de --salida")
+    args = parser.parse_args(argv)
+
+    if args.proyectos is None and args.migracion is None:
+        parser.error("Indica al menos --proyectos o --migracion")
+    formato = args.formato or ('parquet' if args.salida.endswith('.parquet') else 'json')
+    if formato == 'parquet' and args.salida == '-':
+        parser.error("El formato parquet requiere un archivo en --salida")
+
+    inicio = time.perf_counter()
+    try:
+        kpis = calcular_kpis(args.proyectos, args.migracion, args.jefaturas)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error al procesar el archivo: {e}", file=sys.stderr)
+        return 1
+    escribir_kpis(kpis, args.salida, formato)
+    print(f"KPIs calculados en {time.perf_counter() - inicio:.3f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
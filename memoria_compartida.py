@@ -0,0 +1,153 @@
+"""Datos procesados compartidos entre los procesos del servidor (memoria compartida).
+
+Con varias réplicas de Streamlit en el mismo equipo, cada una leía el Excel de
+la carpeta de entrada y guardaba su propia copia del DataFrame. Si la variable
+de entorno DASHBOARD_MEMORIA_COMPARTIDA indica un directorio (por ejemplo
+/dev/shm/dashboard_proyectos, en memoria), la primera réplica que lee una
+versión la publica ahí como archivo Arrow IPC con un sello de versión; las
+demás la encuentran publicada y no leen el Excel.
+
+Todas, también la que la publicó, abren el archivo con memory map y arman el
+DataFrame sobre esos buffers: el texto (TEXTO_ARROW, la mayor parte de los
+datos) y los enteros no se copian, así que sus páginas las comparte el sistema
+operativo y la RAM no crece con la cantidad de procesos. Solo se copian las
+fechas con nulos (8 bytes por celda) y los códigos de las categorías.
+
+Cada archivo es inmutable: su nombre lleva el tipo y el hash del contenido
+del Excel, se escribe con un nombre temporal y se renombra. Un lock de archivo
+por tipo hace que una sola réplica lea cada versión mientras las demás
+esperan. El sello (número de versión, hash, archivo de origen y fecha) va en
+los metadatos del Arrow y en <tipo>.json, el de la última versión publicada.
+
+Para ver las versiones publicadas:
+    python memoria_compartida.py [directorio]
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import pyarrow as pa
+
+from procesamiento import TEXTO_ARROW
+
+VARIABLE_DIRECTORIO = "DASHBOARD_MEMORIA_COMPARTIDA"
+# Versiones que se conservan por tipo (las sesiones de otra réplica pueden seguir en la anterior)
+CONSERVAR = 2
+
+_CLAVE_SELLO = b"sello_dashboard"
+
+
+def directorio():
+    """Directorio compartido configurado (None si no se comparte); se crea si no existe."""
+    carpeta = os.environ.get(VARIABLE_DIRECTORIO)
+    if not carpeta or os.name != "posix":
+        return None
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+@contextmanager
+def _lock(carpeta, tipo):
+    """Lock exclusivo entre procesos para publicar versiones del tipo."""
+    import fcntl
+
+    with open(os.path.join(carpeta, f"{tipo}.lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def _ruta(carpeta, tipo, hash_contenido):
+    return os.path.join(carpeta, f"{tipo}-{hash_contenido}.arrow")
+
+
+def adjuntar(ruta):
+    """DataFrame sobre el archivo Arrow con memory map (sin copiar el texto) y su sello."""
+    tabla = pa.ipc.open_file(pa.memory_map(ruta)).read_all()
+    sello = json.loads(tabla.schema.metadata[_CLAVE_SELLO])
+    # Texto como TEXTO_ARROW sobre los buffers del archivo; split_blocks evita consolidar (copiar) las columnas
+    df = tabla.to_pandas(split_blocks=True, types_mapper={pa.large_string(): TEXTO_ARROW, pa.string(): TEXTO_ARROW}.get)
+    return df, sello
+
+def sello(tipo, carpeta=None):
+    """Sello de la última versión publicada del tipo (None si no hay)."""
+    carpeta = carpeta or directorio()
+    if carpeta is None:
+        return None
+    try:
+        with open(os.path.join(carpeta, f"{tipo}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _publicar(carpeta, tipo, hash_contenido, df, archivo):
+    """Escribe la versión (con el lock del tipo tomado) y actualiza el sello."""
+    anterior = sello(tipo, carpeta)
+    nuevo = {
+        "tipo": tipo,
+        "version": (anterior["version"] if anterior else 0) + 1,
+        "hash": hash_contenido,
+        "archivo": archivo,
+        "filas": len(df),
+        "publicado": time.time(),
+    }
+    tabla = pa.Table.from_pandas(df)
+    tabla = tabla.replace_schema_metadata({**tabla.schema.metadata, _CLAVE_SELLO: json.dumps(nuevo).encode()})
+    ruta = _ruta(carpeta, tipo, hash_contenido)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with pa.OSFile(temporal, "wb") as f, pa.ipc.new_file(f, tabla.schema) as escritor:
+        escritor.write_table(tabla)
+    os.replace(temporal, ruta)
+    temporal = os.path.join(carpeta, f"{tipo}.json.{os.getpid()}.tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(nuevo, f, ensure_ascii=False)
+    os.replace(temporal, os.path.join(carpeta, f"{tipo}.json"))
+    _descartar_viejas(carpeta, tipo)
+
+def _descartar_viejas(carpeta, tipo):
+    """Borra las versiones más viejas del tipo; los procesos que ya las abrieron las siguen viendo hasta soltarlas."""
+    versiones = sorted(
+        (os.path.join(carpeta, nombre) for nombre in os.listdir(carpeta)
+         if nombre.startswith(f"{tipo}-") and nombre.endswith(".arrow")),
+        key=os.path.getmtime,
+    )
+    for ruta in versiones[:-CONSERVAR]:
+        os.remove(ruta)
+
+
+def cargar(tipo, ruta, hash_contenido, leer):
+    """DataFrame de la versión del archivo: adjunta la publicada o la lee con leer(ruta) y la publica.
+
+    Devuelve (df, sello); sin directorio compartido, (leer(ruta), None).
+    """
+    carpeta = directorio()
+    if carpeta is None:
+        return leer(ruta), None
+    compartido = _ruta(carpeta, tipo, hash_contenido)
+    try:
+        return adjuntar(compartido)
+    except FileNotFoundError:
+        pass
+    # Con el lock tomado nadie borra la versión entre publicarla y abrirla
+    with _lock(carpeta, tipo):
+        # Otra réplica pudo publicarla mientras se esperaba el lock
+        if not os.path.exists(compartido):
+            _publicar(carpeta, tipo, hash_contenido, leer(ruta), os.path.basename(ruta))
+        return adjuntar(compartido)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lista las versiones publicadas en el directorio compartido.")
+    parser.add_argument("directorio", nargs="?", default=os.environ.get(VARIABLE_DIRECTORIO))
+    args = parser.parse_args()
+    if not args.directorio or not os.path.isdir(args.directorio):
+        parser.error(f"Indica el directorio o define {VARIABLE_DIRECTORIO}")
+    for nombre in sorted(os.listdir(args.directorio)):
+        if nombre.endswith(".arrow"):
+            ruta = os.path.join(args.directorio, nombre)
+            datos = json.loads(pa.ipc.open_file(pa.memory_map(ruta)).schema.metadata[_CLAVE_SELLO])
+            print(f"{datos['tipo']}: versión {datos['version']} desde {datos['archivo']} "
+                  f"({datos['filas']} filas, {os.path.getsize(ruta) / 1e6:.1f} MB)")
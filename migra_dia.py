@@ -1,12 +1,30 @@
+import time
+_inicio_importaciones = time.perf_counter()
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+import dependencias
+import exportacion
+import instrumentacion
+import reglas_calidad
+import vistas_arrow
+from carpeta_entrada import carpeta_configurada, datos_publicados, mostrar_origen
+from secciones import Secciones
+from procesamiento import leer_hojas_migracion, procesar_migracion, kpis_migracion, resumen_por_responsable, resumen_pendientes_por_proyecto, REGLAS_MIGRACION
+dependencias.registrar_imports_script("migra_dia", _inicio_importaciones)
+
+# Plotly se importa recién al construir el primer gráfico
+px = dependencias.ModuloPerezoso("plotly.express")
 
 # Forzar modo ancho en toda la app
 st.set_page_config(layout="wide")
+# Tiempos por etapa de este rerun
+traza = instrumentacion.Traza("migra_dia")
 
-# Asegúrate de tener instalada la biblioteca openpyxl
-# Si no la tienes, ejecuta en tu terminal: pip install openpyxl
+# Verificar dependencias sin instalar nada en tiempo de ejecución
+try:
+    dependencias.verificar("openpyxl", "plotly")
+except dependencias.DependenciaFaltante as e:
+    st.error(str(e))
+    st.stop()
 
 # Título de la aplicación
 st.title('Dashboard de Migración de Objetos')
@@ -19,92 +37,39 @@ uploaded_file = st.sidebar.file_uploader(
     type=['xlsx']
 )
 
-# Verificar si se cargó el archivo antes de continuar
-if uploaded_file is not None:
+# Sin archivo subido se usa el último listado publicado en la carpeta de entrada
+datos_carpeta = None
+if uploaded_file is None:
     try:
-        # Cargar los datos de ambas hojas del mismo archivo
-        # Especificar keep_default_na=False para preservar valores 'N/A' como texto
-        df_dia_a_dia = pd.read_excel(uploaded_file, sheet_name='Dia a Dia', keep_default_na=False, na_values=[''])
-        df_incidentes = pd.read_excel(uploaded_file, sheet_name='Incidentes', keep_default_na=False, na_values=[''])
+        datos_carpeta = datos_publicados("migracion")
+    except dependencias.DependenciaFaltante as e:
+        st.sidebar.warning(str(e))
 
-        # Verificar si los DataFrames están vacíos para evitar FutureWarning
-        dataframes_to_concat = []
-        if not df_dia_a_dia.empty:
-            dataframes_to_concat.append(df_dia_a_dia)
-        if not df_incidentes.empty:
-            dataframes_to_concat.append(df_incidentes)
-        
-        # Concatenar los DataFrames solo si hay datos
-        if dataframes_to_concat:
-            df = pd.concat(dataframes_to_concat, ignore_index=True)
+# Verificar si se cargó el archivo antes de continuar
+if uploaded_file is not None or datos_carpeta is not None:
+    try:
+        if datos_carpeta is None:
+            # Cargar y limpiar los datos de ambas hojas del mismo archivo
+            try:
+                with traza.etapa("lectura") as registro:
+                    dependencias.importar("openpyxl")
+                    df = leer_hojas_migracion(uploaded_file)
+                    registro["filas"] = len(df)
+            except ValueError as e:
+                st.error(str(e))
+                # La etapa ya quedó con el error; se guarda la traza antes de cortar el rerun
+                instrumentacion.mostrar_panel(traza)
+                traza.guardar()
+                st.stop()
+            with traza.etapa("limpieza", filas=len(df)):
+                df = procesar_migracion(df)
         else:
-            st.error("Ambas hojas del archivo están vacías.")
-            st.stop()
-
-        # Convertir FECHA XPZ a string si existe
-        if 'FECHA XPZ' in df.columns:
-            df['FECHA XPZ'] = df['FECHA XPZ'].astype(str)
-
-        # Convertir FECHA XPZ GX8 a string si existe
-        if 'FECHA XPZ GX8' in df.columns:
-            df['FECHA XPZ GX8'] = df['FECHA XPZ GX8'].astype(str)
+            # Ya leído en segundo plano; no se modifica, se comparte entre sesiones
+            df = datos_carpeta.df
+            mostrar_origen(datos_carpeta)
+        # Identifica los datos para reutilizar las tablas Arrow de las vistas entre reruns
+        origen = uploaded_file.file_id if datos_carpeta is None else datos_carpeta.hash
 
-        # Convertir FECHA OBJETO a string si existe
-        if 'FECHA OBJETO' in df.columns:
-            df['FECHA OBJETO'] = df['FECHA OBJETO'].astype(str)
-
-        # Limpiar valores NaN en todas las columnas numéricas o de fecha que puedan causar problemas
-        # EXCEPTO la columna RESPONSABLE MIGRACION que se procesará específicamente después
-        for column in df.columns:
-            if column == 'RESPONSABLE MIGRACION':
-                continue  # Saltar esta columna para procesarla específicamente después
-            if df[column].dtype == 'object':
-                df[column] = df[column].fillna('').astype(str)
-            elif df[column].dtype in ['int64', 'float64']:
-                df[column] = df[column].fillna(0)
-            else:
-                df[column] = df[column].astype(str)
-
-        # Renombrar columnas para mayor claridad
-        df.rename(columns={
-            'RESPONSABLE MIGRACION': 'Responsable_Migracion',
-            'COMPILADO?': 'Compilado',
-            'TESTEADO': 'Testeado',
-            'PROYECTO': 'Proyecto'
-        }, inplace=True)
-        
-        # Limpiar espacios en los nombres de las columnas
-        df.columns = df.columns.str.strip()
-        
-        # --- Limpieza de la columna Responsable_Migracion ---
-        # Primero convertir a string manteniendo los valores N/A originales
-        df['Responsable_Migracion'] = df['Responsable_Migracion'].astype(str)
-        
-        # Limpiar espacios pero preservar N/A
-        df['Responsable_Migracion'] = df['Responsable_Migracion'].str.strip()
-        
-        # Solo reemplazar valores que representan ausencia de datos
-        # Ahora que preservamos N/A del Excel, solo reemplazamos celdas realmente vacías
-        df['Responsable_Migracion'] = df['Responsable_Migracion'].replace(['nan', 'NaN', 'None', '', 'nat', '0'], 'Sin Asignar')
-        # Los N/A del Excel ahora se mantienen como 'N/A'
-        df['Responsable_Migracion'] = df['Responsable_Migracion'].fillna('Sin Asignar')
-        
-        # Convertir las columnas relevantes a tipo string para evitar errores
-        df['Compilado'] = df['Compilado'].fillna('NO').astype(str)
-        df['Testeado'] = df['Testeado'].fillna('NO').astype(str)
-        df['Responsable_Migracion'] = df['Responsable_Migracion'].astype(str)
-        df['Proyecto'] = df['Proyecto'].fillna('Sin Proyecto').astype(str)
-        
-        # Asegurar que todas las columnas sean compatibles con Arrow
-        # EXCEPTO Responsable_Migracion que ya fue procesada específicamente
-        for col in df.columns:
-            if col == 'Responsable_Migracion':
-                continue  # Saltar esta columna ya que fue procesada específicamente
-            if df[col].dtype == 'object':
-                df[col] = df[col].fillna('').astype(str)
-            elif df[col].dtype in ['float64', 'int64']:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
         # --- Sidebar para mostrar información del archivo cargado ---
         st.sidebar.success(f"✅ Archivo cargado exitosamente")
         st.sidebar.info(f"📊 Total de registros: {len(df)}")
@@ -117,41 +82,33 @@ if uploaded_file is not None:
         selected_proyectos = st.sidebar.multiselect('Selecciona Proyectos', sorted(proyectos))
         
         # Filtrar el DataFrame
-        if selected_proyectos:
-            filtered_df = df[df['Proyecto'].isin(selected_proyectos)]
-        else:
-            filtered_df = df.copy()
+        with traza.etapa("filtros") as registro:
+            if selected_proyectos:
+                filtered_df = df[df['Proyecto'].isin(selected_proyectos)]
+            else:
+                # Sin copia: las secciones solo leen filtered_df
+                filtered_df = df
+            registro["filas"] = len(filtered_df)
         
         # --- Sección de Visualización ---
         st.header('📈 Dashboard de Análisis')
 
-        # KPI's principales
-        total_objetos = len(filtered_df)
-        objetos_compilados = filtered_df['Compilado'].str.contains('SI', na=False).sum()
-        #objetos_testeados = filtered_df['Testeado'].str.contains('SI', na=False).sum()
+        # Dibujo progresivo: los KPIs primero; tablas y gráficos en lugares reservados (ver secciones.py)
+        secciones = Secciones(traza)
 
-        # Calcular pendientes a compilar (distinto a SI y N/A)
-        objetos_pendientes_compilar = len(filtered_df[
-            (~filtered_df['Compilado'].str.contains('SI', na=False)) &
-            (~filtered_df['Compilado'].str.contains('N/A', na=False))
-        ])
-
-        # Calcular XPZ enviados y pendientes de envío
-        if 'XPZ enviado' in filtered_df.columns:
-            total_xpz_enviados = filtered_df['XPZ enviado'].str.contains('SI', na=False).sum()
-            xpz_pend_envio = objetos_compilados - total_xpz_enviados
-        else:
-            total_xpz_enviados = 0
-            xpz_pend_envio = 0
+        # KPI's principales
+        with traza.etapa("kpis", filas=len(filtered_df)):
+            kpis = kpis_migracion(filtered_df)
 
         # Mostrar KPIs ordenados
         col1, col2, col3, col4, col5 = st.columns(5)
-        col1.metric("Total de Objetos", total_objetos)
-        col2.metric("Objetos Compilados", objetos_compilados)
-        col3.metric("⏳ Pendientes a Compilar", objetos_pendientes_compilar)
+        col1.metric("Total de Objetos", kpis['Total de Objetos'])
+        col2.metric("Objetos Compilados", kpis['Objetos Compilados'])
+        col3.metric("⏳ Pendientes a Compilar", kpis['Pendientes a Compilar'])
         #col4.metric("Objetos Testeados", objetos_testeados)
-        col4.metric("XPZ Enviados", total_xpz_enviados)
-        col5.metric("XPZ Pend. Envio", xpz_pend_envio)
+        col4.metric("XPZ Enviados", kpis['XPZ Enviados'])
+        col5.metric("XPZ Pend. Envio", kpis['XPZ Pend. Envio'])
+        traza.marca("primer contenido útil")
        
         
         st.markdown('---')
@@ -159,105 +116,97 @@ if uploaded_file is not None:
         # Gráfico por Responsable de Migración
         st.subheader('Asignaciones y Estado por Responsable de Migración')
 
-        # Agrupar por Responsable_Migracion y calcular métricas
-        resumen_responsable = filtered_df.groupby('Responsable_Migracion').agg(
-            Asignaciones=('Responsable_Migracion', 'count'),
-            Compilados=('Compilado', lambda x: (x.str.contains('SI', na=False)).sum()),
-            XPZ_Enviados=('XPZ enviado', lambda x: (x.str.contains('SI', na=False)).sum() if 'XPZ enviado' in filtered_df.columns else 0)
-        ).reset_index()
-
-        # Calcular XPZ Pendientes de Envío por responsable
-        resumen_responsable['XPZ_Pend_Envio'] = resumen_responsable['Compilados'] - resumen_responsable['XPZ_Enviados']
-
-        # Ordenar para que los valores especiales aparezcan primero
-        resumen_responsable['orden'] = resumen_responsable['Responsable_Migracion'].apply(
-            lambda x: 0 if x == 'Sin Asignar' else (1 if x == 'N/A' else 2)
-        )
-        resumen_responsable = resumen_responsable.sort_values(['orden', 'Asignaciones'], ascending=[True, False])
-
-        # Mostrar estadísticas adicionales
-        total_sin_asignar = resumen_responsable[resumen_responsable['Responsable_Migracion'] == 'Sin Asignar']['Asignaciones'].sum()
-        total_na = resumen_responsable[resumen_responsable['Responsable_Migracion'] == 'N/A']['Asignaciones'].sum()
-        total_asignados = len(filtered_df) - total_sin_asignar - total_na
-
-        col_info1, col_info2, col_info3 = st.columns(3)
-        col_info1.metric("📝 Sin Asignar", total_sin_asignar)
-        col_info2.metric("❌ N/A (No Aplica)", total_na)
-        col_info3.metric("👤 Con Responsable", total_asignados)
-
-        # Mostrar tabla resumen por responsable
-        st.dataframe(resumen_responsable[['Responsable_Migracion', 'Asignaciones', 'Compilados', 'XPZ_Pend_Envio']], use_container_width=True)
-
-        # Crear gráfico de barras apiladas por responsable
-        fig_responsable = px.bar(
-            resumen_responsable,
-            x='Responsable_Migracion',
-            y=['Asignaciones', 'Compilados', 'XPZ_Pend_Envio'],
-            title='Asignaciones, Compilados y XPZ Pend. Envio por Responsable de Migración',
-            labels={'value': 'Cantidad', 'variable': 'Estado', 'Responsable_Migracion': 'Responsable'},
-        )
-        fig_responsable.update_layout(xaxis_tickangle=-45)
-        st.plotly_chart(fig_responsable, use_container_width=True)
+        def resumen_responsable_migracion():
+            # Agrupar por Responsable_Migracion y calcular métricas
+            with traza.etapa("resumen por responsable", filas=len(filtered_df)):
+                resumen_responsable = resumen_por_responsable(filtered_df)
+
+            # Mostrar estadísticas adicionales
+            total_sin_asignar = resumen_responsable[resumen_responsable['Responsable_Migracion'] == 'Sin Asignar']['Asignaciones'].sum()
+            total_na = resumen_responsable[resumen_responsable['Responsable_Migracion'] == 'N/A']['Asignaciones'].sum()
+            total_asignados = len(filtered_df) - total_sin_asignar - total_na
+
+            col_info1, col_info2, col_info3 = st.columns(3)
+            col_info1.metric("📝 Sin Asignar", total_sin_asignar)
+            col_info2.metric("❌ N/A (No Aplica)", total_na)
+            col_info3.metric("👤 Con Responsable", total_asignados)
+
+            # Mostrar tabla resumen por responsable
+            st.dataframe(resumen_responsable[['Responsable_Migracion', 'Asignaciones', 'Compilados', 'XPZ_Pend_Envio']], use_container_width=True)
+
+            # Crear gráfico de barras apiladas por responsable
+            with traza.etapa("gráfico:responsable", filas=len(resumen_responsable)):
+                fig_responsable = px.bar(
+                    resumen_responsable,
+                    x='Responsable_Migracion',
+                    y=['Asignaciones', 'Compilados', 'XPZ_Pend_Envio'],
+                    title='Asignaciones, Compilados y XPZ Pend. Envio por Responsable de Migración',
+                    labels={'value': 'Cantidad', 'variable': 'Estado', 'Responsable_Migracion': 'Responsable'},
+                )
+                fig_responsable.update_layout(xaxis_tickangle=-45)
+                st.plotly_chart(fig_responsable, use_container_width=True)
+
+        secciones.reservar('resumen por responsable', resumen_responsable_migracion, prioridad=1)
         
         # ---        
         st.header('📊 Resumen por Proyecto XPZ Pendientes de envío')
         
-        # Crear resumen agrupado por proyecto
-        resumen_proyectos = []
-        
-        for proyecto in filtered_df['Proyecto'].unique():
-            # Filtrar datos por proyecto, excluyendo los que tienen Compilado = N/A
-            df_proyecto = filtered_df[
-            (filtered_df['Proyecto'] == proyecto) & 
-            (~filtered_df['Compilado'].str.contains('N/A', na=False))
-            ]
-            
-            # Solo continuar si el proyecto tiene registros válidos (sin N/A)
-            if len(df_proyecto) == 0:
-                continue
-            
-            # Calcular métricas por proyecto (ya sin los N/A)
-            total_objetos_proyecto = len(df_proyecto)
-            objetos_compilados_proyecto = df_proyecto['Compilado'].str.contains('SI', na=False).sum()
-            
-            # Solo agregar al resumen si hay al menos un objeto compilado (SI)
-            if objetos_compilados_proyecto == 0:
-                continue
-            
-            # Calcular XPZ enviados por proyecto
-            if 'XPZ enviado' in df_proyecto.columns:
-                xpz_enviados_proyecto = df_proyecto['XPZ enviado'].str.contains('SI', na=False).sum()
-            else:
-                xpz_enviados_proyecto = 0
-            
-            resumen_proyectos.append({
-            'Proyecto': proyecto,
-            'Total Objetos': total_objetos_proyecto,
-            'Objetos Compilados': objetos_compilados_proyecto,
-            'XPZ Enviados': xpz_enviados_proyecto
-            })
-        
-        # Convertir a DataFrame
-        df_resumen = pd.DataFrame(resumen_proyectos)
-        
-        # Filtrar solo proyectos donde XPZ Enviados < Objetos Compilados (pendientes de envío)
-        df_resumen_pendientes = df_resumen[df_resumen['XPZ Enviados'] < df_resumen['Objetos Compilados']]
+        def resumen_por_proyecto():
+            # Crear resumen agrupado por proyecto (solo con XPZ pendientes de envío)
+            with traza.etapa("resumen por proyecto", filas=len(filtered_df)):
+                df_resumen_pendientes = resumen_pendientes_por_proyecto(filtered_df)
         
-        # Ordenar por total de objetos descendente
-        df_resumen_pendientes = df_resumen_pendientes.sort_values('Total Objetos', ascending=False).reset_index(drop=True)
-        
-        # Renumerar la primera columna (índice) para mostrar el orden
-        df_resumen_pendientes.index = df_resumen_pendientes.index + 1
-        df_resumen_pendientes.index.name = 'N°'
-        
-        # Mostrar la tabla resumen solo con pendientes
-        st.dataframe(df_resumen_pendientes, use_container_width=True)
+            # Mostrar la tabla resumen solo con pendientes
+            st.dataframe(df_resumen_pendientes, use_container_width=True)
+            exportacion.boton_descarga(df_resumen_pendientes, "xpz_pendientes_por_proyecto", key="descarga_pendientes")
+
+        secciones.reservar('resumen por proyecto', resumen_por_proyecto, prioridad=2)
+        # ---
+        st.header('🧪 Calidad de datos')
+
+        def calidad_de_datos():
+            with traza.etapa("reglas de calidad", filas=len(filtered_df)):
+                matriz_reglas = reglas_calidad.evaluar(filtered_df, REGLAS_MIGRACION)
+            st.dataframe(reglas_calidad.resumen_reglas(matriz_reglas, REGLAS_MIGRACION), use_container_width=True, hide_index=True)
+            agrupar_calidad = st.radio('Agrupar por', ['Proyecto', 'Responsable_Migracion'], horizontal=True, key='calidad_agrupacion')
+            resumen_calidad = reglas_calidad.resumen_por(filtered_df, matriz_reglas, agrupar_calidad)
+            st.dataframe(resumen_calidad, use_container_width=True, hide_index=True)
+            violaciones = reglas_calidad.listado_violaciones(
+                filtered_df, matriz_reglas, ['Proyecto', 'OBJETO', 'TIPO OBJETO', 'Responsable_Migracion', 'Compilado', 'XPZ enviado']
+            )
+            exportacion.boton_descarga(violaciones, "violaciones_calidad_migracion", key="descarga_violaciones")
+
+        secciones.reservar('calidad de datos', calidad_de_datos, prioridad=3)
         # ---
         st.header('📋 Detalle de Objetos')
-        st.dataframe(filtered_df)
+
+        def detalle_objetos():
+            with traza.etapa("detalle de objetos", filas=len(filtered_df)):
+                vistas_arrow.mostrar_tabla(filtered_df, origen, use_container_width=True, hide_index=True)
+            exportacion.boton_descarga(filtered_df, "detalle_objetos", key="descarga_objetos")
+
+        secciones.reservar('detalle de objetos', detalle_objetos, prioridad=4)
+
+        # KPIs ya dibujados; el resto de la página se llena por prioridad
+        secciones.dibujar()
 
     except Exception as e:
         st.error(f"Ocurrió un error al procesar el archivo. Asegúrate de que el archivo subido es válido y contiene las hojas 'Dia a Dia' e 'Incidentes'. Error: {e}")
-
+        error = traza.error()
+        with st.expander("Detalle técnico del error"):
+            if error:
+                st.write(f"Etapa: {error['etapa']}")
+            st.exception(e)
+
+elif carpeta_configurada() is not None:
+    st.info('Leyendo el listado de la carpeta de entrada; aparecerá en el próximo rerun. También puedes subir un archivo.')
 else:
-    st.info('Por favor, sube el archivo XLSX para visualizar el dashboard.')
\ No newline at end of file
+    st.info('Por favor, sube el archivo XLSX para visualizar el dashboard.')
+
+# --- Costos de importación (arranque en frío) ---
+with st.sidebar.expander("⏱️ Tiempos de importación"):
+    st.dataframe(dependencias.resumen_tiempos(), use_container_width=True, hide_index=True)
+
+# --- Tiempos por etapa del rerun ---
+instrumentacion.mostrar_panel(traza)
+traza.guardar()
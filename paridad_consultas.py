@@ -0,0 +1,139 @@
+"""Paridad de los motores de consultas (ver consultas.py).
+
+Corre el mismo conjunto de consultas con pandas y con DuckDB (sobre la tabla
+Arrow y sobre un Parquet de la misma exportación) y compara los resultados.
+Informa el tiempo de cada consulta por motor y termina con código 1 si algún
+resultado difiere. Las mismas consultas son las pruebas de
+test_paridad_consultas.py (python -m pytest), que los dos motores tienen que pasar.
+
+Ejemplos:
+    python paridad_consultas.py
+    python paridad_consultas.py --proyectos export.xlsx
+    python paridad_consultas.py --filas 200000 --repeticiones 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import consultas
+import dependencias
+import generador_sintetico
+from procesamiento import (
+    leer_proyectos, procesar_proyectos, filtrar_core, aplicar_por_valor, etiqueta_tipo, estado_implementado,
+    extraer_gerencia, ESTADOS_IMPLEMENTADOS, ESTADOS_SIN_PLANIFICACION
+)
+
+# Consulta -> función que la ejecuta sobre un motor
+CONSULTAS = {
+    "contar total": lambda c: c.contar(),
+    "contar implementados": lambda c: c.contar([("estado_actual", "en", ESTADOS_IMPLEMENTADOS)]),
+    "contar sin gestor": lambda c: c.contar([("gestor", "nulo")]),
+    "sin fecha inicio planificados": lambda c: c.contar([("fecha_inicio", "nulo"), ("estado_actual", "no_en", ESTADOS_SIN_PLANIFICACION)]),
+    "contar etiqueta contiene": lambda c: c.contar([("etiquetas", "contiene", "AGOS/25")]),
+    "contar distinto de finalizado": lambda c: c.contar([("estado_actual", "!=", "Finalizado")]),
+    "contar inicio desde 2025": lambda c: c.contar([("fecha_inicio", ">=", pd.Timestamp("2025-01-01"))]),
+    "filtrar en QA": lambda c: c.filtrar([("estado_actual", "==", "QA-En Pruebas QA")], ["nombre", "gestor", "fecha_fin"]),
+    "filtrar gerencia en blanco": lambda c: c.filtrar([("gerencia", "vacio")], ["nombre", "gerencia"]),
+    "filtrar implementados (todas las columnas)": lambda c: c.filtrar([("estado_actual", "en", ESTADOS_IMPLEMENTADOS)]),
+    "agrupar estado": lambda c: c.agrupar(["estado_actual"]),
+    "agrupar gestor (con nulos)": lambda c: c.agrupar(["gestor"]),
+    "gerencia x implementado": lambda c: c.agrupar(["Gerencia_Principal", "implementado"], [("Gerencia_Principal", "no_vacio")]),
+    "etiqueta x implementado": lambda c: c.agrupar(["Tipo_Etiqueta", "implementado"]),
+    "estado x etiqueta": lambda c: c.cruzar("estado_actual", "Tipo_Etiqueta"),
+    "top 10 asignatarios": lambda c: c.top("asignatario", 10),
+    "top 5 gestores en curso": lambda c: c.top("gestor", 5, [("estado_actual", "no_en", ESTADOS_IMPLEMENTADOS)]),
+}
+
+
+def preparar(df):
+    """Exportación procesada con las columnas derivadas de los gráficos (Tipo_Etiqueta, implementado, Gerencia_Principal)."""
+    df = filtrar_core(df).reset_index(drop=True)
+    df['Tipo_Etiqueta'] = aplicar_por_valor(df['etiquetas'], etiqueta_tipo)
+    df['implementado'] = aplicar_por_valor(df['estado_actual'], estado_implementado)
+    df['Gerencia_Principal'] = aplicar_por_valor(df['gerencia'], extraer_gerencia)
+    return df
+
+def normalizar(resultado):
+    """Resultado comparable entre motores: índice 0..n-1, nulos como None y fechas como Timestamp."""
+    if not isinstance(resultado, pd.DataFrame):
+        return resultado
+    # El índice con nombre (las filas de cruzar) es parte del resultado; el de filtrar no
+    resultado = resultado.reset_index(drop=resultado.index.name is None)
+    resultado.columns = [str(columna) for columna in resultado.columns]
+    resultado = resultado.astype(object)
+    return resultado.where(resultado.notna(), None)
+
+def iguales(a, b):
+    if isinstance(a, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(a, b, check_dtype=False, check_index_type=False)
+        except AssertionError:
+            return False
+        return True
+    return a == b
+
+def medir(funcion, consulta, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(consulta)
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, round(statistics.median(tiempos) * 1000, 2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara los resultados y tiempos de los motores de consultas.")
+    parser.add_argument("--proyectos", help="Exportación de proyectos (.xlsx); por defecto una sintética")
+    parser.add_argument("--filas", type=int, default=20000, help="Filas de la exportación sintética")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    try:
+        dependencias.verificar("duckdb")
+    except dependencias.DependenciaFaltante as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.proyectos:
+        df = leer_proyectos(args.proyectos)
+    else:
+        crudo = generador_sintetico.generar_proyectos(args.filas)
+        df = procesar_proyectos(crudo)
+    df = preparar(df)
+
+    filas, fallidas = [], []
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_parquet = os.path.join(directorio, "proyectos.parquet")
+        df.to_parquet(ruta_parquet, index=False)
+        motores = {
+            "pandas": consultas.crear_consulta(df, "pandas"),
+            "duckdb (arrow)": consultas.crear_consulta(df, "duckdb"),
+            "duckdb (parquet)": consultas.crear_consulta(ruta_parquet, "duckdb"),
+        }
+        for nombre, funcion in CONSULTAS.items():
+            fila = {"consulta": nombre}
+            referencia = None
+            for motor, consulta in motores.items():
+                resultado, ms = medir(funcion, consulta, args.repeticiones)
+                resultado = normalizar(resultado)
+                fila[f"{motor} ms"] = ms
+                if referencia is None:
+                    referencia = resultado
+                elif not iguales(referencia, resultado):
+                    fallidas.append(f"{nombre}: {motor} difiere de pandas")
+            fila["paridad"] = "OK" if not any(f.startswith(f"{nombre}:") for f in fallidas) else "DIFIERE"
+            filas.append(fila)
+
+    print(pd.DataFrame(filas).to_string(index=False))
+    for fallida in fallidas:
+        print(fallida, file=sys.stderr)
+    print(f"{len(df)} filas, {len(CONSULTAS)} consultas, {len(fallidas)} diferencias", file=sys.stderr)
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
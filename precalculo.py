@@ -0,0 +1,273 @@
+"""Precálculo en paralelo de los artefactos derivados de una exportación.
+
+Después de leer una exportación, los dashboards arman varios artefactos a
+partir de ella: índices de fechas, texto y filtros (bitmaps, que incluyen el
+de etiquetas), máscaras de los indicadores, la matriz de reglas de calidad,
+la vista Agosto/25 con su árbol de gerencias, sus figuras y los estilos de
+sus filas. Aquí se declaran como un grafo de dependencias explícito: cada
+nodo es una función de los resultados de los nodos de los que depende.
+
+Al cargar los datos se lanza el grafo en un pool de hilos compartido por el
+proceso: los nodos independientes corren a la vez y cada uno arranca apenas
+terminan sus dependencias (numpy, pandas y Arrow liberan el GIL en el trabajo
+pesado). Los resultados se guardan por dataset (clave: hash del archivo o id
+de la subida) y por nodo como futuros, así que una segunda ejecución, o una
+sesión que llega mientras el grafo corre, toma el resultado o espera al
+mismo cálculo en vez de repetirlo. El informe dice por nodo si se calculó,
+si vino de la caché o si se esperó a otra ejecución.
+
+Ejemplo:
+    resultado = precalcular_proyectos(df, clave=hash_archivo(ruta))
+    resultado["filtros"]        # espera solo a ese nodo
+    resultado.informe()         # un registro por nodo (estado, ms, hilo)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+import graficos
+import reglas_calidad
+from arbol_gerencias import ArbolGerencias, columna_gerencia
+from busqueda import IndiceTexto
+from estilos import css_filas
+from indice_bitmap import IndiceBitmap
+from procesamiento import (
+    IndiceFechas, mascaras_indicadores, filtrar_agosto, filtrar_core, aplicar_por_valor, etiqueta_tipo,
+    estado_implementado, REGLAS_PROYECTOS
+)
+
+# Datasets con resultados guardados por proceso (los más viejos se descartan primero)
+MAX_DATASETS = 4
+# Hilos del pool compartido
+HILOS = min(8, os.cpu_count() or 1)
+
+_MEMO = OrderedDict()
+_LOCK_MEMO = threading.Lock()
+_POOL = None
+_LOCK_POOL = threading.Lock()
+
+
+def pool():
+    """Pool de hilos del proceso para los nodos (se crea con el primer precálculo)."""
+    global _POOL
+    with _LOCK_POOL:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=HILOS, thread_name_prefix="precalculo")
+        return _POOL
+
+
+class Nodo:
+    """Artefacto derivado: funcion recibe la entrada y los resultados de sus dependencias, en ese orden."""
+
+    def __init__(self, nombre, funcion, dependencias=()):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.dependencias = tuple(dependencias)
+
+
+class Resultado:
+    """Resultados de una ejecución del grafo; cada nodo se espera recién al pedirlo."""
+
+    def __init__(self, grafo, clave, futuros, estados, inicio):
+        self.grafo = grafo
+        self.clave = clave
+        self._futuros = futuros
+        self._estados = estados
+        self._inicio = inicio
+
+    def __getitem__(self, nombre):
+        return self._futuros[nombre].result()
+
+    def __contains__(self, nombre):
+        return nombre in self._futuros
+
+    def listo(self):
+        return all(futuro.done() for futuro in self._futuros.values())
+
+    def valores(self):
+        """Resultados de todos los nodos ejecutados (espera a que terminen)."""
+        return {nombre: futuro.result() for nombre, futuro in self._futuros.items()}
+
+    def informe(self):
+        """Un registro por nodo: estado (calculado, caché, en curso de otra ejecución, pendiente o error), ms e hilo."""
+        filas = []
+        for nombre, futuro in self._futuros.items():
+            estado = self._estados[nombre]
+            if not futuro.done():
+                estado = "pendiente" if estado == "calculado" else estado
+            elif futuro.exception() is not None:
+                estado = "error"
+            calculado_aqui = self._estados[nombre] == "calculado"
+            inicio = getattr(futuro, "inicio", None)
+            filas.append({
+                "Nodo": nombre,
+                "Depende de": ", ".join(self.grafo.nodos[nombre].dependencias),
+                "Estado": estado,
+                "ms": getattr(futuro, "ms", None),
+                "Inicio ms": round((inicio - self._inicio) * 1000, 1) if calculado_aqui and inicio is not None else None,
+                "Hilo": getattr(futuro, "hilo", None),
+            })
+        return pd.DataFrame(filas)
+
+
+class Grafo:
+    """Grafo de artefactos derivados; los nodos se declaran después de sus dependencias."""
+
+    def __init__(self, nodos):
+        self.nodos = OrderedDict()
+        for nodo in nodos:
+            faltantes = [d for d in nodo.dependencias if d not in self.nodos]
+            if faltantes:
+                raise ValueError(f"El nodo {nodo.nombre} depende de nodos no declarados antes: {faltantes}")
+            self.nodos[nodo.nombre] = nodo
+
+    def necesarios(self, nombres=None):
+        """Nodos pedidos y todos sus ancestros, en el orden de declaración."""
+        if nombres is None:
+            return list(self.nodos)
+        marcados = set()
+        pendientes = list(nombres)
+        while pendientes:
+            nombre = pendientes.pop()
+            if nombre not in marcados:
+                marcados.add(nombre)
+                pendientes.extend(self.nodos[nombre].dependencias)
+        return [nombre for nombre in self.nodos if nombre in marcados]
+
+    def ejecutar(self, entrada, clave, nodos=None):
+        """Lanza los nodos pedidos (y sus dependencias) que no estén ya calculados o en curso para clave.
+
+        Devuelve enseguida; el Resultado espera a cada nodo recién cuando se
+        lo pide. Un nodo que falló se vuelve a intentar en la próxima ejecución.
+        """
+        inicio = time.perf_counter()
+        futuros, estados, nuevos = {}, {}, []
+        with _LOCK_MEMO:
+            memo = _MEMO.setdefault(clave, {})
+            _MEMO.move_to_end(clave)
+            while len(_MEMO) > MAX_DATASETS:
+                _MEMO.popitem(last=False)
+            for nombre in self.necesarios(nodos):
+                futuro = memo.get(nombre)
+                if futuro is not None and not (futuro.done() and futuro.exception() is not None):
+                    estados[nombre] = "caché" if futuro.done() else "en curso"
+                else:
+                    futuro = memo[nombre] = Future()
+                    estados[nombre] = "calculado"
+                    nuevos.append(nombre)
+                futuros[nombre] = futuro
+        for nombre in nuevos:
+            self._programar(self.nodos[nombre], entrada, futuros)
+        return Resultado(self, clave, futuros, estados, inicio)
+
+    def _programar(self, nodo, entrada, futuros):
+        """Manda el nodo al pool cuando terminan todas sus dependencias."""
+        futuro = futuros[nodo.nombre]
+        dependencias = [futuros[d] for d in nodo.dependencias]
+        restantes = [len(dependencias)]
+        lock = threading.Lock()
+
+        def correr():
+            futuro.set_running_or_notify_cancel()
+            futuro.inicio = time.perf_counter()
+            futuro.hilo = threading.current_thread().name
+            try:
+                fallida = next((d for d, f in zip(nodo.dependencias, dependencias) if f.exception() is not None), None)
+                if fallida is not None:
+                    raise RuntimeError(f"No se pudo calcular '{fallida}': {dependencias[nodo.dependencias.index(fallida)].exception()}")
+                valor = nodo.funcion(entrada, *[f.result() for f in dependencias])
+            except Exception as e:
+                futuro.ms = round((time.perf_counter() - futuro.inicio) * 1000, 2)
+                futuro.set_exception(e)
+            else:
+                futuro.ms = round((time.perf_counter() - futuro.inicio) * 1000, 2)
+                futuro.set_result(valor)
+
+        def dependencia_lista(_):
+            with lock:
+                restantes[0] -= 1
+                listo = restantes[0] == 0
+            if listo:
+                pool().submit(correr)
+
+        if not dependencias:
+            pool().submit(correr)
+        for dependencia in dependencias:
+            dependencia.add_done_callback(dependencia_lista)
+
+
+def olvidar(clave):
+    """Descarta los resultados guardados de un dataset."""
+    with _LOCK_MEMO:
+        _MEMO.pop(clave, None)
+
+
+# --- Grafo de la exportación de proyectos ---
+def _matriz_calidad(df):
+    return reglas_calidad.evaluar(df, REGLAS_PROYECTOS)
+
+def _arbol_gerencias(df, agosto):
+    """Árbol Gerencia/Unidad de Core Bancario y Normativo de la vista Agosto/25 (None sin la columna)."""
+    columna = columna_gerencia(agosto)
+    return ArbolGerencias(filtrar_core(agosto), columna=columna) if columna is not None else None
+
+def _columnas_agosto(df, agosto, arbol):
+    """DataFrames de la pestaña Gráficos: core con Tipo_Etiqueta e implementado y el corte con Gerencia_Principal."""
+    graf = filtrar_core(agosto).copy()
+    graf['Tipo_Etiqueta'] = aplicar_por_valor(graf['etiquetas'], etiqueta_tipo)
+    graf['implementado'] = aplicar_por_valor(graf['estado_actual'], estado_implementado)
+    gerencia = None
+    if arbol is not None:
+        columna = columna_gerencia(agosto)
+        gerencia = graf[graf[columna].notna() & (graf[columna].astype(str).str.strip() != '')].copy()
+        gerencia['Gerencia_Principal'] = arbol.principal
+    return {"graf": graf, "gerencia": gerencia}
+
+def _figuras_agosto(df, columnas, arbol):
+    """Figuras de la vista Agosto/25 (los cruces con el motor pandas)."""
+    graf, gerencia = columnas["graf"], columnas["gerencia"]
+    return {
+        "estados": graficos.figura_estados(graf),
+        "etiquetas": graficos.figura_etiquetas(graf),
+        "etiqueta_implementado": graficos.figura_etiqueta_implementado(graf),
+        "implementados": graficos.figura_implementados(graf),
+        "gerencia": graficos.figura_gerencia(gerencia) if gerencia is not None else None,
+        "arbol": graficos.figura_arbol_gerencias(arbol.nodos) if arbol is not None else None,
+    }
+
+def _estilos_agosto(df, agosto):
+    return css_filas(agosto)
+
+
+GRAFO_PROYECTOS = Grafo([
+    Nodo("fechas", IndiceFechas),
+    Nodo("texto", IndiceTexto),
+    Nodo("filtros", IndiceBitmap),
+    Nodo("indicadores", mascaras_indicadores),
+    Nodo("calidad", _matriz_calidad),
+    Nodo("agosto", filtrar_agosto),
+    Nodo("árbol de gerencias", _arbol_gerencias, ["agosto"]),
+    Nodo("columnas agosto", _columnas_agosto, ["agosto", "árbol de gerencias"]),
+    Nodo("figuras agosto", _figuras_agosto, ["columnas agosto", "árbol de gerencias"]),
+    Nodo("estilos agosto", _estilos_agosto, ["agosto"]),
+])
+
+# Nodos que usa cada dashboard
+NODOS_DASHBOARD = ["fechas", "texto", "filtros", "indicadores", "calidad"]
+NODOS_AGOSTO = ["agosto", "árbol de gerencias", "columnas agosto", "figuras agosto", "estilos agosto"]
+
+
+def precalcular_proyectos(df, clave, nodos=None):
+    """Lanza el grafo de la exportación de proyectos procesada (todos los nodos o los pedidos)."""
+    return GRAFO_PROYECTOS.ejecutar(df, clave, nodos)
+
+def mostrar_informe(resultado):
+    """Panel lateral con el estado de cada nodo del precálculo en este rerun."""
+    import streamlit as st
+    informe = resultado.informe()
+    with st.sidebar.expander(f"🧮 Precálculo ({int((informe['Estado'] == 'caché').sum())}/{len(informe)} en caché)"):
+        st.dataframe(informe, use_container_width=True, hide_index=True)
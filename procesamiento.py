@@ -0,0 +1,594 @@
+"""Procesamiento de datos compartido por los dashboards y la línea de comandos.
+
+Este módulo no importa Streamlit ni Plotly: contiene solo la lectura de las
+exportaciones y los cálculos de indicadores, para poder reutilizarlos tanto
+desde los dashboards como desde procesos batch (ver kpis_cli.py).
+"""
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Renombrado de columnas de la exportación de proyectos de Redmine
+COLUMNAS_PROYECTOS = {
+    "Nombre": "nombre",
+    "Estado Actual": "estado_actual",
+    "Jefatura": "jefatura",
+    "Asignatario predeterminado": "asignatario",
+    "Fecha de inicio": "fecha_inicio",
+    "Fecha de fin": "fecha_fin",
+    "Actualizado por última vez": "actualizado",
+    "Etiquetas": "etiquetas",
+    "Gestor del proyecto": "gestor",
+    "Propietario del proyecto": "propietario",
+    "Gerencia/Unidad": "gerencia",
+    "Fecha Pasaje a Producción": "fecha_pasaje_prod",
+    "Estabilización": "estabilizacion",
+    "Autor": "autor"
+}
+
+# Orden deseado de estados
+ORDEN_ESTADOS = [
+    "PMO-Detenido",
+    "PMO-No iniciado",
+    "PMO-Relevamiento PMO",
+    "PMO-Pend. Validación técnica",
+    "DESA-Listo p/ Análisis Técnico",
+    "DESA-Análisis Técnico",
+    "DESA-Pendiente Desarrollo",
+    "DESA-En Curso",
+    "QA-En Pruebas QA",
+    "QA-En Pruebas Detenidas",
+    "QA-En Pruebas UAT",
+    "PROD-Para Comité de Pasajes",
+    "Estabilización",
+    "Finalizado"
+]
+
+# Estados que no requieren fechas de planificación
+ESTADOS_SIN_PLANIFICACION = ['Estabilización', 'Finalizado', 'PMO-Detenido', 'PMO-No iniciado']
+ESTADOS_IMPLEMENTADOS = ['Finalizado', 'Estabilización']
+
+
+def ordenar_estados(estados):
+    """Estados en el orden de ORDEN_ESTADOS; los que no figuran van al final."""
+    presentes = set(estados)
+    return [e for e in ORDEN_ESTADOS if e in presentes] + sorted(presentes - set(ORDEN_ESTADOS))
+
+
+# Funciones de procesamiento de datos
+def limpiar_espacios_guion(nombre):
+    """Elimina los espacios alrededor del guion en una cadena."""
+    if isinstance(nombre, str):
+        return re.sub(r"\s*-\s*", "-", nombre.lstrip())
+    return nombre
+
+def extraer_codigos(nombre):
+    """Extrae Codigo_Proyecto y Codigo_Estabilizacion del nombre."""
+    codigo_proyecto = None
+    codigo_estabilizacion = None
+    if isinstance(nombre, str):
+        nombre_sin_espacios_iniciales = nombre.lstrip()
+        match_estabilizacion = re.search(r"^(E\d+)", nombre_sin_espacios_iniciales)
+        if match_estabilizacion:
+            codigo_estabilizacion = match_estabilizacion.group(1)
+            nombre_restante = nombre_sin_espacios_iniciales[len(match_estabilizacion.group(1)):].lstrip("- ").lstrip()
+        else:
+            nombre_restante = nombre_sin_espacios_iniciales
+
+        match_proyecto = re.search(r"([PMANAI]\d+/\d+)", nombre_restante)
+        if match_proyecto:
+            codigo_proyecto = match_proyecto.group(1)
+
+    return pd.Series([codigo_proyecto, codigo_estabilizacion])
+
+def clasificar(nombre):
+    if isinstance(nombre, str):
+        nombre_sin_espacios = nombre.lstrip()
+        if nombre_sin_espacios.startswith("E"):
+            return "Estabilización"
+        elif nombre_sin_espacios.startswith("I"):
+            return "Incidente"
+        elif nombre_sin_espacios.startswith("P"):
+            return "Proyecto"
+        elif nombre_sin_espacios.startswith("M"):
+            return "Mantenimiento"
+        elif nombre_sin_espacios.startswith("A"):
+            return "Auditoria"
+        elif nombre_sin_espacios.startswith("N"):
+            return "Normativo"
+        else:
+            return "Otro"
+    return "Otro"
+
+
+# --- Tipos respaldados por Arrow ---
+# Texto en buffers de Arrow: st.dataframe lo pasa a Arrow sin copiar ni convertir objetos de Python
+TEXTO_ARROW = pd.StringDtype("pyarrow")
+
+def a_texto_arrow(df):
+    """Convierte las columnas de texto (object) a TEXTO_ARROW; los vacíos quedan como <NA>."""
+    for columna in df.columns[df.dtypes == object]:
+        df[columna] = df[columna].astype(TEXTO_ARROW)
+    return df
+
+
+# --- Exportación de proyectos ---
+# Primera letra del nombre -> tipo (el resto es "Otro"), como en clasificar
+TIPOS_POR_PREFIJO = {
+    "E": "Estabilización", "I": "Incidente", "P": "Proyecto",
+    "M": "Mantenimiento", "A": "Auditoria", "N": "Normativo",
+}
+
+def procesar_nombres(df):
+    """Limpia la columna Nombre, extrae los códigos y clasifica el tipo.
+
+    Mismo criterio que limpiar_espacios_guion, extraer_codigos y clasificar,
+    pero con los métodos .str sobre la columna entera en vez de una llamada
+    por fila. Los valores que no son texto quedan igual, sin códigos y "Otro".
+    """
+    nombres = df["Nombre"]
+    # Qué celdas son texto, sin recorrerlas: los métodos .str dejan nulo lo que no es texto
+    tipo = pd.api.types.infer_dtype(nombres, skipna=True)
+    if tipo == "string":
+        es_texto = nombres.notna()
+    elif tipo.startswith("mixed"):
+        es_texto = nombres.str.len().notna()
+    else:
+        es_texto = pd.Series(False, index=nombres.index)
+    limpio = nombres.where(es_texto).astype(object).str.lstrip().str.replace(r"\s*-\s*", "-", regex=True)
+    df["Nombre"] = limpio.where(es_texto, nombres)
+    # El código de estabilización va al principio; el de proyecto no puede empezar dentro de él
+    df["codigo_proyecto"] = limpio.str.extract(r"([PMANAI]\d+/\d+)", expand=False)
+    df["codigo_estabilizacion"] = limpio.str.extract(r"^(E\d+)", expand=False)
+    df["tipo"] = limpio.str[:1].map(TIPOS_POR_PREFIJO).fillna("Otro")
+    return df
+
+def procesar_fechas(df):
+    """Convierte las columnas de fecha (ya renombradas) a datetime64.
+
+    fecha_inicio y fecha_fin se truncan al día; las fechas inválidas quedan NaT.
+    """
+    df['fecha_inicio'] = pd.to_datetime(df['fecha_inicio'], errors='coerce').dt.normalize()
+    df['fecha_fin'] = pd.to_datetime(df['fecha_fin'], errors='coerce').dt.normalize()
+    df['actualizado'] = pd.to_datetime(df['actualizado'], errors='coerce')
+    df['fecha_pasaje_prod'] = pd.to_datetime(df['fecha_pasaje_prod'], errors='coerce')
+    return df
+
+def procesar_proyectos(df):
+    """Limpia nombres, extrae códigos, clasifica y normaliza columnas y fechas."""
+    df = procesar_nombres(df)
+    # Renombrar columnas para consistencia
+    df = df.rename(columns=COLUMNAS_PROYECTOS)
+    return a_texto_arrow(procesar_fechas(df))
+
+def leer_proyectos(archivo):
+    """Lee la exportación de proyectos (encabezado en la fila 4) y la procesa."""
+    df = pd.read_excel(archivo, header=3)
+    return procesar_proyectos(df)
+
+# --- Filtros por rango de fechas ---
+COLUMNAS_FECHA = ['fecha_inicio', 'fecha_fin', 'actualizado', 'fecha_pasaje_prod']
+
+
+class IndiceFechas:
+    """Índice ordenado de cada columna de fecha para filtrar por rango.
+
+    Por columna guarda las fechas válidas ordenadas y la posición de la fila de
+    cada una, de modo que un rango [desde, hasta] se resuelve con dos
+    búsquedas binarias (np.searchsorted) en lugar de recorrer la columna.
+    Las filas sin fecha (NaT) quedan fuera de cualquier rango.
+    """
+
+    def __init__(self, df, columnas=COLUMNAS_FECHA):
+        self.filas = len(df)
+        self._ordenados = {}
+        for columna in columnas:
+            if columna not in df.columns:
+                continue
+            valores = df[columna].to_numpy(dtype='datetime64[ns]')
+            validas = np.flatnonzero(~np.isnat(valores))
+            orden = validas[np.argsort(valores[validas], kind='stable')]
+            self._ordenados[columna] = (valores[orden], orden)
+
+    def columnas(self):
+        return list(self._ordenados)
+
+    def limites(self, columna):
+        """Primera y última fecha de la columna (None si no tiene fechas)."""
+        valores, _ = self._ordenados[columna]
+        if not len(valores):
+            return None
+        return pd.Timestamp(valores[0]), pd.Timestamp(valores[-1])
+
+    def posiciones(self, columna, desde=None, hasta=None):
+        """Posiciones de las filas con desde <= fecha <= hasta (hasta incluye el día completo)."""
+        valores, orden = self._ordenados[columna]
+        inicio = 0 if desde is None else np.searchsorted(valores, np.datetime64(pd.Timestamp(desde), 'ns'), side='left')
+        if hasta is None:
+            fin = len(valores)
+        else:
+            fin_dia = pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1)
+            fin = np.searchsorted(valores, np.datetime64(fin_dia, 'ns'), side='left')
+        return orden[inicio:fin]
+
+    def mascara(self, rangos):
+        """Máscara booleana de las filas dentro de todos los rangos {columna: (desde, hasta)}."""
+        mascara = np.ones(self.filas, dtype=bool)
+        for columna, (desde, hasta) in rangos.items():
+            en_rango = np.zeros(self.filas, dtype=bool)
+            en_rango[self.posiciones(columna, desde, hasta)] = True
+            mascara &= en_rango
+        return mascara
+
+
+def jefaturas_por_defecto(df):
+    """Jefaturas seleccionadas por defecto en el dashboard (las de Core Bancario)."""
+    jefaturas_unicas = sorted(df['jefatura'].dropna().unique().tolist())
+    return [j for j in jefaturas_unicas if "Core Bancario" in j]
+
+
+# --- Reglas de calidad de datos ---
+class Predicado:
+    """Condición vectorizada sobre columnas: predicado(df) devuelve la máscara booleana.
+
+    Se combina con &, | y ~ para declarar reglas sin escribir lambdas; la
+    descripción acompaña a la regla en los resúmenes.
+    """
+
+    def __init__(self, funcion, descripcion):
+        self.funcion = funcion
+        self.descripcion = descripcion
+
+    def __call__(self, df):
+        # Las comparaciones sobre texto Arrow dan <NA> en los vacíos: no cumplen la condición
+        return pd.Series(self.funcion(df), index=df.index).fillna(False).astype(bool)
+
+    def __and__(self, otro):
+        return Predicado(lambda df: self(df) & otro(df), f"{self.descripcion} y {otro.descripcion}")
+
+    def __or__(self, otro):
+        return Predicado(lambda df: self(df) | otro(df), f"({self.descripcion} o {otro.descripcion})")
+
+    def __invert__(self):
+        return Predicado(lambda df: ~self(df), f"no {self.descripcion}")
+
+def vacio(columna):
+    return Predicado(lambda df: df[columna].isna(), f"{columna} vacío")
+
+def igual(columna, valor):
+    return Predicado(lambda df: df[columna] == valor, f"{columna} = {valor}")
+
+def en(columna, valores):
+    return Predicado(lambda df: df[columna].isin(valores), f"{columna} en {', '.join(map(str, valores))}")
+
+def anterior(columna, otra):
+    return Predicado(lambda df: df[columna] < df[otra], f"{columna} < {otra}")
+
+# Reglas de la exportación de proyectos: nombre -> predicado de la fila que la viola
+REGLAS_PROYECTOS = {
+    "Sin Gestor": vacio('gestor'),
+    "Sin Fecha Inicio": vacio('fecha_inicio') & ~en('estado_actual', ESTADOS_SIN_PLANIFICACION),
+    "En Prod y Sin Fecha Pasaje": vacio('fecha_pasaje_prod') & en('estado_actual', ESTADOS_IMPLEMENTADOS),
+    "Sin Fecha Fin": vacio('fecha_fin') & ~en('estado_actual', ESTADOS_SIN_PLANIFICACION),
+    "Sin Asignatario": vacio('asignatario'),
+    "Fecha Fin antes del Inicio": anterior('fecha_fin', 'fecha_inicio'),
+}
+
+# Reglas del listado de objetos a migrar (ya procesado con procesar_migracion)
+REGLAS_MIGRACION = {
+    "Sin Responsable": igual('Responsable_Migracion', 'Sin Asignar'),
+    "Responsable N/A": igual('Responsable_Migracion', 'N/A'),
+    "Sin Proyecto": igual('Proyecto', 'Sin Proyecto'),
+    "XPZ enviado sin compilar": igual('estado_xpz', 'SI') & igual('estado_compilado', 'NO'),
+}
+
+
+# Indicadores clave: etiqueta -> función que devuelve la máscara booleana
+def _estado_contiene(texto):
+    return lambda df: df['estado_actual'].str.contains(texto, na=False)
+
+INDICADORES = {
+    "Total Proyectos": lambda df: pd.Series(True, index=df.index),
+    "Finalizados": lambda df: df['estado_actual'] == 'Finalizado',
+    "En Estabilización": lambda df: df['estado_actual'] == 'Estabilización',
+    "Para Comité": _estado_contiene('PROD-Para Comité de Pasajes'),
+    "Análisis Tec (DESA)": _estado_contiene('DESA-Análisis Técnico'),
+    "En Curso (DESA)": _estado_contiene('DESA-En Curso'),
+    "En QA": _estado_contiene('QA-En Pruebas QA'),
+    "En UAT": _estado_contiene('QA-En Pruebas UAT'),
+    "PMO-Detenido": _estado_contiene('PMO-Detenido'),
+    "PMO-No iniciado": _estado_contiene('PMO-No iniciado'),
+    "PMO-Relevamiento PMO": _estado_contiene('PMO-Relevamiento PMO'),
+    "PMO-Pend. Validación técnica": _estado_contiene('PMO-Pend. Validación técnica'),
+    # Los indicadores de calidad son las mismas reglas que evalúa reglas_calidad
+    "Sin Gestor": REGLAS_PROYECTOS["Sin Gestor"],
+    "Sin Fecha Inicio": REGLAS_PROYECTOS["Sin Fecha Inicio"],
+    "En Prod y Sin Fecha Pasaje": REGLAS_PROYECTOS["En Prod y Sin Fecha Pasaje"],
+    "Sin Fecha Fin": REGLAS_PROYECTOS["Sin Fecha Fin"],
+    "Sin Asignatario": REGLAS_PROYECTOS["Sin Asignatario"],
+}
+
+def filtrar_indicador(df, indicador):
+    """Devuelve las filas de df que cumplen el indicador."""
+    if df.empty:
+        return pd.DataFrame()
+    return df[INDICADORES[indicador](df)]
+
+def contar_indicador(df, indicador):
+    if df.empty:
+        return 0
+    return int(INDICADORES[indicador](df).sum())
+
+def mascaras_indicadores(df):
+    """Matriz booleana filas x indicadores con el índice de df: el conteo de un indicador en un corte es la suma de su columna en esas filas."""
+    return pd.DataFrame({
+        indicador: pd.Series(condicion(df), index=df.index).fillna(False).astype(bool)
+        for indicador, condicion in INDICADORES.items()
+    }, index=df.index)
+
+def calcular_indicadores(df):
+    """Cantidad de proyectos por cada indicador clave."""
+    return {indicador: contar_indicador(df, indicador) for indicador in INDICADORES}
+
+
+# --- Vista Agosto/25 ---
+def filtrar_agosto(df):
+    """Filtrar solo proyectos cuyas etiquetas contengan '/Agos/25'."""
+    return df[df['etiquetas'].str.contains('/Agos/25', na=False, regex=False)]
+
+def resumen_agosto(df):
+    """Totales de la planilla Agosto/25 (df ya filtrado con filtrar_agosto)."""
+    total_finalizados = df['estado_actual'].astype(str).str.lower().eq('finalizado').sum()
+    total_estabilizacion = df['estado_actual'].astype(str).str.lower().eq('estabilización').sum()
+    return {
+        'Total Proyectos': len(df),
+        'Presentación Agosto/25': int(df['etiquetas'].astype(str).str.lower().str.contains('pres/agos/25').sum()),
+        'Posterior Presentación Agosto/25': int(df['etiquetas'].astype(str).str.lower().str.contains('post/agos/25').sum()),
+        'Implementados': int(total_finalizados + total_estabilizacion)
+    }
+
+
+# --- Derivaciones por fila de las vistas agrupadas ---
+# Resultados ya calculados por función (valor -> resultado). Viven en el módulo,
+# que se importa una sola vez, así que se reutilizan entre reruns del dashboard.
+# Lo comparten los hilos de las sesiones y los del precálculo: vaciar e insertar van con lock.
+_MEMO_POR_VALOR = {}
+_LOCK_MEMO_POR_VALOR = threading.Lock()
+# Tope por función para columnas de texto libre; al superarlo se vacía ese memo
+MAX_MEMO_POR_FUNCION = 50000
+_VACIO = object()
+_FALTA = object()
+
+def aplicar_por_valor(serie, funcion):
+    """Equivale a serie.apply(funcion) pero evalúa la función una vez por valor distinto.
+
+    La columna se factoriza (códigos + valores únicos, los vacíos cuentan como
+    un único valor), la función corre solo sobre los únicos que no estén en el
+    memo y el resultado vuelve a cada fila a través de los códigos.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+    with _LOCK_MEMO_POR_VALOR:
+        memo = _MEMO_POR_VALOR.setdefault(funcion, {})
+        if len(memo) + len(unicos) > MAX_MEMO_POR_FUNCION:
+            memo.clear()
+    resultados = np.empty(len(unicos), dtype=object)
+    for i, valor in enumerate(unicos):
+        clave = _VACIO if pd.isna(valor) else valor
+        # El resultado se toma en una variable local: otro hilo puede vaciar el memo en cualquier momento
+        resultado = memo.get(clave, _FALTA)
+        if resultado is _FALTA:
+            resultado = funcion(valor)
+            with _LOCK_MEMO_POR_VALOR:
+                memo[clave] = resultado
+        resultados[i] = resultado
+    return pd.Series(resultados[codigos], index=serie.index, name=serie.name)
+
+def filtrar_core(df):
+    """Filtrar solo jefatura Core Bancario y Normativo."""
+    return df[df['jefatura'].str.lower().str.contains('core bancario|normativo', na=False)]
+
+def extraer_asignatario(valor):
+    if pd.isna(valor) or str(valor).strip() == '':
+        return "(Sin asignatario)"
+    return str(valor).strip()
+
+def extraer_gerencia(valor):
+    if pd.isna(valor):
+        return "(Sin dato)"
+    return str(valor).split('>')[0].strip()
+
+def etiqueta_tipo(etiquetas):
+    etiquetas = str(etiquetas).lower()
+    if 'post/agos/25' in etiquetas:
+        return 'Post/Agos/25'
+    elif 'pres/agos/25' in etiquetas:
+        return 'Pres/Agos/25'
+    else:
+        return 'Otro'
+
+def estado_implementado(estado):
+    estado = str(estado).strip().lower()
+    if estado in ['estabilización', 'finalizado']:
+        return 'Implementado'
+    else:
+        return 'No implementado'
+
+def agrupar_jefatura(jef):
+    if pd.isna(jef):
+        return 'Sin Jefatura'
+    jef = str(jef)
+    if 'core bancario' in jef.lower() or 'normativo' in jef.lower():
+        return 'Core'
+    else:
+        return 'Canales'
+
+
+# --- Listado de objetos a migrar ---
+def leer_migracion(archivo):
+    """Lee las hojas 'Dia a Dia' e 'Incidentes' y las concatena ya limpias."""
+    return procesar_migracion(leer_hojas_migracion(archivo))
+
+def leer_hojas_migracion(archivo):
+    """Lee y concatena las hojas 'Dia a Dia' e 'Incidentes' sin limpiar."""
+    # Especificar keep_default_na=False para preservar valores 'N/A' como texto
+    df_dia_a_dia = pd.read_excel(archivo, sheet_name='Dia a Dia', keep_default_na=False, na_values=[''])
+    df_incidentes = pd.read_excel(archivo, sheet_name='Incidentes', keep_default_na=False, na_values=[''])
+
+    # Verificar si los DataFrames están vacíos para evitar FutureWarning
+    dataframes_to_concat = []
+    if not df_dia_a_dia.empty:
+        dataframes_to_concat.append(df_dia_a_dia)
+    if not df_incidentes.empty:
+        dataframes_to_concat.append(df_incidentes)
+
+    if not dataframes_to_concat:
+        raise ValueError("Ambas hojas del archivo están vacías.")
+    return pd.concat(dataframes_to_concat, ignore_index=True)
+
+def procesar_migracion(df):
+    """Normaliza tipos y la columna de responsable del listado de migración.
+
+    El texto queda en TEXTO_ARROW (sin vacíos: las celdas vacías son '').
+    """
+    # Convertir columnas de fecha a string si existen
+    for columna_fecha in ['FECHA XPZ', 'FECHA XPZ GX8', 'FECHA OBJETO']:
+        if columna_fecha in df.columns:
+            df[columna_fecha] = df[columna_fecha].astype(str)
+
+    # Limpiar valores NaN en todas las columnas numéricas o de fecha que puedan causar problemas
+    # EXCEPTO la columna RESPONSABLE MIGRACION que se procesará específicamente después
+    for column in df.columns:
+        if column == 'RESPONSABLE MIGRACION':
+            continue  # Saltar esta columna para procesarla específicamente después
+        if df[column].dtype == 'object':
+            df[column] = df[column].fillna('').astype(TEXTO_ARROW)
+        elif df[column].dtype in ['int64', 'float64']:
+            df[column] = df[column].fillna(0)
+        else:
+            df[column] = df[column].astype(str).astype(TEXTO_ARROW)
+
+    # Renombrar columnas para mayor claridad
+    df.rename(columns={
+        'RESPONSABLE MIGRACION': 'Responsable_Migracion',
+        'COMPILADO?': 'Compilado',
+        'TESTEADO': 'Testeado',
+        'PROYECTO': 'Proyecto'
+    }, inplace=True)
+
+    # Limpiar espacios en los nombres de las columnas
+    df.columns = df.columns.str.strip()
+
+    # --- Limpieza de la columna Responsable_Migracion ---
+    # Texto sin espacios; los N/A del Excel se mantienen como 'N/A'
+    df['Responsable_Migracion'] = df['Responsable_Migracion'].astype(TEXTO_ARROW).str.strip()
+
+    # Solo reemplazar valores que representan ausencia de datos (celdas realmente vacías)
+    df['Responsable_Migracion'] = df['Responsable_Migracion'].replace(['nan', 'NaN', 'None', '', 'nat', '0'], 'Sin Asignar')
+    df['Responsable_Migracion'] = df['Responsable_Migracion'].fillna('Sin Asignar')
+
+    # Columnas relevantes como texto (una columna sin ningún valor llega numérica)
+    df['Compilado'] = df['Compilado'].astype(TEXTO_ARROW).fillna('NO')
+    df['Testeado'] = df['Testeado'].astype(TEXTO_ARROW).fillna('NO')
+    df['Proyecto'] = df['Proyecto'].astype(TEXTO_ARROW).fillna('Sin Proyecto')
+
+    # Numéricas sin vacíos; el texto ya quedó en TEXTO_ARROW
+    for col in df.columns:
+        if df[col].dtype in ['float64', 'int64']:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    # Estados normalizados una sola vez (SI / NO / N/A) para los KPI's
+    df['estado_compilado'] = normalizar_estado(df['Compilado'])
+    df['estado_testeado'] = normalizar_estado(df['Testeado'])
+    df['estado_xpz'] = normalizar_estado(df['XPZ enviado'] if 'XPZ enviado' in df.columns else pd.Series('', index=df.index))
+    return df
+
+# Valores posibles de las columnas estado_* del listado de migración
+ESTADOS_MIGRACION = pd.CategoricalDtype(['SI', 'NO', 'N/A'])
+
+def normalizar_estado(columna):
+    """Texto libre de Compilado/Testeado/XPZ enviado -> categoría SI / NO / N/A.
+
+    Mantiene el criterio de las métricas: 'SI' si el texto contiene SI, 'N/A'
+    si contiene N/A (y no SI), 'NO' en cualquier otro caso.
+    """
+    texto = columna.astype(TEXTO_ARROW)
+    estado = np.where(texto.str.contains('SI', regex=False, na=False), 'SI',
+                      np.where(texto.str.contains('N/A', regex=False, na=False), 'N/A', 'NO'))
+    return pd.Series(pd.Categorical(estado, dtype=ESTADOS_MIGRACION), index=columna.index)
+
+def kpis_migracion(df):
+    """KPI's principales del listado de migración."""
+    objetos_compilados = int((df['estado_compilado'] == 'SI').sum())
+
+    # Calcular pendientes a compilar (distinto a SI y N/A)
+    objetos_pendientes_compilar = int((df['estado_compilado'] == 'NO').sum())
+
+    # Calcular XPZ enviados y pendientes de envío
+    if 'XPZ enviado' in df.columns:
+        total_xpz_enviados = int((df['estado_xpz'] == 'SI').sum())
+        xpz_pend_envio = objetos_compilados - total_xpz_enviados
+    else:
+        total_xpz_enviados = 0
+        xpz_pend_envio = 0
+
+    return {
+        'Total de Objetos': len(df),
+        'Objetos Compilados': objetos_compilados,
+        'Pendientes a Compilar': objetos_pendientes_compilar,
+        'XPZ Enviados': total_xpz_enviados,
+        'XPZ Pend. Envio': xpz_pend_envio
+    }
+
+def resumen_por_responsable(df):
+    """Asignaciones, compilados y XPZ pendientes por responsable de migración."""
+    tiene_xpz = 'XPZ enviado' in df.columns
+    marcas = pd.DataFrame({
+        'Responsable_Migracion': df['Responsable_Migracion'],
+        'compilado': (df['estado_compilado'] == 'SI').to_numpy(),
+        'xpz_enviado': (df['estado_xpz'] == 'SI').to_numpy() & tiene_xpz,
+    })
+    resumen_responsable = marcas.groupby('Responsable_Migracion').agg(
+        Asignaciones=('Responsable_Migracion', 'size'),
+        Compilados=('compilado', 'sum'),
+        XPZ_Enviados=('xpz_enviado', 'sum'),
+    ).reset_index()
+
+    # Calcular XPZ Pendientes de Envío por responsable
+    resumen_responsable['XPZ_Pend_Envio'] = resumen_responsable['Compilados'] - resumen_responsable['XPZ_Enviados']
+
+    # Ordenar para que los valores especiales aparezcan primero
+    resumen_responsable['orden'] = resumen_responsable['Responsable_Migracion'].map({'Sin Asignar': 0, 'N/A': 1}).fillna(2).astype(int)
+    return resumen_responsable.sort_values(['orden', 'Asignaciones'], ascending=[True, False])
+
+def resumen_pendientes_por_proyecto(df):
+    """Proyectos con objetos compilados cuyo XPZ todavía no fue enviado."""
+    # Excluir los objetos con Compilado = N/A y contar por proyecto (en orden de aparición)
+    validos = df['estado_compilado'] != 'N/A'
+    marcas = pd.DataFrame({
+        'Proyecto': df['Proyecto'][validos],
+        'compilado': (df['estado_compilado'][validos] == 'SI').to_numpy(),
+        'xpz_enviado': (df['estado_xpz'][validos] == 'SI').to_numpy() & ('XPZ enviado' in df.columns),
+    })
+    df_resumen = marcas.groupby('Proyecto', sort=False).agg(
+        **{
+            'Total Objetos': ('Proyecto', 'size'),
+            'Objetos Compilados': ('compilado', 'sum'),
+            'XPZ Enviados': ('xpz_enviado', 'sum'),
+        }
+    ).reset_index()
+
+    # Solo proyectos con al menos un objeto compilado (SI)
+    df_resumen = df_resumen[df_resumen['Objetos Compilados'] > 0]
+
+    # Filtrar solo proyectos donde XPZ Enviados < Objetos Compilados (pendientes de envío)
+    df_resumen_pendientes = df_resumen[df_resumen['XPZ Enviados'] < df_resumen['Objetos Compilados']]
+
+    # Ordenar por total de objetos descendente
+    df_resumen_pendientes = df_resumen_pendientes.sort_values('Total Objetos', ascending=False, kind='stable').reset_index(drop=True)
+
+    # Renumerar la primera columna (índice) para mostrar el orden
+    df_resumen_pendientes.index = df_resumen_pendientes.index + 1
+    df_resumen_pendientes.index.name = 'N°'
+    return df_resumen_pendientes
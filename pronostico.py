@@ -0,0 +1,134 @@
+"""Pronóstico Monte Carlo de entrega de los proyectos no implementados.
+
+El throughput histórico es la cantidad de proyectos implementados
+(Estabilización/Finalizado) por mes según fecha_pasaje_prod, como en
+"Implementados por Mes". Para cada grupo (tipo o Gerencia_Principal) se
+sortean meses futuros de ese histórico y se cuenta cuántos meses hacen falta
+para cubrir los proyectos pendientes. Todas las simulaciones de un grupo se
+resuelven juntas con NumPy (matriz simulaciones x meses, cumsum y argmax),
+sin bucles por simulación.
+"""
+import numpy as np
+import pandas as pd
+
+from procesamiento import ESTADOS_IMPLEMENTADOS, aplicar_por_valor, extraer_gerencia
+
+PERCENTILES = [50, 85, 95]
+
+# Horizonte máximo simulado; si no se termina antes, el grupo queda "sin completar"
+MAX_MESES = 120
+
+# Agrupaciones disponibles: etiqueta -> columna
+AGRUPACIONES = {"Tipo": "tipo", "Gerencia Principal": "Gerencia_Principal"}
+
+
+def preparar_pronostico(df):
+    """Agrega Gerencia_Principal y la marca de implementado a la exportación procesada."""
+    datos = df[["tipo", "gerencia", "estado_actual", "fecha_pasaje_prod", "actualizado"]].copy()
+    datos["Gerencia_Principal"] = aplicar_por_valor(datos["gerencia"], extraer_gerencia).fillna("(sin gerencia)")
+    datos["tipo"] = datos["tipo"].fillna("Otro")
+    datos["implementado"] = datos["estado_actual"].isin(ESTADOS_IMPLEMENTADOS)
+    return datos
+
+def mes_de_corte(datos):
+    """Mes de la exportación: el de la última actualización registrada (o el actual)."""
+    ultima = datos["actualizado"].max()
+    return pd.Period(ultima if pd.notna(ultima) else pd.Timestamp.today(), freq="M")
+
+def throughput_mensual(datos, columna, meses_historia, hasta):
+    """Implementados por mes y grupo en los meses_historia meses anteriores a `hasta` (incluye meses en cero).
+
+    Devuelve un DataFrame con una fila por mes (PeriodIndex) y una columna por grupo.
+    """
+    meses = pd.period_range(end=hasta - 1, periods=meses_historia, freq="M")
+    implementados = datos[datos["implementado"] & datos["fecha_pasaje_prod"].notna()]
+    mes = implementados["fecha_pasaje_prod"].dt.to_period("M")
+    conteo = (
+        implementados.assign(mes=mes)[mes.isin(meses)]
+        .groupby(["mes", columna]).size()
+        .unstack(columna, fill_value=0)
+    )
+    grupos = sorted(datos[columna].dropna().unique())
+    return conteo.reindex(index=meses, columns=grupos, fill_value=0)
+
+def simular_meses(historico, pendientes, simulaciones=20000, max_meses=MAX_MESES, rng=None):
+    """Meses necesarios para completar `pendientes` en cada simulación.
+
+    historico: throughput mensual observado (arreglo de enteros). Devuelve un
+    arreglo de largo `simulaciones` con la cantidad de meses (1..max_meses), o
+    NaN en las simulaciones que no terminan dentro del horizonte.
+
+    Se simula por bloques de meses: el primero cubre la duración esperada y
+    los siguientes continúan solo las simulaciones que todavía no terminaron,
+    en lugar de sortear siempre el horizonte completo.
+    """
+    rng = rng or np.random.default_rng()
+    historico = np.asarray(historico, dtype=np.int32)
+    if pendientes <= 0:
+        return np.zeros(simulaciones)
+    if historico.size == 0 or historico.max() == 0:
+        return np.full(simulaciones, np.nan)
+
+    meses = np.full(simulaciones, np.nan)
+    acumulado = np.zeros(simulaciones, dtype=np.int32)
+    activas = np.arange(simulaciones)
+    inicio = 0
+    bloque = int(np.ceil(pendientes / historico.mean()))
+    while activas.size and inicio < max_meses:
+        largo = max(1, min(bloque, max_meses - inicio))
+        muestras = historico[rng.integers(0, historico.size, size=(activas.size, largo))]
+        total = np.cumsum(muestras, axis=1, dtype=np.int32) + acumulado[activas, None]
+        completo = total >= pendientes
+        termina = completo[:, -1]
+        meses[activas[termina]] = inicio + completo[termina].argmax(axis=1) + 1
+        acumulado[activas] = total[:, -1]
+        activas = activas[~termina]
+        inicio += largo
+        bloque = max(3, bloque // 4)
+    return meses
+
+def fecha_fin_mes(mes_inicial, meses):
+    """Último día del mes en que se completa, contando mes_inicial como el mes 1."""
+    if not np.isfinite(meses):
+        return pd.NaT
+    if meses <= 0:
+        return mes_inicial.to_timestamp()
+    return (mes_inicial + int(meses) - 1).to_timestamp(how="end").normalize()
+
+def pronosticar(df, agrupacion="tipo", meses_historia=12, simulaciones=20000, semilla=None, hasta=None):
+    """Percentiles de fecha de finalización de los pendientes, por grupo y en total.
+
+    El histórico son los meses_historia meses completos anteriores al mes de
+    corte (`hasta`, por defecto el de la última actualización de la
+    exportación), y la simulación empieza en el mes de corte. Las fechas son
+    el fin del mes en que, con esa probabilidad, se terminan todos los
+    proyectos pendientes del grupo. Devuelve (tabla, meses, hasta) donde
+    meses es {grupo: arreglo de meses simulados} para graficar la
+    distribución y hasta es el mes de corte usado.
+    """
+    rng = np.random.default_rng(semilla)
+    datos = preparar_pronostico(df)
+    hasta = pd.Period(hasta, freq="M") if hasta is not None else mes_de_corte(datos)
+    throughput = throughput_mensual(datos, agrupacion, meses_historia, hasta)
+    pendientes = datos.loc[~datos["implementado"], agrupacion].value_counts()
+
+    grupos = {grupo: (throughput[grupo].to_numpy(), int(pendientes.get(grupo, 0))) for grupo in throughput.columns}
+    grupos["Total"] = (throughput.sum(axis=1).to_numpy(), int(pendientes.sum()))
+
+    filas = []
+    meses_por_grupo = {}
+    for grupo, (historico, pendientes_grupo) in grupos.items():
+        meses = simular_meses(historico, pendientes_grupo, simulaciones, rng=rng)
+        meses_por_grupo[grupo] = meses
+        fila = {
+            "Grupo": grupo,
+            "Pendientes": pendientes_grupo,
+            "Throughput mensual medio": round(float(historico.mean()), 2) if historico.size else 0.0,
+            "% sin completar": round(float(np.isnan(meses).mean() * 100), 1),
+        }
+        # Percentiles sobre todas las simulaciones: las que no terminan cuentan como infinito
+        valores = np.percentile(np.where(np.isnan(meses), np.inf, meses), PERCENTILES, method="higher")
+        for p, valor in zip(PERCENTILES, valores):
+            fila[f"P{p}"] = fecha_fin_mes(hasta, valor)
+        filas.append(fila)
+    return pd.DataFrame(filas), meses_por_grupo, hasta
@@ -0,0 +1,335 @@
+"""Prueba de carga de los dashboards con sesiones concurrentes.
+
+Genera exportaciones sintéticas (ver generador_sintetico.py), las deja en una
+carpeta de entrada (ver carpeta_entrada.py) y lanza N sesiones simultáneas
+con streamlit.testing.v1.AppTest. Cada sesión hace un rerun inicial y después
+una serie de interacciones al azar del escenario: clics en los indicadores,
+filtros de la barra lateral o selectores dentro de las pestañas (el cambio de
+pestaña en sí no genera rerun: todas se ejecutan en cada uno).
+
+AppTest no soporta file_uploader, por eso los datos llegan por la carpeta de
+entrada. Como en el servidor, todas las sesiones son hilos de un mismo
+proceso: compiten por el GIL y comparten el vigilante de la carpeta, las
+cachés (cache_resource y cache_data) y la memoria. AppTest.run instala y quita
+en cada rerun un Runtime simulado global, así que no admite varias sesiones a
+la vez; SesionAppTest corre solo el script y servidor_simulado instala el
+Runtime simulado una vez por escenario. Las sesiones esperan en una barrera
+con los datos ya cargados y arrancan juntas; una sesión colgada se informa
+como error al vencer el timeout de sus reruns.
+
+Por escenario se informan los percentiles 50/95/99 de la latencia de los
+reruns y la memoria residente del proceso: la base (datos cargados y un rerun
+de calentamiento por sesión) y el pico durante el escenario. La diferencia es
+lo que agregan las sesiones al trabajar a la vez.
+
+Ejemplos:
+    python prueba_carga.py
+    python prueba_carga.py --sesiones 1 5 10 20 --pasos 10 --filas 10000
+    python prueba_carga.py --escenarios indicadores filtros --salida carga.csv
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+from urllib import parse
+
+import numpy as np
+import pandas as pd
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.pages_manager import PagesManager
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+from streamlit.testing.v1.util import patch_config_options
+
+import generador_sintetico
+from carpeta_entrada import VARIABLE_CARPETA
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage no se informa la memoria
+    resource = None
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Segundos máximos para que el vigilante publique los archivos generados
+ESPERA_DATOS = 300
+# Segundos entre mediciones de la memoria durante un escenario
+INTERVALO_MEMORIA = 0.1
+
+
+def rss_pico_mb():
+    """Pico de memoria residente del proceso en MB (None si la plataforma no lo informa)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def rss_actual_mb():
+    """Memoria residente actual del proceso en MB (en Linux; en otras plataformas, el pico)."""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas = int(f.read().split()[1])
+    except OSError:
+        return rss_pico_mb()
+    return round(paginas * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+class MedidorMemoria:
+    """Mide la memoria residente en un hilo aparte y guarda el máximo."""
+
+    def __init__(self, intervalo=INTERVALO_MEMORIA):
+        self.intervalo = intervalo
+        self.pico = rss_actual_mb()
+        self._fin = threading.Event()
+        self._hilo = threading.Thread(target=self._medir, name="medidor_memoria", daemon=True)
+
+    def _medir(self):
+        while not self._fin.wait(self.intervalo):
+            self.pico = max(self.pico or 0, rss_actual_mb() or 0)
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        self._hilo.join()
+        self.pico = max(self.pico or 0, rss_actual_mb() or 0) or None
+
+
+# --- Sesiones concurrentes en un proceso ---
+# Scripts compilados, compartidos por todas las sesiones como en el servidor
+_SCRIPTS = ScriptCache()
+
+
+@contextmanager
+def servidor_simulado():
+    """Runtime simulado y configuración de AppTest para todas las sesiones del escenario."""
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    # Una sola caché de st.cache_data para todas las sesiones
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        Runtime._instance = None
+
+
+class SesionAppTest(AppTest):
+    """AppTest que puede correr a la vez que otras en el mismo proceso (dentro de servidor_simulado)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.id_sesion = uuid.uuid4().hex
+
+    def _run(self, widget_state=None, timeout=None):
+        runner = LocalScriptRunner(
+            self._script_path, self.session_state,
+            PagesManager(self._script_path, _SCRIPTS, setup_watcher=False),
+            args=self.args, kwargs=self.kwargs,
+        )
+        # LocalScriptRunner compila el script en cada rerun con una caché propia y usa
+        # el mismo id para todas las sesiones; en el servidor la caché es una y cada sesión tiene su id
+        runner._script_cache = _SCRIPTS
+        runner._session_id = self.id_sesion
+        self._tree = runner.run(widget_state, self.query_params, timeout or self.default_timeout, self._page_hash)
+        self._tree._runner = self
+        # El último evento es el fin del script, con el query string de la sesión
+        self.query_params = parse.parse_qs(runner.event_data[-1]["client_state"].query_string)
+        return self
+
+
+# --- Interacciones: modifican un widget de la sesión (el rerun lo hace quien las llama) ---
+def clic_indicador(at, rng):
+    botones = [b for b in at.button if b.key and b.key.endswith("_button")]
+    rng.choice(botones).click()
+
+def elegir_filtro(at, rng):
+    columna = rng.choice(["estado_actual", "tipo", "gestor", "etiquetas"])
+    filtro = at.multiselect(key=f"filtro_{columna}")
+    filtro.set_value(rng.sample(filtro.options, min(2, len(filtro.options))))
+
+def limpiar_filtros(at, rng):
+    for multiselect in at.multiselect:
+        if multiselect.key and multiselect.key.startswith("filtro_"):
+            multiselect.set_value([])
+
+def cambiar_modo_filtros(at, rng):
+    radio = at.radio(key="modo_filtros")
+    radio.set_value("OR" if radio.value == "AND" else "AND")
+
+def buscar(at, rng):
+    at.text_input(key="busqueda_proyectos").input(rng.choice(["migra", "normativo", "canal", "", "cuentas"]))
+
+def _elegir_opcion(at, rng, key):
+    """Elige una opción al azar de un selectbox o radio si está en pantalla (depende de los datos)."""
+    widgets = [w for w in list(at.selectbox) + list(at.radio) if w.key == key]
+    if widgets:
+        widgets[0].set_value(rng.choice(widgets[0].options))
+
+def selector_pestana(at, rng):
+    key = rng.choice(["selector_estado_pre_migracion", "filtro_ano_implementado", "calidad_agrupacion", "pronostico_agrupacion"])
+    _elegir_opcion(at, rng, key)
+
+def elegir_proyectos_migracion(at, rng):
+    proyectos = at.sidebar.multiselect[0]
+    proyectos.set_value(rng.sample(proyectos.options, min(rng.randint(0, 3), len(proyectos.options))))
+
+def agrupar_calidad(at, rng):
+    _elegir_opcion(at, rng, "calidad_agrupacion")
+
+
+# Escenario -> (página, interacciones posibles)
+ESCENARIOS = {
+    "indicadores": ("dashboard_projectos.py", [clic_indicador]),
+    "filtros": ("dashboard_projectos.py", [elegir_filtro, limpiar_filtros, cambiar_modo_filtros, buscar]),
+    "pestanas": ("dashboard_projectos.py", [selector_pestana, clic_indicador]),
+    "migracion": ("migra_dia.py", [elegir_proyectos_migracion, agrupar_calidad]),
+}
+
+
+def generar_datos(carpeta, filas, semilla):
+    """Escribe una exportación de proyectos y un listado de migración en la carpeta de entrada."""
+    generador_sintetico.escribir_proyectos(
+        generador_sintetico.generar_proyectos(filas, semilla), os.path.join(carpeta, "proyectos_sinteticos.xlsx")
+    )
+    generador_sintetico.escribir_migracion(
+        *generador_sintetico.generar_migracion(filas, semilla),
+        os.path.join(carpeta, generador_sintetico.nombre_listado_migracion("2025-09-11")),
+    )
+
+def esperar_datos(carpeta):
+    """Arranca el vigilante de la carpeta y espera a que publique ambos tipos de archivo."""
+    import carpeta_entrada
+
+    vigilante = carpeta_entrada.vigilante(carpeta)
+    limite = time.monotonic() + ESPERA_DATOS
+    while any(vigilante.actual(tipo) is None for tipo in carpeta_entrada.TIPOS):
+        if vigilante.errores:
+            raise RuntimeError(f"No se pudieron leer los archivos de la carpeta: {vigilante.errores}")
+        if time.monotonic() > limite:
+            raise TimeoutError("La carpeta de entrada no publicó los datos a tiempo")
+        time.sleep(0.2)
+
+def sesion(escenario, pasos, semilla, timeout, barrera, resultados):
+    """Una sesión (hilo propio): rerun inicial y pasos interacciones al azar, midiendo cada rerun."""
+    pagina, interacciones = ESCENARIOS[escenario]
+    latencias, errores = [], []
+    try:
+        # Un rerun descartado deja la sesión en el estado de alguien que ya abrió la página
+        rng = random.Random(semilla)
+        at = SesionAppTest(os.path.join(DIRECTORIO, pagina), default_timeout=timeout)
+        at.run()
+        barrera.wait()
+    except Exception as e:
+        if not isinstance(e, threading.BrokenBarrierError):
+            barrera.abort()
+        resultados.append({"latencias": latencias, "errores": [f"{pagina}: {e!r}"]})
+        return
+    for paso in range(pasos + 1):
+        try:
+            if paso:
+                rng.choice(interacciones)(at, rng)
+            comienzo = time.perf_counter()
+            at.run()
+            latencias.append(time.perf_counter() - comienzo)
+            if at.exception or at.error:
+                errores.append(f"{pagina}: {[e.value for e in list(at.exception) + list(at.error)]}")
+        except Exception as e:
+            errores.append(f"{pagina}: {e!r}")
+    resultados.append({"latencias": latencias, "errores": errores})
+
+def correr_escenario(escenario, sesiones, pasos, semilla, timeout):
+    """Lanza las sesiones del escenario a la vez (una por hilo, en este proceso) y devuelve sus métricas."""
+    # La barrera espera a que todas tengan su rerun de calentamiento; una sesión que no llega la rompe
+    barrera = threading.Barrier(sesiones + 1, timeout=timeout * 2)
+    resultados = []
+    hilos = [
+        threading.Thread(target=sesion, args=(escenario, pasos, semilla + i, timeout, barrera, resultados),
+                         name=f"sesion_{i}", daemon=True)
+        for i in range(sesiones)
+    ]
+    with servidor_simulado():
+        for hilo in hilos:
+            hilo.start()
+        try:
+            barrera.wait()
+        except threading.BrokenBarrierError:
+            pass
+        rss_base = rss_actual_mb()
+        # Ningún rerun puede tardar más que timeout: una sesión que no termina no cuelga la prueba
+        limite = time.monotonic() + timeout * (pasos + 1)
+        with MedidorMemoria() as memoria:
+            for hilo in hilos:
+                hilo.join(max(0.0, limite - time.monotonic()))
+    colgadas = [hilo.name for hilo in hilos if hilo.is_alive()]
+
+    ms = np.concatenate([r["latencias"] for r in resultados] or [[]]) * 1000
+    errores = [error for r in resultados for error in r["errores"]]
+    errores += [f"{nombre}: no terminó en {timeout * (pasos + 1):.0f} s" for nombre in colgadas]
+    return {
+        "escenario": escenario,
+        "sesiones": sesiones,
+        "reruns": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1) if len(ms) else None,
+        "p95_ms": round(float(np.percentile(ms, 95)), 1) if len(ms) else None,
+        "p99_ms": round(float(np.percentile(ms, 99)), 1) if len(ms) else None,
+        "max_ms": round(float(ms.max()), 1) if len(ms) else None,
+        "errores": len(errores),
+        "rss_base_mb": rss_base,
+        "rss_pico_mb": memoria.pico,
+        "detalle_errores": errores[:5],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de los dashboards con sesiones concurrentes (AppTest).")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--pasos", type=int, default=5, help="Interacciones por sesión después del rerun inicial")
+    parser.add_argument("--filas", type=int, default=5000, help="Filas de las exportaciones sintéticas")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=300, help="Segundos máximos por rerun")
+    parser.add_argument("--carpeta", help="Carpeta con exportaciones ya generadas (por defecto se generan en una temporal)")
+    parser.add_argument("--salida", help="Guardar los resultados en CSV")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as temporal:
+        carpeta = os.path.abspath(args.carpeta or temporal)
+        if not args.carpeta:
+            generar_datos(carpeta, args.filas, args.semilla)
+            print(f"Exportaciones sintéticas de {args.filas} filas en {carpeta}", file=sys.stderr)
+        # Las páginas leen de la carpeta y no escriben trazas
+        os.environ[VARIABLE_CARPETA] = carpeta
+        os.environ["DASHBOARD_TRAZAS"] = os.devnull
+        esperar_datos(carpeta)
+        for escenario in args.escenarios:
+            for sesiones in args.sesiones:
+                resultado = correr_escenario(escenario, sesiones, args.pasos, args.semilla, args.timeout)
+                for error in resultado.pop("detalle_errores"):
+                    print(f"  error: {error}", file=sys.stderr)
+                resultados.append(resultado)
+                print(f"{escenario} con {sesiones} sesiones: p95 {resultado['p95_ms']} ms", file=sys.stderr)
+
+    resultados = pd.DataFrame(resultados)
+    print(resultados.to_string(index=False))
+    if args.salida:
+        resultados.to_csv(args.salida, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Motor de reglas de calidad de datos.
+
+Las reglas se declaran en procesamiento (REGLAS_PROYECTOS, REGLAS_MIGRACION)
+como predicados sobre columnas. Se evalúan todas de una vez en una matriz
+booleana filas x reglas (True donde la fila viola la regla); los resúmenes por
+regla, por jefatura o por gestor y el listado de violaciones salen de esa
+matriz con sumas por columna, groupby y np.nonzero, sin volver a evaluar.
+"""
+import numpy as np
+import pandas as pd
+
+SIN_DATO = "(Sin dato)"
+
+
+def evaluar(df, reglas):
+    """Matriz booleana filas x reglas con el índice de df: True donde la fila viola la regla."""
+    columnas = [np.asarray(regla(df), dtype=bool) for regla in reglas.values()]
+    matriz = np.column_stack(columnas) if columnas else np.zeros((len(df), 0), dtype=bool)
+    return pd.DataFrame(matriz, index=df.index, columns=list(reglas))
+
+def resumen_reglas(matriz, reglas):
+    """Filas que violan cada regla, con su condición y el porcentaje sobre el total."""
+    total = len(matriz)
+    filas = matriz.sum(axis=0).astype(int)
+    return pd.DataFrame({
+        "Regla": matriz.columns,
+        "Condición": [reglas[r].descripcion for r in matriz.columns],
+        "Filas": filas.to_numpy(),
+        "% filas": (filas / total * 100).round(1).to_numpy() if total else 0.0,
+    })
+
+def resumen_por(df, matriz, columna):
+    """Violaciones de cada regla por valor de la columna (jefatura, gestor...), de más a menos filas con problemas."""
+    grupos = df[columna].astype("string").fillna(SIN_DATO).to_numpy()
+    tabla = matriz.astype(int).groupby(grupos).sum()
+    tabla.insert(0, "Filas", pd.Series(grupos).value_counts())
+    tabla["Filas con problemas"] = matriz.any(axis=1).groupby(grupos).sum().astype(int)
+    tabla["% con problemas"] = (tabla["Filas con problemas"] / tabla["Filas"] * 100).round(1)
+    tabla = tabla.sort_values(["Filas con problemas", "Filas"], ascending=False)
+    return tabla.rename_axis(columna).reset_index()
+
+def listado_violaciones(df, matriz, columnas, reglas=None):
+    """Una fila por (fila del DataFrame, regla violada) con la regla y las columnas pedidas."""
+    if reglas is not None:
+        matriz = matriz[list(reglas)]
+    filas, posiciones = np.nonzero(matriz.to_numpy())
+    columnas = [c for c in columnas if c in df.columns]
+    listado = df.iloc[filas][columnas].reset_index(drop=True)
+    listado.insert(0, "Regla", matriz.columns.to_numpy()[posiciones])
+    return listado
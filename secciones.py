@@ -0,0 +1,77 @@
+"""Dibujo progresivo de las páginas: lugares reservados en orden de lectura, llenados por prioridad.
+
+Streamlit envía cada elemento al navegador apenas el script lo crea, así que
+lo que se dibuja primero es lo primero que ve el usuario. Las secciones caras
+(gráficos, tablas grandes, pestañas) se reservan en su posición con un aviso
+de carga y se dibujan después de los indicadores, en orden de prioridad: la
+página muestra enseguida lo útil y el resto va apareciendo en su lugar.
+
+Las regiones interactivas (indicadores y su detalle, selectores dentro de las
+pestañas) se declaran con @fragmento: sus widgets vuelven a ejecutar solo la
+región (st.fragment), sin releer el archivo ni redibujar el resto.
+
+Ejemplo:
+    secciones = Secciones(traza)
+    secciones.reservar("Distribuciones", dibujar_distribuciones, prioridad=2)
+    ...  # indicadores
+    traza.marca("primer contenido útil")
+    secciones.dibujar()
+"""
+import functools
+
+import instrumentacion
+
+
+class Secciones:
+    """Secciones reservadas de un rerun, pendientes de dibujar."""
+
+    def __init__(self, traza):
+        self.traza = traza
+        self._pendientes = []
+
+    def reservar(self, nombre, dibujar, prioridad, contenedor=None, etapa=None, filas=None):
+        """Reserva el lugar de la sección en la posición actual (o dentro de contenedor, p. ej. una pestaña).
+
+        dibujar es una función sin argumentos que escribe la sección con st.*;
+        las de menor prioridad se dibujan primero y, a igual prioridad, en el
+        orden en que se reservaron. El dibujo se mide en la traza como etapa
+        (por defecto "sección:<nombre>").
+        """
+        import streamlit as st
+
+        lugar = (contenedor or st).empty()
+        lugar.caption(f"⏳ Cargando {nombre}...")
+        self._pendientes.append((prioridad, len(self._pendientes), etapa or f"sección:{nombre}", filas, lugar, dibujar))
+
+    def dibujar(self):
+        """Dibuja las secciones reservadas en orden de prioridad, cada una en su lugar."""
+        pendientes, self._pendientes = sorted(self._pendientes, key=lambda p: p[:2]), []
+        for _, _, etapa, filas, lugar, dibujar in pendientes:
+            with lugar.container(), self.traza.etapa(etapa, filas=filas):
+                dibujar()
+
+
+def fragmento(traza, nombre):
+    """Decorador: la función pasa a ser un st.fragment; sus widgets vuelven a ejecutar solo la función.
+
+    La función recibe como primer argumento la traza donde medir: en el rerun
+    completo, la de la página; en un rerun parcial (ya guardada la de la
+    página), una traza propia "<script>:<nombre>" que se guarda al terminar.
+    Los demás argumentos son los del rerun completo en que se dibujó.
+    """
+    import streamlit as st
+
+    def decorador(funcion):
+        @st.fragment
+        @functools.wraps(funcion)
+        def region(*args, **kwargs):
+            if not traza.guardada:
+                return funcion(traza, *args, **kwargs)
+            parcial = instrumentacion.Traza(f"{traza.script}:{nombre}")
+            try:
+                with parcial.etapa(f"fragmento:{nombre}"):
+                    return funcion(parcial, *args, **kwargs)
+            finally:
+                parcial.guardar()
+        return region
+    return decorador
@@ -0,0 +1,151 @@
+import time
+_inicio_importaciones = time.perf_counter()
+import os
+import streamlit as st
+import pandas as pd
+import dependencias
+import exportacion
+import instrumentacion
+from historico import listar_listados_migracion, firma_archivos, construir_historico_migracion, tendencia_migracion, avance_diario
+dependencias.registrar_imports_script("tendencia_migracion", _inicio_importaciones)
+
+# Plotly se importa recién al construir el primer gráfico
+px = dependencias.ModuloPerezoso("plotly.express")
+
+st.set_page_config(page_title="Tendencia de Migración", page_icon="📉", layout="wide")
+# Tiempos por etapa de este rerun
+traza = instrumentacion.Traza("tendencia_migracion")
+st.title("📉 Avance diario de la migración de objetos")
+
+# Verificar dependencias sin instalar nada en tiempo de ejecución
+try:
+    dependencias.verificar("openpyxl", "plotly", "pyarrow")
+except dependencias.DependenciaFaltante as e:
+    st.error(str(e))
+    st.stop()
+
+# Nombres de las métricas para mostrar
+METRICAS = {
+    "compilados": "Compilados",
+    "xpz_enviados": "XPZ Enviados",
+    "pendientes_compilar": "Pendientes a Compilar",
+    "xpz_pend_envio": "XPZ Pend. Envio",
+}
+APERTURAS = {"Total": None, "Por Responsable": "Responsable_Migracion", "Por Proyecto": "Proyecto"}
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def leer_historico(carpeta, firma, _procesos):
+    """construir_historico_migracion, una vez por contenido de la carpeta (firma: nombre, tamaño y fecha de cada archivo)."""
+    barra = st.progress(0.0, text="Leyendo listados...")
+
+    def progreso(hechos, total, ruta):
+        barra.progress(hechos / total if total else 1.0, text=f"Leyendo listados... {hechos}/{total}")
+
+    resultado = construir_historico_migracion(carpeta, procesos=_procesos, progreso=progreso)
+    barra.empty()
+    return resultado
+
+
+# --- Carpeta con los listados diarios ---
+st.sidebar.header("📁 Listados diarios")
+carpeta = st.sidebar.text_input(
+    "Carpeta con los listados 'Listado de Objetos a migrar_al_DD_MM.xlsx'",
+    value=os.environ.get("DASHBOARD_LISTADOS", "listados"),
+    key="carpeta_listados",
+)
+procesos = st.sidebar.number_input("Procesos en paralelo", min_value=1, max_value=os.cpu_count() or 1,
+                                   value=os.cpu_count() or 1, key="procesos_listados")
+
+if not os.path.isdir(carpeta):
+    st.info("Indica una carpeta existente con los listados diarios de objetos a migrar.")
+else:
+    try:
+        # Cada listado se lee una sola vez: los ya leídos salen de la caché por hash
+        # y el resultado se reutiliza mientras no cambie la carpeta (los widgets solo recalculan el gráfico)
+        with traza.etapa("lectura") as registro:
+            historico, estadisticas = leer_historico(carpeta, firma_archivos(listar_listados_migracion(carpeta)), int(procesos))
+            registro["filas"] = estadisticas["archivos"]
+
+        st.sidebar.success(
+            f"✅ {estadisticas['archivos']} listados: {estadisticas['desde_cache']} desde caché, "
+            f"{estadisticas['procesados']} leídos ahora"
+        )
+        for nombre, error in estadisticas["errores"].items():
+            st.warning(f"No se pudo leer {nombre}: {error}")
+
+        if historico.empty:
+            st.info("La carpeta no contiene listados de migración válidos.")
+        else:
+            # --- Filtros ---
+            st.sidebar.header("🔍 Filtros")
+            responsables = st.sidebar.multiselect("Responsables", sorted(historico["Responsable_Migracion"].unique()), key="responsables_tendencia")
+            proyectos = st.sidebar.multiselect("Proyectos", sorted(historico["Proyecto"].unique()), key="proyectos_tendencia")
+            apertura = st.radio("Apertura", list(APERTURAS), horizontal=True, key="apertura_tendencia")
+            por = APERTURAS[apertura]
+
+            with traza.etapa("tendencia", filas=len(historico)):
+                tendencia = tendencia_migracion(historico, por, responsables, proyectos)
+                avance = avance_diario(tendencia, por)
+                total = tendencia_migracion(historico, None, responsables, proyectos)
+                avance_total = avance_diario(total)
+
+            # --- KPI's del último día y ritmo promedio ---
+            ultimo = total.iloc[-1]
+            quema_media = avance_total["Quema pendientes/día"].mean()
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric(f"Compilados al {ultimo['fecha']:%d/%m}", int(ultimo["compilados"]))
+            col2.metric("Pendientes a Compilar", int(ultimo["pendientes_compilar"]))
+            col3.metric("Quema promedio (obj/día)", f"{quema_media:.1f}" if pd.notna(quema_media) else "-")
+            if pd.notna(quema_media) and quema_media > 0:
+                col4.metric("Días estimados para compilar todo", f"{ultimo['pendientes_compilar'] / quema_media:.0f}")
+            else:
+                col4.metric("Días estimados para compilar todo", "-")
+
+            st.subheader("Evolución por día")
+            with traza.etapa("gráfico:evolucion", filas=len(tendencia)):
+                if por is None:
+                    datos = tendencia.melt(id_vars="fecha", value_vars=list(METRICAS), var_name="Métrica", value_name="Objetos")
+                    datos["Métrica"] = datos["Métrica"].map(METRICAS)
+                    fig = px.line(datos, x="fecha", y="Objetos", color="Métrica", markers=True,
+                                  title="Compilados, XPZ enviados y pendientes por día")
+                else:
+                    metrica = st.selectbox("Métrica", list(METRICAS), format_func=METRICAS.get, key="metrica_tendencia")
+                    fig = px.line(tendencia, x="fecha", y=metrica, color=por, markers=True,
+                                  labels={metrica: METRICAS[metrica]},
+                                  title=f"{METRICAS[metrica]} por día ({apertura.lower()})")
+                st.plotly_chart(fig, use_container_width=True, key="evolucion_migracion")
+            st.dataframe(tendencia, use_container_width=True, hide_index=True)
+            exportacion.boton_descarga(tendencia, "tendencia_migracion", key="descarga_tendencia")
+
+            st.subheader("Ritmo diario (burn rate)")
+            if avance.empty:
+                st.info("Hace falta más de un listado para calcular el ritmo diario.")
+            else:
+                with traza.etapa("gráfico:ritmo", filas=len(avance)):
+                    if por is None:
+                        datos = avance.melt(id_vars="fecha", var_name="Ritmo", value_name="Objetos por día")
+                        fig_ritmo = px.bar(datos, x="fecha", y="Objetos por día", color="Ritmo", barmode="group",
+                                           title="Objetos por día entre listados consecutivos")
+                    else:
+                        fig_ritmo = px.bar(avance, x="fecha", y="Quema pendientes/día", color=por,
+                                           title=f"Quema de pendientes por día ({apertura.lower()})")
+                    st.plotly_chart(fig_ritmo, use_container_width=True, key="ritmo_migracion")
+                st.dataframe(avance, use_container_width=True, hide_index=True)
+                exportacion.boton_descarga(avance, "ritmo_migracion", key="descarga_ritmo")
+
+    except Exception as e:
+        st.error(f"Ocurrió un error al procesar los listados de migración: {e}")
+        error = traza.error()
+        with st.expander("Detalle técnico del error"):
+            if error:
+                st.write(f"Etapa: {error['etapa']}")
+            st.exception(e)
+
+# --- Costos de importación (arranque en frío) ---
+with st.sidebar.expander("⏱️ Tiempos de importación"):
+    st.dataframe(dependencias.resumen_tiempos(), use_container_width=True, hide_index=True)
+
+# --- Tiempos por etapa del rerun ---
+instrumentacion.mostrar_panel(traza)
+traza.guardar()
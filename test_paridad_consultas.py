@@ -0,0 +1,50 @@
+"""Paridad de los motores de consultas: cada consulta de paridad_consultas.CONSULTAS
+tiene que dar lo mismo con pandas y con DuckDB (tabla Arrow y Parquet).
+
+    python -m pytest test_paridad_consultas.py
+
+Sin DuckDB instalado las pruebas se saltean.
+"""
+import pandas as pd
+import pytest
+
+import consultas
+import generador_sintetico
+from paridad_consultas import CONSULTAS, preparar, normalizar
+from procesamiento import procesar_proyectos
+
+pytest.importorskip("duckdb")
+
+FILAS = 5000
+
+
+@pytest.fixture(scope="module")
+def datos():
+    return preparar(procesar_proyectos(generador_sintetico.generar_proyectos(FILAS)))
+
+@pytest.fixture(scope="module")
+def motores(datos, tmp_path_factory):
+    ruta_parquet = str(tmp_path_factory.mktemp("paridad") / "proyectos.parquet")
+    datos.to_parquet(ruta_parquet, index=False)
+    return {
+        "pandas": consultas.crear_consulta(datos, "pandas"),
+        "duckdb (arrow)": consultas.crear_consulta(datos, "duckdb"),
+        "duckdb (parquet)": consultas.crear_consulta(ruta_parquet, "duckdb"),
+    }
+
+
+@pytest.mark.parametrize("motor", ["duckdb (arrow)", "duckdb (parquet)"])
+@pytest.mark.parametrize("nombre", list(CONSULTAS))
+def test_mismo_resultado_que_pandas(motores, nombre, motor):
+    esperado = normalizar(CONSULTAS[nombre](motores["pandas"]))
+    obtenido = normalizar(CONSULTAS[nombre](motores[motor]))
+    if isinstance(esperado, pd.DataFrame):
+        pd.testing.assert_frame_equal(obtenido, esperado, check_dtype=False, check_index_type=False)
+    else:
+        assert obtenido == esperado
+
+@pytest.mark.parametrize("nombre", list(CONSULTAS))
+def test_consulta_no_vacia(motores, nombre):
+    """Una consulta que no devuelve nada con los datos de prueba no compara nada."""
+    resultado = CONSULTAS[nombre](motores["pandas"])
+    assert len(resultado) if isinstance(resultado, pd.DataFrame) else resultado
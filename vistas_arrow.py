@@ -0,0 +1,79 @@
+"""Vistas de tabla en Arrow, convertidas una vez y reutilizadas entre reruns.
+
+st.dataframe pasa cada DataFrame a Arrow (pa.Table.from_pandas) en cada rerun.
+Con el texto ya en TEXTO_ARROW (ver procesamiento.a_texto_arrow) esa
+conversión no copia los datos; además, las vistas que son cortes de un
+DataFrame de origen (un subconjunto de sus filas y columnas, sin modificar
+valores) se guardan como pa.Table por origen, columnas y filas, de modo que
+un rerun que vuelve a mostrar la misma vista le pasa a Streamlit la tabla ya
+armada. Solo la vista con todas las filas comparte los buffers con el
+DataFrame; la de un subconjunto de filas arma buffers nuevos con su texto, así
+que la caché se limita por tamaño (pa.Table.nbytes), no por cantidad de vistas.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Bytes de las vistas guardadas por proceso (las usadas hace más tiempo se descartan primero)
+MAX_BYTES_VISTAS = 256 * 1024 * 1024
+
+_VISTAS = OrderedDict()
+_BYTES_VISTAS = 0
+_LOCK_VISTAS = threading.Lock()
+
+
+def a_arrow(df):
+    """pa.Table con las columnas de df (sin el índice)."""
+    df = df.copy(deep=False)
+    df.columns = [str(columna) for columna in df.columns]
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def clave_vista(df, origen):
+    """Clave de la vista: origen, columnas y huella de las filas (None si el índice no es entero)."""
+    if not pd.api.types.is_integer_dtype(df.index.dtype):
+        return None
+    filas = hashlib.blake2b(np.ascontiguousarray(df.index.to_numpy()).tobytes(), digest_size=16).hexdigest()
+    return (origen, tuple(str(columna) for columna in df.columns), len(df), filas)
+
+def tabla_arrow(df, origen=None):
+    """pa.Table de la vista; con origen se reutiliza la conversión anterior de las mismas filas y columnas.
+
+    origen identifica el DataFrame del que df es un corte (por ejemplo, el hash
+    del archivo leído); sin origen se convierte siempre.
+    """
+    clave = clave_vista(df, origen) if origen is not None else None
+    if clave is None:
+        return a_arrow(df)
+    with _LOCK_VISTAS:
+        tabla = _VISTAS.get(clave)
+        if tabla is not None:
+            _VISTAS.move_to_end(clave)
+            return tabla
+    tabla = a_arrow(df)
+    _guardar(clave, tabla)
+    return tabla
+
+def _guardar(clave, tabla):
+    """Guarda la vista y descarta las usadas hace más tiempo hasta volver a MAX_BYTES_VISTAS."""
+    global _BYTES_VISTAS
+    if tabla.nbytes > MAX_BYTES_VISTAS:
+        return
+    with _LOCK_VISTAS:
+        anterior = _VISTAS.pop(clave, None)
+        if anterior is not None:
+            _BYTES_VISTAS -= anterior.nbytes
+        _VISTAS[clave] = tabla
+        _BYTES_VISTAS += tabla.nbytes
+        while _BYTES_VISTAS > MAX_BYTES_VISTAS:
+            _, descartada = _VISTAS.popitem(last=False)
+            _BYTES_VISTAS -= descartada.nbytes
+
+def mostrar_tabla(df, origen=None, **kwargs):
+    """st.dataframe de la vista como Arrow (ver tabla_arrow)."""
+    import streamlit as st
+
+    st.dataframe(tabla_arrow(df, origen), **kwargs)